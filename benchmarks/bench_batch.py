@@ -0,0 +1,86 @@
+"""Images per second for sequential vs batched (multi-canvas) headless pours.
+
+Usage:
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_batch --canvases 1 4 16 --steps 200 --backend gpu
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List
+
+from src.batch import EmitEvent, HeadlessRunner, PourScript
+from src.config import Config
+
+DEFAULT_CANVASES = [1, 2, 4, 8, 16]
+
+
+def make_script(seed: int, steps: int) -> PourScript:
+    """Create a small two-color pour with a tilt, varied by seed."""
+    return PourScript(
+        steps=steps,
+        seed=seed,
+        emits=[
+            EmitEvent(step=0, x=400.0, y=300.0, count=300, color="red"),
+            EmitEvent(step=10, x=380.0, y=290.0, count=300, color="blue"),
+        ],
+    )
+
+
+def run(canvas_counts: List[int], steps: int, backend: str) -> List[Dict]:
+    """Time K pours run one after another and as one K-canvas batch.
+    
+    Args:
+        canvas_counts: Batch sizes to sweep
+        steps: Steps per pour
+        backend: Taichi backend ("cpu" or "gpu")
+    
+    Returns:
+        List of result records
+    """
+    results = []
+    for count in canvas_counts:
+        scripts = [make_script(seed, steps) for seed in range(count)]
+        
+        config = Config()
+        config.physics.backend = backend
+        runner = HeadlessRunner(config)
+        runner.run(make_script(0, 2))  # Warm-up (kernel JIT)
+        start = time.perf_counter()
+        for script in scripts:
+            runner.run(script)
+        sequential = time.perf_counter() - start
+        
+        config.physics.num_canvases = count
+        runner = HeadlessRunner(config)
+        runner.run_batch([make_script(0, 2)] * count)
+        start = time.perf_counter()
+        runner.run_batch(scripts)
+        batched = time.perf_counter() - start
+        
+        results.append({
+            "canvases": count,
+            "sequential_images_per_s": count / sequential,
+            "batched_images_per_s": count / batched,
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--canvases", type=int, nargs="+", default=DEFAULT_CANVASES)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--backend", choices=["cpu", "gpu"], default="cpu")
+    args = parser.parse_args(argv)
+    
+    print(f"{'canvases':>9} {'sequential/s':>13} {'batched/s':>10} {'speedup':>8}")
+    for r in run(args.canvases, args.steps, args.backend):
+        speedup = r["batched_images_per_s"] / r["sequential_images_per_s"]
+        print(f"{r['canvases']:>9} {r['sequential_images_per_s']:13.2f} "
+              f"{r['batched_images_per_s']:10.2f} {speedup:7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
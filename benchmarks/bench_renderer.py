@@ -0,0 +1,114 @@
+"""Frame time vs particle count for the blit and batched renderers.
+
+Usage:
+    python -m benchmarks.bench_renderer
+    python -m benchmarks.bench_renderer --counts 1000 10000 --repeats 5
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import pygame
+
+from src.config import Config
+from src.rendering.renderer import ParticleRenderer
+
+DEFAULT_COUNTS = [1000, 2000, 5000, 10000, 20000, 50000]
+RENDER_MODES = ["blit", "batched"]
+
+
+def make_particles(config: Config, count: int, seed: int = 0):
+    """Create random on-canvas particles using the preset palette.
+    
+    Args:
+        config: Configuration object
+        count: Number of particles
+        seed: Random seed
+    
+    Returns:
+        Tuple of (positions, colors) arrays
+    """
+    rng = np.random.default_rng(seed)
+    size = (config.canvas.width, config.canvas.height)
+    positions = rng.uniform(0.0, size, (count, 2)).astype(np.float32)
+    palette = np.array(list(config.COLOR_PRESETS.values()), dtype=np.float32)
+    colors = palette[rng.integers(0, len(palette), count)]
+    return positions, colors
+
+
+def time_frame(renderer: ParticleRenderer, positions, colors, repeats: int) -> float:
+    """Return the mean clear + render time in milliseconds.
+    
+    Args:
+        renderer: Renderer to benchmark
+        positions: Nx2 particle positions
+        colors: Nx4 particle colors
+        repeats: Number of timed frames
+    """
+    # Warm-up frame (allocates the batched owner buffer)
+    renderer.clear()
+    renderer.render_particles(positions, colors)
+    
+    start = time.perf_counter()
+    for _ in range(repeats):
+        renderer.clear()
+        renderer.render_particles(positions, colors)
+    return (time.perf_counter() - start) * 1000.0 / repeats
+
+
+def run(counts: List[int], repeats: int) -> List[Dict]:
+    """Benchmark every render mode at every particle count.
+    
+    Args:
+        counts: Particle counts to sweep
+        repeats: Timed frames per measurement
+    
+    Returns:
+        List of result records
+    """
+    config = Config()
+    screen = pygame.Surface((config.canvas.width, config.canvas.height))
+    results = []
+    for count in counts:
+        positions, colors = make_particles(config, count)
+        for mode in RENDER_MODES:
+            config.render.render_mode = mode
+            renderer = ParticleRenderer(config, screen)
+            frame_ms = time_frame(renderer, positions, colors, repeats)
+            results.append({"mode": mode, "particles": count, "frame_ms": frame_ms})
+    return results
+
+
+def print_table(results: List[Dict]):
+    """Print results as a particle count x render mode table."""
+    print(f"{'particles':>10} " + " ".join(f"{m + ' ms':>12}" for m in RENDER_MODES) + f" {'speedup':>9}")
+    by_count: Dict[int, Dict[str, float]] = {}
+    for r in results:
+        by_count.setdefault(r["particles"], {})[r["mode"]] = r["frame_ms"]
+    for count, modes in by_count.items():
+        row = " ".join(f"{modes[m]:12.2f}" for m in RENDER_MODES)
+        speedup = modes["blit"] / modes["batched"]
+        print(f"{count:>10} {row} {speedup:8.1f}x")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+    
+    results = run(args.counts, args.repeats)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
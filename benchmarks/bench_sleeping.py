@@ -0,0 +1,94 @@
+"""Cost and payoff of putting settled particles to sleep.
+
+The same pours are timed with sleeping off and on, while the paint is
+still spreading (few particles can sleep, so this is pure overhead) and
+after it has settled (most particles sleep and are skipped).
+
+Usage:
+    python -m benchmarks.bench_sleeping
+    python -m benchmarks.bench_sleeping --counts 10000 50000 --backend gpu
+"""
+
+import argparse
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.suite import measure, pour
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+
+DEFAULT_COUNTS = [10000, 50000]
+
+# Sleep threshold timed against sleeping off
+SLEEP_SPEED = 0.5
+
+# Steps the paint is given to come to rest before the "settled" case
+SETTLE_STEPS = 600
+
+
+def run(counts: List[int], backend: str, repeats: int) -> List[Dict]:
+    """Time update on moving and settled paint with sleeping off and on.
+    
+    Args:
+        counts: Particle counts to sweep
+        backend: Taichi backend ("cpu" or "gpu")
+        repeats: Timed calls per case
+    
+    Returns:
+        List of result records
+    """
+    results = []
+    for sleep_speed in (0.0, SLEEP_SPEED):
+        config = Config()
+        config.physics.backend = backend
+        config.physics.max_particles = max(counts)
+        config.physics.initial_capacity = max(counts)  # No growth while timing
+        config.physics.sleep_speed = sleep_speed
+        particle_system = ParticleSystem(config)
+        dt = config.physics.time_step
+        
+        def update():
+            particle_system.update(dt)
+        
+        for count in counts:
+            particle_system.reset()
+            pour(particle_system, count, np.random.default_rng(0))
+            update()  # Warm-up (kernel JIT)
+            results.append({
+                "case": "moving",
+                "sleeping": sleep_speed > 0.0,
+                "particles": count,
+                "awake": particle_system.get_awake_count(),
+                **measure(update, repeats),
+            })
+            
+            for _ in range(SETTLE_STEPS):
+                update()
+            results.append({
+                "case": "settled",
+                "sleeping": sleep_speed > 0.0,
+                "particles": count,
+                "awake": particle_system.get_awake_count(),
+                **measure(update, repeats),
+            })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--backend", choices=["cpu", "gpu"], default="cpu")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+    
+    print(f"{'case':<8} {'sleeping':<8} {'particles':>9} {'awake':>7} {'median ms':>10}")
+    for r in run(args.counts, args.backend, args.repeats):
+        print(f"{r['case']:<8} {str(r['sleeping']):<8} {r['particles']:>9} "
+              f"{r['awake']:>7} {r['median_ms']:10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
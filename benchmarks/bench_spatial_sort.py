@@ -0,0 +1,123 @@
+"""Effect of spatially sorting particle memory on update and render times.
+
+Paint is poured as many small pours at random points, so particles that are
+close on the canvas are scattered through memory. The same state is then
+timed as poured and after spatial_sort() with each sort order.
+
+Usage:
+    python -m benchmarks.bench_spatial_sort
+    python -m benchmarks.bench_spatial_sort --counts 50000 100000 --backend gpu
+"""
+
+import argparse
+import sys
+from typing import Dict, List
+
+import numpy as np
+import pygame
+import taichi as ti
+
+from benchmarks.suite import measure
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+from src.rendering.renderer import ParticleRenderer
+
+DEFAULT_COUNTS = [20000, 50000, 100000]
+
+# Small pours (like a dragged stream) interleave distant paint in memory
+POUR_SIZE = 25
+
+
+def pour(particle_system: ParticleSystem, count: int, rng: np.random.Generator):
+    """Emit count particles as small pours at random canvas points."""
+    palette = list(Config.COLOR_PRESETS.values())
+    for start in range(0, count, POUR_SIZE):
+        particle_system.add_particles(
+            float(rng.uniform(0.0, particle_system.canvas_width)),
+            float(rng.uniform(0.0, particle_system.canvas_height)),
+            min(POUR_SIZE, count - start),
+            ti.Vector(palette[rng.integers(len(palette))]),
+            1.0,
+            300.0
+        )
+
+
+def run(counts: List[int], backend: str, repeats: int) -> List[Dict]:
+    """Time update and rendering for each memory layout.
+    
+    Args:
+        counts: Particle counts to sweep
+        backend: Taichi backend ("cpu" or "gpu")
+        repeats: Timed calls per case
+    
+    Returns:
+        List of result records
+    """
+    results = []
+    for layout in ("unsorted", "cell", "morton"):
+        config = Config()
+        config.physics.backend = backend
+        config.physics.max_particles = max(counts)
+        config.physics.initial_capacity = max(counts)  # No growth while timing
+        config.physics.retire_off_canvas = False
+        if layout != "unsorted":
+            config.physics.spatial_sort_order = layout
+        particle_system = ParticleSystem(config)
+        surface = pygame.Surface((config.canvas.width, config.canvas.height))
+        renderer = ParticleRenderer(config, surface)
+        config.render.render_mode = "device"
+        device_renderer = ParticleRenderer(config, surface)
+        readback = particle_system.create_readback()
+        dt = config.physics.time_step
+        
+        def render():
+            renderer.clear()
+            renderer.render_particles(*particle_system.read_particles(readback))
+        
+        # Renders first: they leave the state unchanged
+        cases = {
+            "render_particles": render,
+            "render_device": lambda: device_renderer.render_system(particle_system, readback),
+            "update": lambda: particle_system.update(dt),
+        }
+        if layout != "unsorted":
+            cases["spatial_sort"] = particle_system.spatial_sort
+        
+        for count in counts:
+            def prepare():
+                particle_system.reset()
+                pour(particle_system, count, np.random.default_rng(0))
+                for _ in range(5):
+                    particle_system.update(dt)
+                if layout != "unsorted":
+                    particle_system.spatial_sort()
+            
+            prepare()
+            for func in cases.values():
+                func()  # Warm-up (kernel JIT, buffer allocation)
+            prepare()
+            for case, func in cases.items():
+                results.append({
+                    "case": case,
+                    "layout": layout,
+                    "particles": count,
+                    **measure(func, repeats),
+                })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--backend", choices=["cpu", "gpu"], default="cpu")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+    
+    print(f"{'case':<17} {'layout':<9} {'particles':>9} {'median ms':>10}")
+    for r in run(args.counts, args.backend, args.repeats):
+        print(f"{r['case']:<17} {r['layout']:<9} {r['particles']:>9} {r['median_ms']:10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
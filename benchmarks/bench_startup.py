@@ -0,0 +1,84 @@
+"""Time-to-first-frame with a cold and a warm offline kernel cache.
+
+Each run starts a fresh Python process that creates a particle system, warms
+up its kernels and advances one step, so the numbers include everything a
+user waits for before the first frame.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 3 --backend gpu
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+# Runs inside the child process; prints one JSON record
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import taichi as ti
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+imported = time.perf_counter()
+config = Config()
+config.physics.backend = sys.argv[1]
+config.physics.kernel_cache_dir = sys.argv[2]
+config.physics.warm_up = True
+ps = ParticleSystem(config)
+ps.add_particles(400.0, 300.0, 300, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 300.0)
+ps.advance(0.016)
+ti.sync()
+record = ps.startup_metrics.as_dict()
+record["import_seconds"] = imported - start
+record["first_step_seconds"] = time.perf_counter() - start
+print(json.dumps(record))
+"""
+
+
+def run_child(backend: str, cache_dir: str) -> Dict:
+    """Start a fresh interpreter and return its startup metrics."""
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, backend, cache_dir],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int, backend: str) -> List[Dict]:
+    """Time one cold-cache start followed by warm-cache starts.
+    
+    Args:
+        runs: Warm-cache starts after the cold one
+        backend: Taichi backend ("cpu" or "gpu")
+    
+    Returns:
+        List of result records, cold first
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        results = [dict(run_child(backend, cache_dir), label="cold")]
+        for _ in range(runs):
+            results.append(dict(run_child(backend, cache_dir), label="warm"))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=2, help="Warm-cache runs")
+    parser.add_argument("--backend", choices=["cpu", "gpu"], default="cpu")
+    args = parser.parse_args(argv)
+    
+    print(f"{'cache':>6} {'import':>8} {'init':>8} {'fields':>8} {'warm-up':>8} "
+          f"{'first step':>11} {'warm':>5}")
+    for r in run(args.runs, args.backend):
+        print(f"{r['label']:>6} {r['import_seconds']:8.2f} {r['init_seconds']:8.2f} "
+              f"{r['allocation_seconds']:8.2f} {r['warm_up_seconds']:8.2f} "
+              f"{r['first_step_seconds']:11.2f} {str(r['cache_warm']):>5}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Benchmark suite for the physics step, readback and rendering.
+
+Sweeps particle counts and Taichi backends, writes machine-readable results
+and compares them against a stored baseline so hot-loop regressions show up
+before a release.
+
+Usage:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --counts 1000 10000 --backends cpu gpu
+    python -m benchmarks.suite --save-baseline
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pygame
+import taichi as ti
+
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+from src.rendering.renderer import ParticleRenderer
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+DEFAULT_COUNTS = [1000, 5000, 10000, 50000]
+DEFAULT_BACKENDS = ["cpu"]
+
+# Particles per simulated pour (matches a mouse click in the window)
+POUR_SIZE = 300
+
+
+def measure(func: Callable[[], None], repeats: int) -> Dict[str, float]:
+    """Time a callable, synchronizing Taichi after every call.
+    
+    Args:
+        func: Callable to time
+        repeats: Number of timed calls
+    
+    Returns:
+        Median/min/max wall time in milliseconds
+    """
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        ti.sync()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+    }
+
+
+def pour(particle_system: ParticleSystem, count: int, rng: np.random.Generator):
+    """Emit count particles as 300-particle pours at random canvas points."""
+    palette = list(Config.COLOR_PRESETS.values())
+    for start in range(0, count, POUR_SIZE):
+        x = rng.uniform(0.0, particle_system.canvas_width)
+        y = rng.uniform(0.0, particle_system.canvas_height)
+        particle_system.add_particles(
+            float(x),
+            float(y),
+            min(POUR_SIZE, count - start),
+            ti.Vector(palette[rng.integers(len(palette))]),
+            1.0,
+            300.0
+        )
+
+
+def bench_backend(backend: str, counts: List[int], repeats: int) -> List[Dict]:
+    """Run every benchmark case on one backend.
+    
+    Args:
+        backend: Taichi backend ("cpu" or "gpu")
+        counts: Particle counts to sweep
+        repeats: Timed calls per case
+    
+    Returns:
+        List of result records
+    """
+    config = Config()
+    config.physics.backend = backend
+    config.physics.max_particles = max(counts)
+    config.physics.initial_capacity = max(counts)  # No growth while timing
+    particle_system = ParticleSystem(config)
+    renderer = ParticleRenderer(
+        config, pygame.Surface((config.canvas.width, config.canvas.height))
+    )
+    config.render.render_mode = "device"
+    device_renderer = ParticleRenderer(
+        config, pygame.Surface((config.canvas.width, config.canvas.height))
+    )
+    readback = particle_system.create_readback()
+    dt = config.physics.time_step
+    
+    results = []
+    for count in counts:
+        def emit():
+            particle_system.reset()
+            pour(particle_system, count, np.random.default_rng(0))
+        
+        def render():
+            renderer.clear()
+            renderer.render_particles(*particle_system.read_particles(readback))
+        
+        # Emit once and let the pours spread so update sees realistic density
+        emit()
+        for _ in range(10):
+            particle_system.update(dt)
+        
+        cases = {
+            "update": lambda: particle_system.update(dt),
+            "get_particle_data": particle_system.get_particle_data,
+            "read_particles": lambda: particle_system.read_particles(readback),
+            "render_particles": render,
+            "render_device": lambda: device_renderer.render_system(particle_system, readback),
+            "add_particles": emit,
+        }
+        for case, func in cases.items():
+            func()  # Warm-up (kernel JIT, buffer allocation)
+            timing = measure(func, repeats)
+            results.append({
+                "case": case,
+                "backend": backend,
+                "particles": count,
+                "repeats": repeats,
+                **timing,
+            })
+    return results
+
+
+def result_key(record: Dict) -> str:
+    """Identify a measurement across runs."""
+    return f"{record['case']}/{record['backend']}/{record['particles']}"
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Dict]:
+    """Compare results against a baseline.
+    
+    Args:
+        results: Current result records
+        baseline: Baseline result records
+        tolerance: Allowed fractional slowdown before flagging a regression
+    
+    Returns:
+        Comparison records (one per result found in the baseline)
+    """
+    reference = {result_key(r): r for r in baseline}
+    comparisons = []
+    for record in results:
+        base = reference.get(result_key(record))
+        if base is None:
+            continue
+        ratio = record["median_ms"] / max(base["median_ms"], 1e-9)
+        comparisons.append({
+            "key": result_key(record),
+            "baseline_ms": base["median_ms"],
+            "current_ms": record["median_ms"],
+            "ratio": ratio,
+            "regression": ratio > 1.0 + tolerance,
+        })
+    return comparisons
+
+
+def metadata() -> Dict[str, str]:
+    """Describe the machine and library versions of a run."""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "taichi": ".".join(str(v) for v in ti.__version__),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+    }
+
+
+def write_json(path: Path, results: List[Dict]):
+    """Write result records with run metadata."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+
+
+def load_results(path: Path) -> Optional[List[Dict]]:
+    """Load result records from a JSON file, if it exists."""
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def print_results(results: List[Dict], comparisons: List[Dict]):
+    """Print results, with baseline ratios when available."""
+    by_key = {c["key"]: c for c in comparisons}
+    print(f"{'case':<20} {'backend':<7} {'particles':>9} {'median ms':>10} {'baseline':>10} {'ratio':>7}")
+    for record in results:
+        line = (f"{record['case']:<20} {record['backend']:<7} "
+                f"{record['particles']:>9} {record['median_ms']:>10.3f}")
+        comparison = by_key.get(result_key(record))
+        if comparison:
+            flag = "  REGRESSION" if comparison["regression"] else ""
+            line += f" {comparison['baseline_ms']:>10.3f} {comparison['ratio']:>6.2f}x{flag}"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=DEFAULT_COUNTS)
+    parser.add_argument("--backends", nargs="+", choices=["cpu", "gpu"], default=DEFAULT_BACKENDS)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT,
+                        help="Results JSON file (default: %(default)s)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="Baseline JSON file (default: %(default)s)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed fractional slowdown vs baseline (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for backend in args.backends:
+        results.extend(bench_backend(backend, args.counts, args.repeats))
+    write_json(args.output, results)
+    
+    baseline = load_results(args.baseline)
+    comparisons = compare(results, baseline, args.tolerance) if baseline else []
+    print_results(results, comparisons)
+    print(f"\nResults written to {args.output}")
+    
+    if args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    
+    regressions = [c for c in comparisons if c["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%} of baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
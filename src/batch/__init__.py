@@ -0,0 +1,16 @@
+"""Batch simulation module.
+
+Contains scripted pours, session recipes, the headless (display-free) runner,
+the multi-process render farm and the local render service.
+"""
+
+from src.batch.script import EmitEvent, TiltEvent, PourScript
+from src.batch.headless import HeadlessRunner, run_pour, run_pours
+from src.batch.farm import JobResult, collect_scripts, run_farm
+from src.batch.recipe import Recipe, RecipeAction, RecipeRecorder, RecipeReplayer, replay_recipe
+from src.batch.service import RenderService, ServiceClient, ServiceError, serve
+
+__all__ = ["EmitEvent", "TiltEvent", "PourScript", "HeadlessRunner", "run_pour",
+           "run_pours", "Recipe", "RecipeAction", "RecipeRecorder", "RecipeReplayer",
+           "replay_recipe", "JobResult", "collect_scripts", "run_farm", "RenderService",
+           "ServiceClient", "ServiceError", "serve"]
@@ -0,0 +1,192 @@
+"""Process-pool render farm for scripted pours.
+
+Each worker process initializes Taichi once, warms up its kernels, and reuses
+one HeadlessRunner (and its ParticleSystem) for every job it receives. Jobs write their image
+as soon as they finish, and a failing script only fails its own job; when a
+worker process dies outright, the pool is restarted and the unfinished jobs
+are resubmitted (the jobs that were running get one retry). A worker's
+particle memory grows to fit its largest job and is kept for the
+next one; each result reports it, for sizing worker processes.
+"""
+
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Union
+
+from src.batch.headless import HeadlessRunner
+from src.batch.script import PourScript
+from src.config import Config
+
+# Per-process runner and started-job queue, set by the pool initializer
+_runner = None
+_started = None
+
+# Pool breakages a job may be running through before it is reported failed
+MAX_CRASHES = 2
+
+
+@dataclass
+class JobResult:
+    """Outcome of one farm job."""
+    script: str
+    output: str
+    simulate_seconds: float = 0.0
+    total_seconds: float = 0.0
+    worker: int = 0
+    capacity: int = 0  # Worker's particle capacity after the job
+    memory_bytes: int = 0  # Worker's simulation field memory after the job
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        """Whether the job succeeded."""
+        return self.error is None
+
+
+def collect_scripts(inputs: Sequence[Union[str, Path]]) -> List[Path]:
+    """Expand script files and directories (their *.json files) into a list.
+    
+    Args:
+        inputs: Script files and/or directories
+    
+    Returns:
+        Script paths in input order (directory contents sorted by name)
+    """
+    scripts = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            scripts.extend(sorted(item.glob("*.json")))
+        else:
+            scripts.append(item)
+    return scripts
+
+
+def _init_worker(config: Config, started):
+    """Create this worker's runner (initializes Taichi once per process)."""
+    global _runner, _started
+    _started = started
+    _runner = HeadlessRunner(config)
+    # Compile (or load cached) kernels up front so job timings exclude JIT time
+    _runner.particle_system.warm_up()
+
+
+def _run_job(index: int, script_path: str, output: str) -> JobResult:
+    """Simulate one script in a worker and save its image."""
+    # Reported before running, so the parent knows which jobs a dead worker held
+    _started.put(index)
+    start = time.perf_counter()
+    result = JobResult(script_path, output, worker=os.getpid())
+    try:
+        script = PourScript.load(script_path)
+        result.simulate_seconds = _runner.run(script)
+        _runner.save(output)
+        memory = _runner.particle_system.memory_usage()
+        result.capacity = memory["capacity"]
+        result.memory_bytes = memory["total_bytes"]
+    except Exception:
+        result.error = traceback.format_exc(limit=3)
+    result.total_seconds = time.perf_counter() - start
+    return result
+
+
+def run_farm(
+    config: Config,
+    inputs: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[JobResult, int, int], None]] = None
+) -> List[JobResult]:
+    """Render scripted pours in parallel worker processes.
+    
+    Args:
+        config: Configuration for every worker's particle system
+        inputs: Script files and/or directories of scripts
+        output_dir: Directory for the images (<script name>.png, prefixed
+            with the script's directory name when names repeat)
+        workers: Worker processes (defaults to the CPU count)
+        on_result: Called as each job finishes with (result, done, total)
+    
+    Returns:
+        One result per script, in completion order
+    """
+    scripts = collect_scripts(inputs)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(scripts) or 1))
+    
+    results: List[JobResult] = []
+    
+    def finish(result: JobResult):
+        results.append(result)
+        if on_result is not None:
+            on_result(result, len(results), len(scripts))
+    
+    outputs = [str(output_dir / name) for name in _output_names(scripts)]
+    pending = list(range(len(scripts)))
+    crashes: Dict[int, int] = {}
+    # Spawned (not forked) workers: Taichi's runtime must not be inherited
+    context = multiprocessing.get_context("spawn")
+    while pending:
+        # Written synchronously, so a job's start survives its worker crashing
+        started = context.SimpleQueue()
+        broken: List[int] = []
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(config, started)
+        ) as pool:
+            futures = {pool.submit(_run_job, k, str(scripts[k]), outputs[k]): k for k in pending}
+            for future in as_completed(futures):
+                try:
+                    finish(future.result())
+                except BrokenProcessPool:
+                    broken.append(futures[future])
+        running: Set[int] = set()
+        while not started.empty():
+            running.add(started.get())
+        started.close()
+        
+        # A worker died (e.g. a crash inside Taichi), taking the pool with it.
+        # Jobs it never reached are resubmitted to a new pool; the jobs that
+        # were running are retried until they have seen MAX_CRASHES breakages
+        stalled = not running
+        pending = []
+        for k in sorted(broken):
+            if k in running:
+                crashes[k] = crashes.get(k, 0) + 1
+            if stalled:
+                # The workers died before starting any job (e.g. in the
+                # initializer); a new pool's would die the same way
+                finish(JobResult(str(scripts[k]), outputs[k],
+                                 error="Worker processes died before running any job"))
+            elif crashes.get(k, 0) >= MAX_CRASHES:
+                finish(JobResult(str(scripts[k]), outputs[k],
+                                 error=f"Worker process died running this job "
+                                       f"({crashes[k]} times)"))
+            else:
+                pending.append(k)
+    return results
+
+
+def _output_names(scripts: Sequence[Path]) -> List[str]:
+    """Image file name per script, unique even when script names repeat.
+    
+    Scripts sharing a name are prefixed with their directory's name, and
+    any names still shared get a counter.
+    """
+    stems = [script.stem for script in scripts]
+    names = [f"{script.parent.name}_{script.stem}" if stems.count(script.stem) > 1
+             else script.stem for script in scripts]
+    unique = []
+    for k, name in enumerate(names):
+        if names.count(name) > 1:
+            name = f"{name}_{names[:k].count(name) + 1}"
+        unique.append(f"{name}.png")
+    return unique
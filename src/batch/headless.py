@@ -0,0 +1,248 @@
+"""Headless simulation runner (no display, no frame-rate cap)."""
+
+import copy
+import time
+from pathlib import Path
+from typing import Callable, Optional, Sequence, Union
+
+import pygame
+import taichi as ti
+
+from src.batch.script import EmitEvent, PourScript, TiltEvent
+from src.config import Config
+from src.physics.emitter import Emitter
+from src.physics.particle_system import ParticleSystem
+from src.rendering.frame_ring import open_frame_ring
+from src.rendering.print_render import PrintRenderer
+from src.rendering.renderer import ParticleRenderer
+
+
+class HeadlessRunner:
+    """Run scripted pours as fast as the hardware allows.
+    
+    Renders to an offscreen Pygame surface, so no display is needed.
+    """
+    
+    def __init__(self, config: Config, particle_system: Optional[ParticleSystem] = None):
+        """Initialize headless runner.
+        
+        Args:
+            config: Configuration object
+            particle_system: Existing particle system to reuse (created if None)
+        """
+        self.config = config
+        self.particle_system = particle_system or ParticleSystem(config)
+        self.surface = pygame.Surface((config.canvas.width, config.canvas.height))
+        self.renderer = ParticleRenderer(config, self.surface)
+        self.readback = self.particle_system.create_readback()
+        # Every emit of a step goes out in one launch; scripts are not budgeted
+        self.emitter = Emitter(self.particle_system, frame_budget=0)
+        # Created on first save at a print scale or supersampling
+        self.print_renderer: Optional[PrintRenderer] = None
+        # Frames published while running, if export.shared_frames is set
+        self.frame_ring = open_frame_ring(config)
+    
+    def run(
+        self,
+        script: PourScript,
+        on_step: Optional[Callable[[int, int], None]] = None
+    ) -> float:
+        """Run a scripted pour from an empty, level canvas with the script's seed.
+        
+        With a frame ring, every export.shared_frames_interval-th step is
+        rendered and published (and counts towards the simulation time).
+        
+        Args:
+            script: Pour to simulate
+            on_step: Called after every step with (steps done, total steps)
+        
+        Returns:
+            Wall-clock simulation time in seconds
+        """
+        self.particle_system.reset()
+        self.particle_system.set_tilt(0.0, 0.0)
+        self.particle_system.set_seed(script.seed)
+        events = script.events_by_step()
+        
+        start = time.perf_counter()
+        for step in range(script.steps):
+            for event in events.get(step, ()):
+                self.apply_event(event)
+            self.emitter.flush()
+            self.particle_system.advance(script.time_step)
+            self.publish_frame(step + 1)
+            if on_step is not None:
+                on_step(step + 1, script.steps)
+        ti.sync()
+        return time.perf_counter() - start
+    
+    def run_batch(self, scripts: Sequence[PourScript]) -> float:
+        """Run several scripted pours at once, one per canvas.
+        
+        Script k plays on canvas k with its own seed; every canvas is
+        advanced by the same update launches.
+        
+        Args:
+            scripts: Pours to simulate (at most num_canvases, equal time steps)
+        
+        Returns:
+            Wall-clock simulation time in seconds
+        
+        Raises:
+            ValueError: If there are too many scripts or their time steps differ
+        """
+        if len(scripts) > self.particle_system.num_canvases:
+            raise ValueError(
+                f"{len(scripts)} scripts but only {self.particle_system.num_canvases} canvases"
+            )
+        if len({script.time_step for script in scripts}) > 1:
+            raise ValueError("Batched scripts must share one time step")
+        if not scripts:
+            return 0.0
+        
+        self.particle_system.reset()
+        schedules = []
+        for canvas, script in enumerate(scripts):
+            self.particle_system.set_tilt(0.0, 0.0, canvas)
+            self.particle_system.set_seed(script.seed, canvas)
+            schedules.append(script.events_by_step())
+        
+        start = time.perf_counter()
+        for step in range(max(script.steps for script in scripts)):
+            for canvas, events in enumerate(schedules):
+                if step < scripts[canvas].steps:
+                    for event in events.get(step, ()):
+                        self.apply_event(event, canvas)
+            self.emitter.flush()
+            self.particle_system.advance(scripts[0].time_step)
+            self.publish_frame(step + 1)
+        ti.sync()
+        return time.perf_counter() - start
+    
+    def apply_event(self, event: Union[EmitEvent, TiltEvent], canvas: int = 0):
+        """Apply a single script event to one canvas of the particle system.
+        
+        Emits are queued on the emitter and submitted by its next flush.
+        """
+        if isinstance(event, TiltEvent):
+            self.particle_system.set_tilt(event.x, event.y, canvas)
+        else:
+            self.emitter.emit(
+                event.x,
+                event.y,
+                event.count,
+                event.rgba(),
+                event.density,
+                event.viscosity,
+                canvas
+            )
+    
+    def render(self, canvas: Optional[int] = None) -> pygame.Surface:
+        """Render the current particle state to the offscreen surface.
+        
+        Args:
+            canvas: Canvas to draw when several are simulated (None draws all)
+        """
+        self.renderer.clear()
+        if canvas is None:
+            self.renderer.render_system(self.particle_system, self.readback)
+        else:
+            self.renderer.render_particles(*self.particle_system.get_particle_data(canvas))
+        return self.surface
+    
+    def publish_frame(self, step: int):
+        """Render and publish a step to the frame ring (if due).
+        
+        Args:
+            step: Steps simulated so far
+        """
+        interval = self.config.export.shared_frames_interval
+        if self.frame_ring is None or interval <= 0 or step % interval:
+            return
+        self.render()
+        positions = colors = None
+        if self.frame_ring.max_particles:
+            positions, colors = self.particle_system.read_particles(self.readback)
+        self.frame_ring.publish(self.surface, positions, colors, step)
+    
+    def close(self):
+        """Release the frame ring (consumers can no longer attach)."""
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.frame_ring = None
+    
+    def save(self, path: Union[str, Path], canvas: Optional[int] = None):
+        """Render the final canvas and write it to an image file.
+        
+        With export.print_scale or print_supersample set, the image is a
+        tiled high-resolution print render streamed into a PNG file.
+        """
+        export = self.config.export
+        if export.print_scale != 1.0 or export.print_supersample > 1:
+            if self.print_renderer is None:
+                self.print_renderer = PrintRenderer(
+                    self.particle_system,
+                    self.config,
+                    export.print_scale,
+                    export.print_supersample,
+                    export.print_tile
+                )
+            self.print_renderer.render(path, canvas, export.compress_level)
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pygame.image.save(self.render(canvas), str(path))
+
+
+def run_pour(config: Config, script: PourScript, output: Union[str, Path]) -> float:
+    """Simulate one scripted pour headlessly and save the final canvas.
+    
+    Args:
+        config: Configuration object (not modified; the pour uses a copy
+            seeded from the script)
+        script: Pour to simulate
+        output: Output image path
+    
+    Returns:
+        Wall-clock simulation time in seconds
+    """
+    pour_config = copy.deepcopy(config)
+    pour_config.physics.random_seed = script.seed
+    runner = HeadlessRunner(pour_config)
+    try:
+        elapsed = runner.run(script)
+        runner.save(output)
+    finally:
+        runner.close()
+    return elapsed
+
+
+def run_pours(
+    config: Config,
+    scripts: Sequence[PourScript],
+    outputs: Sequence[Union[str, Path]]
+) -> float:
+    """Simulate several scripted pours as one batch and save each canvas.
+    
+    Args:
+        config: Configuration object (not modified; the batch uses a copy
+            with one canvas per script)
+        scripts: Pours to simulate (equal time steps)
+        outputs: Output image path per script
+    
+    Returns:
+        Wall-clock simulation time in seconds
+    """
+    if len(outputs) != len(scripts):
+        raise ValueError("Need one output path per script")
+    if not scripts:
+        return 0.0
+    batch_config = copy.deepcopy(config)
+    batch_config.physics.num_canvases = len(scripts)
+    runner = HeadlessRunner(batch_config)
+    try:
+        elapsed = runner.run_batch(scripts)
+        for canvas, output in enumerate(outputs):
+            runner.save(output, canvas)
+    finally:
+        runner.close()
+    return elapsed
@@ -0,0 +1,262 @@
+"""Recording and replay of interactive pouring sessions (recipes).
+
+A recipe is the RNG seed plus every state-changing action of a session,
+each stamped with the physics step it was applied before and the wall
+time since recording started. Replaying the actions at the same steps
+reproduces the session, with or without a window.
+
+File format (JSON lines, gzip-compressed when the name ends in ``.gz``):
+a header object followed by one compact array per action::
+
+    {"format": "paint-recipe", "version": 1, "seed": 0, ...}
+    [step, time, "emit", x, y, count, r, g, b, a, density, viscosity]
+    [step, time, "tilt", x, y]
+    [step, time, "viscosity", value]
+    [step, time, "remove", x, y, radius]
+    [step, time, "reset"]
+"""
+
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import taichi as ti
+
+from src.batch.headless import HeadlessRunner
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+
+RECIPE_FORMAT = "paint-recipe"
+RECIPE_VERSION = 1
+
+# Arguments stored for each action kind, in file order
+ACTION_ARGS = {
+    "emit": ("x", "y", "count", "r", "g", "b", "a", "density", "viscosity"),
+    "tilt": ("x", "y"),
+    "viscosity": ("value",),
+    "remove": ("x", "y", "radius"),
+    "reset": (),
+}
+
+
+@dataclass
+class RecipeAction:
+    """One recorded action."""
+    step: int
+    time: float
+    kind: str
+    args: List[float] = field(default_factory=list)
+    
+    def to_row(self) -> List[Any]:
+        """Convert to the compact array stored in recipe files."""
+        return [self.step, round(self.time, 3), self.kind, *self.args]
+    
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "RecipeAction":
+        """Build an action from its stored array."""
+        step, t, kind, *args = row
+        if kind not in ACTION_ARGS:
+            raise ValueError(f"Unknown recipe action: {kind}")
+        return cls(int(step), float(t), kind, list(args))
+
+
+@dataclass
+class Recipe:
+    """A recorded session: seed, step size and timestamped actions."""
+    seed: int = 0
+    time_step: float = 0.016
+    steps: int = 0
+    canvas: List[int] = field(default_factory=lambda: [800, 600])
+    max_particles: int = 10000
+    actions: List[RecipeAction] = field(default_factory=list)
+    
+    def header(self) -> Dict[str, Any]:
+        """Get the recipe file header."""
+        return {
+            "format": RECIPE_FORMAT,
+            "version": RECIPE_VERSION,
+            "seed": self.seed,
+            "time_step": self.time_step,
+            "steps": self.steps,
+            "canvas": self.canvas,
+            "max_particles": self.max_particles,
+        }
+    
+    def save(self, path: Union[str, Path]):
+        """Write the recipe (gzip-compressed if the name ends in .gz)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "wt") as f:
+            f.write(json.dumps(self.header()) + "\n")
+            for action in self.actions:
+                f.write(json.dumps(action.to_row(), separators=(",", ":")) + "\n")
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Recipe":
+        """Read a recipe file."""
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != RECIPE_FORMAT:
+                raise ValueError(f"{path} is not a paint recipe")
+            if header.get("version", 0) > RECIPE_VERSION:
+                raise ValueError(f"Unsupported recipe version: {header['version']}")
+            actions = [RecipeAction.from_row(json.loads(line)) for line in f if line.strip()]
+        return cls(
+            seed=header["seed"],
+            time_step=header["time_step"],
+            steps=header["steps"],
+            canvas=header["canvas"],
+            max_particles=header["max_particles"],
+            actions=actions,
+        )
+    
+    def configure(self, config: Config):
+        """Apply the recorded simulation settings to a configuration."""
+        config.physics.random_seed = self.seed
+        config.physics.time_step = self.time_step
+        config.physics.max_particles = self.max_particles
+        config.canvas.width, config.canvas.height = self.canvas
+
+
+class RecipeRecorder:
+    """Log state-changing actions of a session as a recipe."""
+    
+    def __init__(self, config: Config):
+        """Initialize recorder.
+        
+        Args:
+            config: Configuration of the session being recorded
+        """
+        self.recipe = Recipe(
+            seed=config.physics.random_seed,
+            time_step=config.physics.time_step,
+            canvas=[config.canvas.width, config.canvas.height],
+            max_particles=config.physics.max_particles,
+        )
+        self.start_time = time.perf_counter()
+    
+    def record(self, step: int, kind: str, *args: float):
+        """Record an action applied before the given physics step.
+        
+        Args:
+            step: Index of the next physics step to run
+            kind: Action kind (see ACTION_ARGS)
+            *args: Action arguments
+        """
+        if len(args) != len(ACTION_ARGS[kind]):
+            raise ValueError(f"{kind} takes {len(ACTION_ARGS[kind])} arguments")
+        elapsed = time.perf_counter() - self.start_time
+        self.recipe.actions.append(RecipeAction(step, elapsed, kind, [float(a) for a in args]))
+    
+    def save(self, path: Union[str, Path], steps: int) -> Recipe:
+        """Save the session so far.
+        
+        Args:
+            path: Output recipe file
+            steps: Physics steps simulated so far
+        
+        Returns:
+            The saved recipe
+        """
+        self.recipe.steps = steps
+        self.recipe.save(path)
+        return self.recipe
+
+
+class RecipeReplayer:
+    """Drive a ParticleSystem from a recipe's actions."""
+    
+    def __init__(
+        self,
+        recipe: Recipe,
+        particle_system: ParticleSystem,
+        on_action: Optional[Callable[[RecipeAction], None]] = None
+    ):
+        """Initialize replayer.
+        
+        Args:
+            recipe: Recipe to replay
+            particle_system: Particle system to drive (should be freshly created
+                with the recipe's settings, see Recipe.configure)
+            on_action: Called after each applied action (e.g. to sync a UI)
+        """
+        self.recipe = recipe
+        self.particle_system = particle_system
+        self.on_action = on_action
+        self.next_action = 0
+    
+    @property
+    def finished(self) -> bool:
+        """Whether every action has been applied."""
+        return self.next_action >= len(self.recipe.actions)
+    
+    def apply_actions(self, step: int):
+        """Apply every pending action recorded before or at a step."""
+        actions = self.recipe.actions
+        while self.next_action < len(actions) and actions[self.next_action].step <= step:
+            action = actions[self.next_action]
+            self.apply(action)
+            self.next_action += 1
+            if self.on_action is not None:
+                self.on_action(action)
+    
+    def apply(self, action: RecipeAction):
+        """Apply a single action to the particle system."""
+        ps = self.particle_system
+        if action.kind == "emit":
+            x, y, count, r, g, b, a, density, viscosity = action.args
+            ps.add_particles(x, y, int(count), ti.Vector([r, g, b, a]), density, viscosity)
+        elif action.kind == "tilt":
+            ps.set_tilt(*action.args)
+        elif action.kind == "remove":
+            ps.remove_particles(*action.args)
+        elif action.kind == "reset":
+            ps.reset()
+            ps.set_tilt(0.0, 0.0)
+        # "viscosity" only changes the UI's next-pour setting
+    
+    def run(self, on_step: Optional[Callable[[int], None]] = None) -> float:
+        """Replay the whole recipe without a window.
+        
+        Args:
+            on_step: Called after every step with the steps done
+        
+        Returns:
+            Wall-clock simulation time in seconds
+        """
+        start = time.perf_counter()
+        for step in range(self.recipe.steps):
+            self.apply_actions(step)
+            self.particle_system.advance(self.recipe.time_step)
+            if on_step is not None:
+                on_step(step + 1)
+        self.apply_actions(self.recipe.steps)
+        ti.sync()
+        return time.perf_counter() - start
+
+
+def replay_recipe(config: Config, recipe: Recipe, output: Union[str, Path]) -> float:
+    """Replay a recorded session headlessly and save the final canvas.
+    
+    Args:
+        config: Configuration object (the recipe's settings are applied to it)
+        recipe: Session to replay
+        output: Output image path
+    
+    Returns:
+        Wall-clock simulation time in seconds
+    """
+    recipe.configure(config)
+    runner = HeadlessRunner(config)
+    try:
+        elapsed = RecipeReplayer(recipe, runner.particle_system).run(runner.publish_frame)
+        runner.save(output)
+    finally:
+        runner.close()
+    return elapsed
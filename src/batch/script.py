@@ -0,0 +1,82 @@
+"""Scripted pour descriptions for headless simulation."""
+
+import json
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from src.config import Config
+
+ColorSpec = Union[str, Sequence[float]]
+
+
+@dataclass
+class EmitEvent:
+    """Pour paint at a point on a given step."""
+    step: int
+    x: float
+    y: float
+    count: int = 300
+    color: ColorSpec = "blue"
+    viscosity: float = 300.0
+    density: float = 1.0
+    
+    def rgba(self) -> Tuple[float, float, float, float]:
+        """Resolve the color to an (R, G, B, A) tuple in 0-1 range."""
+        if isinstance(self.color, str):
+            return Config.COLOR_PRESETS[self.color]
+        rgba = tuple(float(c) for c in self.color)
+        if len(rgba) == 3:
+            rgba += (1.0,)
+        return rgba
+
+
+@dataclass
+class TiltEvent:
+    """Set the canvas tilt on a given step."""
+    step: int
+    x: float
+    y: float
+
+
+@dataclass
+class PourScript:
+    """A complete scripted pour: emissions, tilt schedule and step count."""
+    steps: int = 600
+    time_step: float = 0.016
+    seed: int = 0
+    emits: List[EmitEvent] = field(default_factory=list)
+    tilts: List[TiltEvent] = field(default_factory=list)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PourScript":
+        """Build a script from its JSON dictionary form."""
+        return cls(
+            steps=int(data.get("steps", 600)),
+            time_step=float(data.get("time_step", 0.016)),
+            seed=int(data.get("seed", 0)),
+            emits=[EmitEvent(**e) for e in data.get("emits", [])],
+            tilts=[TiltEvent(**t) for t in data.get("tilts", [])],
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the script to a JSON-serializable dictionary."""
+        return asdict(self)
+    
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PourScript":
+        """Load a script from a JSON file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+    
+    def save(self, path: Union[str, Path]):
+        """Save the script to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    def events_by_step(self) -> Dict[int, List[Union[EmitEvent, TiltEvent]]]:
+        """Group events by the step they fire on, in script order."""
+        events: Dict[int, List[Union[EmitEvent, TiltEvent]]] = {}
+        for event in [*self.tilts, *self.emits]:
+            events.setdefault(event.step, []).append(event)
+        return events
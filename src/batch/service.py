@@ -0,0 +1,517 @@
+"""Local render service: an asyncio HTTP server in front of warm simulation workers.
+
+Other tools on the same machine submit pour scripts over HTTP (TCP on
+localhost or a Unix socket) and get PNG images back. Worker processes
+initialize Taichi and warm up their kernels once at startup, so a request
+only pays for its own simulation. Jobs wait in a bounded queue; when it is
+full, new jobs are rejected rather than piling up.
+
+Endpoints:
+    POST /jobs    Pour script JSON. Responds with a stream of JSON lines:
+                  queued, started, progress..., then done (with the
+                  base64-encoded PNG) or error. 503 when the queue is full
+                  or every worker has died.
+    GET /stats    Queue depth, worker (busy, dead) and job counts, latency
+                  percentiles.
+    GET /health   Liveness check.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.batch.headless import HeadlessRunner
+from src.batch.script import PourScript
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# HTTP reason phrases for the statuses the service uses
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+           503: "Service Unavailable"}
+
+# Largest request body accepted (bytes)
+MAX_BODY = 16 * 1024 * 1024
+
+
+class ServiceError(RuntimeError):
+    """A request the service rejected, or a job that failed."""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def _worker_main(config: Config, conn, progress_interval: int):
+    """Worker process: warm up once, then simulate jobs until told to stop."""
+    runner = HeadlessRunner(config)
+    # Allocate full capacity first, so the warmed-up kernels are the ones
+    # jobs use (growing later would recompile them)
+    if config.physics.max_particles:
+        runner.particle_system.reserve(config.physics.max_particles)
+    metrics = runner.particle_system.warm_up()
+    conn.send(("ready", os.getpid(), metrics.as_dict()))
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "image.png"
+        while True:
+            message = conn.recv()
+            if message is None:
+                return
+            job_id, data = message
+            
+            def progress(step: int, steps: int):
+                if progress_interval > 0 and step % progress_interval == 0 and step < steps:
+                    conn.send(("progress", job_id, step, steps))
+            
+            try:
+                seconds = runner.run(PourScript.from_dict(data), on_step=progress)
+                runner.save(output)
+                conn.send(("done", job_id, output.read_bytes(), seconds))
+            except Exception:
+                conn.send(("error", job_id, traceback.format_exc(limit=3)))
+
+
+@dataclass
+class ServiceJob:
+    """A pour job and the events streamed back to its client."""
+    id: int
+    script: Dict[str, Any]
+    submitted: float = field(default_factory=time.perf_counter)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    events: "asyncio.Queue[Dict[str, Any]]" = field(default_factory=asyncio.Queue)
+    
+    def emit(self, event: str, **data):
+        """Queue an event for the client."""
+        self.events.put_nowait({"event": event, "job": self.id, **data})
+
+
+class ServiceWorker:
+    """A long-lived simulation process and its pipe."""
+    
+    def __init__(self, config: Config, progress_interval: int):
+        self.config = config
+        self.progress_interval = progress_interval
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn = None
+        self.pid = 0
+        self.busy = False
+        self.dead = False  # Set when the process crashed and could not be replaced
+        self.startup: Dict[str, Any] = {}
+    
+    async def start(self, executor: ThreadPoolExecutor):
+        """Spawn the process and wait until its kernels are warm."""
+        # Spawned (not forked): Taichi's runtime must not be inherited
+        context = multiprocessing.get_context("spawn")
+        self.conn, child = context.Pipe()
+        process = context.Process(
+            target=_worker_main,
+            args=(self.config, child, self.progress_interval),
+            daemon=True
+        )
+        try:
+            process.start()
+        finally:
+            child.close()
+        self.process = process
+        _, self.pid, self.startup = await self.receive(executor)
+    
+    async def receive(self, executor: ThreadPoolExecutor) -> Tuple:
+        """Wait for the worker's next message without blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(executor, self.conn.recv)
+    
+    def stop(self):
+        """Ask the process to exit and reap it."""
+        if self.process is None:
+            if self.conn is not None:
+                self.conn.close()
+            return
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+
+
+class RenderService:
+    """Queue pour jobs and run them on warm worker processes."""
+    
+    def __init__(self, config: Config, workers: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        """Initialize service (workers start with start()).
+        
+        Args:
+            config: Configuration for the workers' particle systems and the
+                service settings (config.service)
+            workers: Worker processes (defaults to config.service.workers)
+            queue_size: Jobs waiting for a worker before new ones are
+                rejected (defaults to config.service.queue_size)
+        """
+        settings = config.service
+        self.config = config
+        self.queue: "asyncio.Queue[ServiceJob]" = asyncio.Queue(queue_size or settings.queue_size)
+        self.workers = [ServiceWorker(config, settings.progress_interval)
+                        for _ in range(workers or settings.workers)]
+        self.address: Union[Tuple[str, int], str, None] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latency: Dict[str, Deque[float]] = {
+            name: deque(maxlen=settings.stats_window) for name in ("wait", "run", "total")
+        }
+        self._executor = ThreadPoolExecutor(len(self.workers), thread_name_prefix="service-pipe")
+        self._dispatchers: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        socket_path: Optional[str] = None
+    ):
+        """Warm up the workers, then start listening.
+        
+        Args:
+            host: TCP host (defaults to config.service.host)
+            port: TCP port, 0 for any free port (defaults to config.service.port)
+            socket_path: Listen on this Unix socket instead of TCP
+                (defaults to config.service.socket_path)
+        """
+        settings = self.config.service
+        await asyncio.gather(*(worker.start(self._executor) for worker in self.workers))
+        self._dispatchers = [asyncio.create_task(self._dispatch(worker))
+                             for worker in self.workers]
+        socket_path = settings.socket_path if socket_path is None else socket_path
+        if socket_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=socket_path)
+            self.address = socket_path
+        else:
+            self._server = await asyncio.start_server(
+                self._handle,
+                settings.host if host is None else host,
+                settings.port if port is None else port
+            )
+            self.address = self._server.sockets[0].getsockname()[:2]
+    
+    async def stop(self):
+        """Stop listening and shut the workers down (queued jobs are dropped)."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        for worker in self.workers:
+            worker.stop()
+        self._executor.shutdown()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+    
+    async def serve_forever(self):
+        """Serve until cancelled."""
+        await self._server.serve_forever()
+    
+    def submit(self, script: PourScript) -> ServiceJob:
+        """Queue a pour job.
+        
+        Raises:
+            ServiceError: If the queue is full or no worker is left (status 503)
+        """
+        if all(worker.dead for worker in self.workers):
+            self.rejected += 1
+            raise ServiceError(503, "No live workers")
+        job = ServiceJob(self.submitted + self.rejected, script.to_dict())
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ServiceError(503, f"Queue full ({self.queue.maxsize} jobs waiting)")
+        self.submitted += 1
+        job.emit("queued", position=self.queue.qsize())
+        return job
+    
+    async def _dispatch(self, worker: ServiceWorker):
+        """Feed queued jobs to one worker, one at a time, until it dies."""
+        while not worker.dead:
+            job = await self.queue.get()
+            worker.busy = True
+            try:
+                await self._run(worker, job)
+            finally:
+                worker.busy = False
+                self.queue.task_done()
+        if all(other.dead for other in self.workers):
+            # Nothing will run the waiting jobs
+            while not self.queue.empty():
+                job = self.queue.get_nowait()
+                self.failed += 1
+                job.emit("error", error="No live workers")
+                self.queue.task_done()
+    
+    async def _run(self, worker: ServiceWorker, job: ServiceJob):
+        """Run one job on a worker, relaying its events."""
+        job.started = time.perf_counter()
+        job.emit("started", worker=worker.pid)
+        try:
+            worker.conn.send((job.id, job.script))
+            while True:
+                message = await worker.receive(self._executor)
+                if message[0] == "progress":
+                    job.emit("progress", step=message[2], steps=message[3])
+                    continue
+                job.finished = time.perf_counter()
+                if message[0] == "done":
+                    self.completed += 1
+                    self._record(job)
+                    job.emit("done", simulate_seconds=message[3],
+                             image=base64.b64encode(message[2]).decode("ascii"))
+                else:
+                    self.failed += 1
+                    job.emit("error", error=message[2])
+                return
+        except (EOFError, OSError):
+            # The worker died (e.g. a crash inside Taichi): fail the job and
+            # replace the worker
+            self.failed += 1
+            job.emit("error", error=f"Worker process {worker.pid} died")
+            await self._restart(worker)
+    
+    async def _restart(self, worker: ServiceWorker):
+        """Replace a dead worker's process, or mark the worker dead if it cannot be."""
+        attempts = self.config.service.restart_attempts
+        for attempt in range(1, attempts + 1):
+            worker.stop()
+            try:
+                await worker.start(self._executor)
+                return
+            except Exception:
+                logger.exception("Restarting worker failed (attempt %d of %d)", attempt, attempts)
+        worker.stop()
+        worker.dead = True
+        logger.error("Worker gave up after %d failed restarts", attempts)
+    
+    def _record(self, job: ServiceJob):
+        """Add a finished job's latencies (ms) to the rolling windows."""
+        self.latency["wait"].append((job.started - job.submitted) * 1000.0)
+        self.latency["run"].append((job.finished - job.started) * 1000.0)
+        self.latency["total"].append((job.finished - job.submitted) * 1000.0)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, worker and job counts, and latency percentiles (ms)."""
+        latency = {}
+        for name, samples in self.latency.items():
+            if samples:
+                p50, p95, p99 = np.percentile(np.fromiter(samples, dtype=np.float64), (50, 95, 99))
+                latency[name] = {"p50": p50, "p95": p95, "p99": p99}
+        return {
+            "queue_depth": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "workers": len(self.workers),
+            "busy_workers": sum(worker.busy for worker in self.workers),
+            "dead_workers": sum(worker.dead for worker in self.workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency_ms": latency,
+        }
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP request (one per connection)."""
+        try:
+            method, path, body = await _read_request(reader)
+            if method == "GET" and path == "/health":
+                await _respond_json(writer, 200, {"status": "ok"})
+            elif method == "GET" and path == "/stats":
+                await _respond_json(writer, 200, self.stats())
+            elif method == "POST" and path == "/jobs":
+                await self._handle_job(writer, body)
+            else:
+                await _respond_json(writer, 404, {"error": f"No route for {method} {path}"})
+        except ServiceError as e:
+            await _respond_json(writer, e.status, {"error": e.message})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        finally:
+            writer.close()
+    
+    async def _handle_job(self, writer: asyncio.StreamWriter, body: bytes):
+        """Queue a job and stream its events as JSON lines."""
+        try:
+            script = PourScript.from_dict(json.loads(body))
+        except (ValueError, TypeError, KeyError) as e:
+            raise ServiceError(400, f"Invalid pour script: {e}")
+        job = self.submit(script)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        while True:
+            event = await job.events.get()
+            line = json.dumps(event).encode() + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+            if event["event"] in ("done", "error"):
+                break
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """Read an HTTP request's method, path and body."""
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise ServiceError(400, "Malformed request line")
+    headers = await _read_headers(reader)
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise ServiceError(400, "Invalid Content-Length")
+    if length > MAX_BODY:
+        raise ServiceError(413, f"Body larger than {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return request_line[0], request_line[1], body
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    """Read header lines up to the blank line (names lowercased)."""
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            return headers
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _respond_json(writer: asyncio.StreamWriter, status: int, data: Dict[str, Any]):
+    """Send a complete JSON response."""
+    body = json.dumps(data).encode()
+    writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+class ServiceClient:
+    """Async client for a local render service."""
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, socket_path: str = ""):
+        """Initialize client.
+        
+        Args:
+            host: Service TCP host
+            port: Service TCP port
+            socket_path: Connect to this Unix socket instead of TCP
+        """
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+    
+    async def _request(self, method: str, path: str, body: bytes = b""):
+        """Send a request and read the response status and headers."""
+        if self.socket_path:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers = await _read_headers(reader)
+        return status, headers, reader, writer
+    
+    async def _json(self, method: str, path: str) -> Dict[str, Any]:
+        """Make a request with a plain JSON response."""
+        status, headers, reader, writer = await self._request(method, path)
+        try:
+            data = json.loads(await reader.readexactly(int(headers["content-length"])))
+        finally:
+            writer.close()
+        if status != 200:
+            raise ServiceError(status, data.get("error", ""))
+        return data
+    
+    async def stats(self) -> Dict[str, Any]:
+        """Get the service's queue and latency statistics."""
+        return await self._json("GET", "/stats")
+    
+    async def health(self) -> Dict[str, Any]:
+        """Check that the service is up."""
+        return await self._json("GET", "/health")
+    
+    async def render(
+        self,
+        script: Union[PourScript, Dict[str, Any]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[bytes, Dict[str, Any]]:
+        """Submit a pour and wait for its image.
+        
+        Args:
+            script: Pour script (or its dictionary form)
+            on_event: Called with every streamed event (queued, started, progress)
+        
+        Returns:
+            Tuple of (PNG bytes, final event)
+        
+        Raises:
+            ServiceError: If the job was rejected or failed
+        """
+        data = script.to_dict() if isinstance(script, PourScript) else script
+        status, headers, reader, writer = await self._request(
+            "POST", "/jobs", json.dumps(data).encode()
+        )
+        try:
+            if status != 200:
+                error = json.loads(await reader.readexactly(int(headers["content-length"])))
+                raise ServiceError(status, error.get("error", ""))
+            while True:
+                size = int(await reader.readline(), 16)
+                if size == 0:
+                    raise ServiceError(500, "Stream ended without a result")
+                event = json.loads(await reader.readexactly(size))
+                await reader.readline()  # Chunk terminator
+                if event["event"] == "done":
+                    return base64.b64decode(event.pop("image")), event
+                if event["event"] == "error":
+                    raise ServiceError(500, event["error"])
+                if on_event is not None:
+                    on_event(event)
+        finally:
+            writer.close()
+
+
+async def serve(config: Config, on_ready: Optional[Callable[[RenderService], None]] = None):
+    """Run a render service until cancelled.
+    
+    Args:
+        config: Configuration (service settings in config.service)
+        on_ready: Called once the workers are warm and the service is listening
+    """
+    service = RenderService(config)
+    await service.start()
+    try:
+        if on_ready is not None:
+            on_ready(service)
+        await service.serve_forever()
+    finally:
+        await service.stop()
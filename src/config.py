@@ -15,10 +15,32 @@ class CanvasConfig:
 @dataclass
 class PhysicsConfig:
     """Physics simulation configuration."""
-    max_particles: int = 10000
+    max_particles: int = 10000  # Upper limit on particles (0 = no limit)
+    initial_capacity: int = 1024  # Particle slots allocated at startup; doubled on demand
     gravity: float = 9.8
     friction: float = 0.98
     time_step: float = 0.016  # 16ms ~= 60 FPS
+    max_steps_per_frame: int = 4  # Fixed steps simulated per rendered frame (cap)
+    cfl_number: float = 0.4  # Max fraction of the smoothing radius moved per substep
+    max_substeps: int = 8
+    backend: str = "auto"  # "auto" (GPU, falling back to CPU), "gpu" or "cpu"
+    retire_off_canvas: bool = True  # Paint dripping off an edge is removed
+    compact_interval: int = 120  # Steps between slot compactions (0 = only when full)
+    spatial_sort_interval: int = 0  # Steps between spatial reorders of particle memory (0 = off)
+    spatial_sort_order: str = "morton"  # Sort key: "morton" (Z-order of cells) or "cell" (grid order)
+    sleep_speed: float = 0.5  # Particles slower than this (pixels/s) may sleep (0 = never)
+    sleep_steps: int = 30  # Steps below sleep_speed before a particle sleeps
+    random_seed: int = 0
+    num_canvases: int = 1  # Independent canvases simulated together (batch runs)
+    max_materials: int = 1024  # Distinct paints (color, density, viscosity) in the material table
+    deterministic: bool = True  # Fixed neighbor order so runs replay bit-for-bit
+    warm_up: bool = False  # Compile all kernels when the particle system is created
+    offline_cache: bool = True  # Persist compiled kernels between runs
+    kernel_cache_dir: str = ""  # Offline cache location ("" for Taichi's default)
+    click_particles: int = 300  # Particles poured by a single click
+    pour_flow_rate: float = 1500.0  # Particles per second while the mouse button is held
+    pour_spacing: float = 4.0  # Max distance between pour points along a drag (pixels)
+    emit_budget: int = 2000  # Max particles emitted per frame (0 = unlimited); excess waits
     
     # Viscosity presets (cP - centipoise)
     viscosity_very_thin: float = 100.0  # Dutch pour
@@ -33,6 +55,26 @@ class RenderConfig:
     fps: int = 60
     particle_size: int = 5
     vsync: bool = True
+    render_mode: str = "batched"  # "batched" (NumPy splat), "device" (Taichi) or "blit"
+
+
+@dataclass
+class ExportConfig:
+    """Image and recording export configuration."""
+    output_dir: str = "data/exports"
+    workers: int = 2
+    queue_size: int = 16
+    queue_policy: str = "drop"  # "drop" frames or "block" the render loop when full
+    compress_level: int = 1  # PNG zlib level (0-9, lower is faster)
+    print_scale: float = 1.0  # Output pixels per canvas pixel of headless/farm images
+    print_supersample: int = 1  # Samples per output pixel along each axis (>1 antialiases)
+    print_tile: int = 512  # Output tile edge when rendering prints (bounds memory)
+    shared_frames: str = ""  # Publish frames to this shared-memory ring ("" = off)
+    shared_frames_slots: int = 4  # Frames kept in the ring before the oldest is overwritten
+    shared_frames_particles: bool = True  # Also publish particle positions and colors
+    shared_frames_interval: int = 1  # Headless steps between published frames (0 = none)
+    recipe_dir: str = "data/recipes"
+    checkpoint_dir: str = "data/checkpoints"
 
 
 @dataclass
@@ -41,6 +83,21 @@ class UIConfig:
     window_title: str = "Digital Paint Pouring Simulator"
     show_fps: bool = True
     show_particle_count: bool = True
+    show_profiler: bool = False  # Per-stage frame timing overlay (toggle with P)
+    profiler_window: int = 240  # Frames in the profiler's rolling percentiles
+
+
+@dataclass
+class ServiceConfig:
+    """Local render service configuration."""
+    host: str = "127.0.0.1"
+    port: int = 8765
+    socket_path: str = ""  # Listen on this Unix socket instead of TCP
+    workers: int = 2  # Warm simulation worker processes
+    queue_size: int = 32  # Jobs waiting for a worker before new ones are rejected
+    progress_interval: int = 30  # Steps between progress events (0 = none)
+    restart_attempts: int = 3  # Tries to replace a crashed worker before giving it up
+    stats_window: int = 256  # Jobs in the rolling latency percentiles
 
 
 class Config:
@@ -50,7 +107,9 @@ class Config:
         self.canvas = CanvasConfig()
         self.physics = PhysicsConfig()
         self.render = RenderConfig()
+        self.export = ExportConfig()
         self.ui = UIConfig()
+        self.service = ServiceConfig()
     
     # Color presets (R, G, B, A) - normalized 0-1
     COLOR_PRESETS = {
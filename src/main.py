@@ -1,31 +1,300 @@
 """Main entry point for the paint pouring simulator."""
 
+import argparse
 import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
 import pygame
 from src.config import config
-from src.ui.main_window import PaintPouringWindow
 
 
-def main() -> int:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv)
+    
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main",
+        description="Digital paint pouring simulator"
+    )
+    parser.add_argument(
+        "--headless",
+        metavar="SCRIPT",
+        nargs="+",
+        help="Run scripted pours (JSON) without a window and save the results; "
+             "several scripts are simulated together as one batch"
+    )
+    parser.add_argument(
+        "--farm",
+        metavar="PATH",
+        nargs="+",
+        help="Render scripted pours (JSON files or directories of them) in "
+             "parallel worker processes"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for --farm (default: CPU count) or --serve "
+             "(default: config setting)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the local render service: pour jobs submitted over HTTP are "
+             "simulated by warm worker processes"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="TCP port for --serve (default: config setting)"
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Serve on a Unix socket instead of TCP"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="data/exports/farm",
+        help="Image directory for --farm (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="RECIPE",
+        help="Play back a recorded session recipe (.jsonl or .jsonl.gz)"
+    )
+    parser.add_argument(
+        "--no-window",
+        action="store_true",
+        help="With --replay, replay without a window and save the result"
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="CHECKPOINT",
+        help="Resume the window from a saved checkpoint (.npz or directory)"
+    )
+    parser.add_argument(
+        "--output",
+        default="data/exports/pour.png",
+        help="Output image for headless runs and replays (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--print-scale",
+        type=float,
+        metavar="SCALE",
+        help="Save headless, farm and replay images at SCALE times the canvas "
+             "size, rendered in tiles (e.g. 10 for 8000x6000 prints)"
+    )
+    parser.add_argument(
+        "--supersample",
+        type=int,
+        metavar="N",
+        help="Antialias saved images with N x N samples per pixel"
+    )
+    parser.add_argument(
+        "--shared-frames",
+        metavar="NAME",
+        help="Publish rendered frames and particle arrays to the shared-memory "
+             "ring NAME for other local processes (window, headless and replay)"
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        help="Override the script's step count"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "gpu", "cpu"],
+        help="Taichi backend (default: config setting)"
+    )
+    args = parser.parse_args(argv)
+    if args.shared_frames and (args.farm or args.serve):
+        parser.error("--shared-frames does not apply to --farm or --serve")
+    if args.no_window and not args.replay:
+        parser.error("--no-window needs --replay (use --headless for scripted pours)")
+    return args
+
+
+def run_headless(args: argparse.Namespace) -> int:
+    """Run a scripted pour headlessly.
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code
+    """
+    from src.batch import PourScript, run_pour, run_pours
+    
+    scripts = [PourScript.load(path) for path in args.headless]
+    if args.steps is not None:
+        for script in scripts:
+            script.steps = args.steps
+    
+    if len(scripts) == 1:
+        outputs = [args.output]
+        elapsed = run_pour(config, scripts[0], args.output)
+    else:
+        # pour.png -> pour_0.png, pour_1.png, ...
+        output = Path(args.output)
+        outputs = [output.with_name(f"{output.stem}_{k}{output.suffix}")
+                   for k in range(len(scripts))]
+        elapsed = run_pours(config, scripts, outputs)
+    
+    steps = max(script.steps for script in scripts)
+    rate = steps / elapsed if elapsed > 0 else float("inf")
+    print(f"Simulated {len(scripts)} pour(s), {steps} steps in {elapsed:.2f}s "
+          f"({rate:.0f} steps/s)")
+    for output in outputs:
+        print(f"Saved {output}")
+    return 0
+
+
+def run_farm(args: argparse.Namespace) -> int:
+    """Render scripted pours across worker processes.
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code (1 if any job failed)
+    """
+    from src.batch import JobResult, run_farm as farm
+    
+    def report(result: JobResult, done: int, total: int):
+        name = Path(result.script).name
+        if result.ok:
+            print(f"[{done}/{total}] {name}: simulated {result.simulate_seconds:.2f}s, "
+                  f"total {result.total_seconds:.2f}s, "
+                  f"{result.memory_bytes / 2**20:.1f} MiB -> {result.output}")
+        else:
+            print(f"[{done}/{total}] {name}: FAILED\n{result.error}", file=sys.stderr)
+    
+    start = time.perf_counter()
+    results = farm(config, args.farm, args.output_dir, args.workers, on_result=report)
+    failed = sum(not result.ok for result in results)
+    print(f"Rendered {len(results) - failed}/{len(results)} pours in "
+          f"{time.perf_counter() - start:.2f}s")
+    return 1 if failed else 0
+
+
+def run_service(args: argparse.Namespace) -> int:
+    """Run the local render service until interrupted.
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code
+    """
+    import asyncio
+    from src.batch import serve
+    
+    if args.workers:
+        config.service.workers = args.workers
+    if args.port is not None:
+        config.service.port = args.port
+    if args.socket:
+        config.service.socket_path = args.socket
+    
+    def ready(service):
+        print(f"Render service listening on {service.address} "
+              f"with {len(service.workers)} warm worker(s)")
+    
+    try:
+        asyncio.run(serve(config, on_ready=ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def run_replay(args: argparse.Namespace) -> int:
+    """Replay a recorded session without a window.
+    
+    Args:
+        args: Parsed command line arguments
+    
+    Returns:
+        Exit code
+    """
+    from src.batch import Recipe, replay_recipe
+    
+    recipe = Recipe.load(args.replay)
+    elapsed = replay_recipe(config, recipe, args.output)
+    rate = recipe.steps / elapsed if elapsed > 0 else float("inf")
+    print(f"Replayed {len(recipe.actions)} actions over {recipe.steps} steps "
+          f"in {elapsed:.2f}s ({rate:.0f} steps/s)")
+    print(f"Saved {args.output}")
+    return 0
+
+
+def run_window(replay: Optional[str] = None, resume: Optional[str] = None) -> int:
+    """Open the interactive window.
+    
+    Args:
+        replay: Recipe file to play back in the window
+        resume: Checkpoint to restore before starting
+    
+    Returns:
+        Exit code
+    """
+    from src.batch import Recipe
+    from src.ui.main_window import PaintPouringWindow
+    
+    recipe = None
+    if replay:
+        recipe = Recipe.load(replay)
+        recipe.configure(config)
+    window = PaintPouringWindow(config, replay=recipe)
+    if resume:
+        window.load_checkpoint(resume)
+    window.run()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Initialize and run the application.
     
+    Args:
+        argv: Argument list (defaults to sys.argv)
+    
     Returns:
         Exit code (0 for success, non-zero for error)
     """
+    args = parse_args(argv)
+    if args.backend:
+        config.physics.backend = args.backend
+    if args.print_scale is not None:
+        config.export.print_scale = args.print_scale
+    if args.supersample is not None:
+        config.export.print_supersample = args.supersample
+    if args.shared_frames:
+        config.export.shared_frames = args.shared_frames
+    
     try:
         # Initialize Pygame
         pygame.init()
         
-        # Create and run main window
-        window = PaintPouringWindow(config)
-        window.run()
-        
-        return 0
-        
+        if args.headless:
+            return run_headless(args)
+        if args.farm:
+            return run_farm(args)
+        if args.serve:
+            return run_service(args)
+        if args.replay and args.no_window:
+            return run_replay(args)
+        return run_window(args.replay, args.resume)
+    
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
-        
+    
     finally:
         pygame.quit()
 
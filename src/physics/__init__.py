@@ -4,7 +4,12 @@ Contains particle system, fluid dynamics, and canvas mechanics.
 """
 
 from src.physics.particle_system import ParticleSystem
-from src.physics.fluid_dynamics import FluidDynamics
+from src.physics.fluid_dynamics import FluidDynamics, FlowTable
 from src.physics.canvas import Canvas
+from src.physics.checkpoint import save_checkpoint, load_checkpoint, read_checkpoint
+from src.physics.backend import StartupMetrics, init_backend
+from src.physics.emitter import Emission, Emitter, Stroke
 
-__all__ = ["ParticleSystem", "FluidDynamics", "Canvas"]
+__all__ = ["ParticleSystem", "FluidDynamics", "FlowTable", "Canvas",
+           "save_checkpoint", "load_checkpoint", "read_checkpoint",
+           "StartupMetrics", "init_backend", "Emission", "Emitter", "Stroke"]
@@ -0,0 +1,126 @@
+"""Explicit Taichi backend initialization with an offline kernel cache.
+
+Taichi is initialized when the first ParticleSystem is created (not at
+import time), through init_backend. The result of resolving "auto" is
+remembered, so a process whose GPU is unavailable only pays for the failed
+GPU attempt once. Compiled kernels are persisted in Taichi's offline cache,
+so later processes (headless workers, test runs) load them instead of
+compiling.
+"""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import taichi as ti
+
+ARCHS = {"cpu": ti.cpu, "gpu": ti.gpu}
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "taichi" / "ticache"
+
+# Backend chosen for "auto" in this process (None until first resolved)
+_auto_choice: Optional[str] = None
+
+
+@dataclass
+class StartupMetrics:
+    """Where startup time went, in seconds."""
+    backend: str = ""
+    init_seconds: float = 0.0
+    allocation_seconds: float = 0.0
+    warm_up_seconds: float = 0.0
+    kernels_warmed: int = 0
+    offline_cache: bool = False
+    cache_dir: str = ""
+    cache_files: int = 0
+    
+    @property
+    def cache_warm(self) -> bool:
+        """Whether the offline cache already held kernels at startup.
+        
+        Taichi writes newly compiled kernels to the cache when the runtime
+        shuts down, so a cold start only benefits the next process.
+        """
+        return self.offline_cache and self.cache_files > 0
+    
+    def as_dict(self) -> Dict[str, object]:
+        """Metrics as a plain dictionary (e.g. for JSON reports)."""
+        return {**self.__dict__, "cache_warm": self.cache_warm}
+    
+    def summary(self) -> str:
+        """One-line human-readable summary."""
+        text = (f"Startup ({self.backend}): init {self.init_seconds * 1000:.0f} ms, "
+                f"fields {self.allocation_seconds * 1000:.0f} ms")
+        if self.kernels_warmed:
+            cache = "cached" if self.cache_warm else "compiled"
+            text += (f", warm-up {self.warm_up_seconds * 1000:.0f} ms "
+                     f"({self.kernels_warmed} kernels, {cache})")
+        return text
+
+
+def count_cache_files(cache_dir: Optional[str]) -> int:
+    """Count entries in the offline kernel cache directory."""
+    path = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+    if not path.exists():
+        return 0
+    return sum(1 for p in path.rglob("*") if p.is_file())
+
+
+def current_backend() -> str:
+    """Get the architecture family ("cpu" or "gpu") Taichi is running on.
+    
+    Taichi silently falls back to the CPU when no GPU is usable, so this
+    reports the runtime's actual architecture rather than the request.
+    """
+    arch = ti.lang.impl.current_cfg().arch
+    return "cpu" if arch in (ti.x64, ti.arm64) else "gpu"
+
+
+def init_backend(
+    backend: str = "auto",
+    offline_cache: bool = True,
+    cache_dir: str = "",
+    random_seed: int = 0,
+    metrics: Optional[StartupMetrics] = None
+) -> str:
+    """Initialize (or re-initialize) the Taichi runtime.
+    
+    Every call resets the runtime, so fields allocated afterwards get the
+    same layout in every process and their kernels hit the offline cache.
+    
+    Args:
+        backend: "cpu", "gpu" or "auto" (GPU, falling back to CPU)
+        offline_cache: Persist compiled kernels between processes
+        cache_dir: Offline cache directory ("" for Taichi's default)
+        random_seed: Seed for ti.random
+        metrics: Startup metrics to record the init time and cache state in
+    
+    Returns:
+        "CPU" or "GPU"
+    """
+    global _auto_choice
+    options = {"offline_cache": offline_cache, "random_seed": random_seed}
+    if cache_dir:
+        options["offline_cache_file_path"] = cache_dir
+    
+    start = time.perf_counter()
+    if backend == "auto":
+        if _auto_choice is None:
+            try:
+                ti.init(arch=ti.gpu, **options)
+            except Exception:
+                ti.init(arch=ti.cpu, **options)
+            _auto_choice = current_backend()
+        else:
+            ti.init(arch=ARCHS[_auto_choice], **options)
+    else:
+        ti.init(arch=ARCHS[backend], **options)
+    chosen = current_backend()
+    
+    if metrics is not None:
+        metrics.backend = chosen.upper()
+        metrics.init_seconds = time.perf_counter() - start
+        metrics.offline_cache = offline_cache
+        metrics.cache_dir = cache_dir or str(DEFAULT_CACHE_DIR)
+        metrics.cache_files = count_cache_files(cache_dir)
+    return chosen.upper()
@@ -0,0 +1,119 @@
+"""Checkpoint and restore of the full particle simulation state.
+
+Two on-disk formats are supported:
+
+* ``*.npz``: a single compressed archive, compact for moving between machines.
+* any other path: a directory holding ``state.json`` plus one raw ``.npy``
+  file per particle field, written and read through memory maps so large
+  pours suspend and resume at disk speed.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Tuple, Union
+
+import numpy as np
+
+from src.physics.particle_system import ParticleSystem
+
+CHECKPOINT_VERSION = 2
+STATE_FILE = "state.json"
+
+
+def save_checkpoint(particle_system: ParticleSystem, path: Union[str, Path]) -> Path:
+    """Save the simulation state.
+    
+    Args:
+        particle_system: Particle system to save
+        path: ``.npz`` archive or checkpoint directory
+    
+    Returns:
+        The written path
+    
+    Raises:
+        FileExistsError: If a directory path holds files other than a checkpoint's
+    """
+    path = Path(path)
+    scalars, arrays = particle_system.get_state()
+    scalars = {"version": CHECKPOINT_VERSION, **scalars}
+    
+    if path.suffix == ".npz":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, state=np.array(json.dumps(scalars)), **arrays)
+        return path
+    
+    # Written into a sibling directory and swapped in whole, so a crash never
+    # leaves a state.json beside arrays from another save
+    if path.exists() and any(
+        entry.name != STATE_FILE and entry.suffix != ".npy" for entry in path.iterdir()
+    ):
+        raise FileExistsError(f"{path} exists and is not a checkpoint directory")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+    try:
+        for name, data in arrays.items():
+            out = np.lib.format.open_memmap(
+                staging / f"{name}.npy", mode="w+", dtype=data.dtype, shape=data.shape
+            )
+            out[...] = data
+            out.flush()
+            del out
+        # Written last so a partial checkpoint is never mistaken for a valid one
+        with open(staging / STATE_FILE, "w") as f:
+            json.dump(scalars, f, indent=2)
+        if path.exists():
+            previous = Path(tempfile.mkdtemp(prefix=f".{path.name}.old.", dir=path.parent))
+            os.replace(path, previous / path.name)
+            os.replace(staging, path)
+            shutil.rmtree(previous)
+        else:
+            os.replace(staging, path)
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging)
+    return path
+
+
+def read_checkpoint(path: Union[str, Path]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Read a checkpoint without applying it.
+    
+    Args:
+        path: ``.npz`` archive or checkpoint directory
+    
+    Returns:
+        Tuple of (scalars, arrays); directory arrays are read-only memory maps
+    
+    Raises:
+        ValueError: If the checkpoint version is not supported
+    """
+    path = Path(path)
+    if path.suffix == ".npz":
+        with np.load(path) as archive:
+            scalars = json.loads(str(archive["state"]))
+            arrays = {name: archive[name] for name in archive.files if name != "state"}
+    else:
+        with open(path / STATE_FILE) as f:
+            scalars = json.load(f)
+        arrays = {
+            npy.stem: np.load(npy, mmap_mode="r")
+            for npy in path.glob("*.npy")
+        }
+    
+    if scalars.get("version", 0) > CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {scalars['version']}")
+    return scalars, arrays
+
+
+def load_checkpoint(particle_system: ParticleSystem, path: Union[str, Path]):
+    """Restore the simulation state into a particle system.
+    
+    Args:
+        particle_system: Particle system to restore into (its capacity must
+            hold the checkpoint's particles)
+        path: ``.npz`` archive or checkpoint directory
+    """
+    scalars, arrays = read_checkpoint(path)
+    particle_system.set_state(scalars, arrays)
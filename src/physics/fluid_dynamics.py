@@ -1,6 +1,7 @@
 """Fluid dynamics calculations for paint behavior."""
 
 import numpy as np
+from numpy.typing import ArrayLike
 from typing import Tuple
 
 
@@ -16,6 +17,63 @@ class FluidDynamics:
         self.rest_density = 1000.0
         self.gas_constant = 2000.0
         self.viscosity_coefficient = 0.01
+        self.particle_mass = 9000.0
+        self._flow_tables = {}
+    
+    def kernel_coefficients(self) -> Tuple[float, float, float]:
+        """Get normalization constants of the 2D SPH smoothing kernels.
+        
+        Returns:
+            Tuple of (poly6, spiky gradient, viscosity laplacian) coefficients
+        """
+        h = self.smoothing_radius
+        poly6 = 4.0 / (np.pi * h ** 8)
+        spiky_grad = -30.0 / (np.pi * h ** 5)
+        viscosity_laplacian = 40.0 / (np.pi * h ** 5)
+        return poly6, spiky_grad, viscosity_laplacian
+    
+    def axis_flow(
+        self,
+        tilt: ArrayLike,
+        viscosity: ArrayLike,
+        gravity: ArrayLike = 9.8
+    ) -> np.ndarray:
+        """Calculate expected flow speed along one tilted axis.
+        
+        Broadcasts over its arguments, so whole grids of tilts and
+        viscosities are evaluated in one call.
+        
+        Args:
+            tilt: Tilt angle around the axis (degrees)
+            viscosity: Paint viscosity (cP)
+            gravity: Gravitational acceleration (m/s²)
+        
+        Returns:
+            Flow speed with the broadcast shape of the arguments
+        """
+        viscosity_factor = 1.0 / (1.0 + np.asarray(viscosity) * 0.001)
+        return gravity * np.sin(np.radians(tilt)) * viscosity_factor
+    
+    def flow_velocity(
+        self,
+        tilt_x: ArrayLike,
+        tilt_y: ArrayLike,
+        viscosity: ArrayLike,
+        gravity: ArrayLike = 9.8
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Calculate expected flow velocities for arrays of tilts and viscosities.
+        
+        Args:
+            tilt_x: Tilt angles around X axis (degrees)
+            tilt_y: Tilt angles around Y axis (degrees)
+            viscosity: Paint viscosities (cP)
+            gravity: Gravitational acceleration (m/s²)
+        
+        Returns:
+            Tuple of (vx, vy) arrays with the broadcast shape of the arguments
+        """
+        tilt_x, tilt_y, viscosity = np.broadcast_arrays(tilt_x, tilt_y, viscosity)
+        return self.axis_flow(tilt_x, viscosity, gravity), self.axis_flow(tilt_y, viscosity, gravity)
     
     def calculate_flow_velocity(
         self,
@@ -35,15 +93,112 @@ class FluidDynamics:
         Returns:
             Tuple of (vx, vy) velocity components
         """
-        tilt_x_rad = np.radians(tilt_x)
-        tilt_y_rad = np.radians(tilt_y)
+        vx = self.axis_flow(tilt_x, viscosity, gravity)
+        vy = self.axis_flow(tilt_y, viscosity, gravity)
+        return float(vx), float(vy)
+    
+    def flow_table(
+        self,
+        gravity: float = 9.8,
+        tilt_range: Tuple[float, float] = (-45.0, 45.0),
+        viscosity_range: Tuple[float, float] = (0.0, 2000.0),
+        resolution: Tuple[int, int] = (181, 201)
+    ) -> "FlowTable":
+        """Get a precomputed flow lookup table, building it on first use.
         
-        gravity_x = gravity * np.sin(tilt_x_rad)
-        gravity_y = gravity * np.sin(tilt_y_rad)
+        Tables are cached per set of arguments.
         
-        viscosity_factor = 1.0 / (1.0 + viscosity * 0.001)
+        Args:
+            gravity: Gravitational acceleration (m/s²)
+            tilt_range: Covered tilt angles (degrees)
+            viscosity_range: Covered viscosities (cP)
+            resolution: Samples along the (tilt, viscosity) axes
         
-        vx = gravity_x * viscosity_factor
-        vy = gravity_y * viscosity_factor
+        Returns:
+            Lookup table for flow velocity queries
+        """
+        key = (gravity, tuple(tilt_range), tuple(viscosity_range), tuple(resolution))
+        table = self._flow_tables.get(key)
+        if table is None:
+            table = self._flow_tables[key] = FlowTable(self, *key)
+        return table
+
+
+class FlowTable:
+    """Flow velocities precomputed over (tilt_x, tilt_y, viscosity).
+    
+    Flow along each axis depends only on that axis's tilt and the viscosity,
+    so the 3D domain is stored as one float32 (tilt, viscosity) grid shared by
+    both axes and queried with bilinear interpolation. Queries outside the
+    covered ranges are clamped to its edges.
+    """
+    
+    def __init__(
+        self,
+        fluid: FluidDynamics,
+        gravity: float,
+        tilt_range: Tuple[float, float],
+        viscosity_range: Tuple[float, float],
+        resolution: Tuple[int, int]
+    ):
+        """Build lookup table.
         
-        return vx, vy
+        Args:
+            fluid: Fluid model to sample
+            gravity: Gravitational acceleration (m/s²)
+            tilt_range: Covered tilt angles (degrees)
+            viscosity_range: Covered viscosities (cP)
+            resolution: Samples along the (tilt, viscosity) axes
+        """
+        self.tilt_range = tilt_range
+        self.viscosity_range = viscosity_range
+        tilts = np.linspace(*tilt_range, resolution[0])
+        viscosities = np.linspace(*viscosity_range, resolution[1])
+        self.table = fluid.axis_flow(
+            tilts[:, None], viscosities[None, :], gravity
+        ).astype(np.float32)
+        # Flattened copy for single-index gathers
+        self._flat = self.table.ravel()
+        self._tilt_scale = (resolution[0] - 1) / (tilt_range[1] - tilt_range[0])
+        self._viscosity_scale = (resolution[1] - 1) / (viscosity_range[1] - viscosity_range[0])
+    
+    def _grid_coordinates(self, values: ArrayLike, lower: float, scale: float, size: int):
+        """Get lower cell indices and interpolation weights along one axis."""
+        position = (np.asarray(values, dtype=np.float32) - np.float32(lower)) * np.float32(scale)
+        np.clip(position, 0, size - 1, out=position)
+        cell = np.minimum(np.floor(position), size - 2)
+        return cell.astype(np.intp), position - cell
+    
+    def _axis(self, tilt: ArrayLike, row_offset: np.ndarray, viscosity_weight: np.ndarray) -> np.ndarray:
+        """Interpolate flow along one axis, given the viscosity coordinates."""
+        rows, cols = self.table.shape
+        index, weight = self._grid_coordinates(tilt, self.tilt_range[0], self._tilt_scale, rows)
+        flat = index * cols + row_offset
+        low = self._flat[flat] + viscosity_weight * (self._flat[flat + 1] - self._flat[flat])
+        flat += cols
+        high = self._flat[flat] + viscosity_weight * (self._flat[flat + 1] - self._flat[flat])
+        return low + weight * (high - low)
+    
+    def lookup(
+        self,
+        tilt_x: ArrayLike,
+        tilt_y: ArrayLike,
+        viscosity: ArrayLike
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Interpolate flow velocities for arrays of tilts and viscosities.
+        
+        Args:
+            tilt_x: Tilt angles around X axis (degrees)
+            tilt_y: Tilt angles around Y axis (degrees)
+            viscosity: Paint viscosities (cP)
+        
+        Returns:
+            Tuple of float32 (vx, vy) arrays with the broadcast shape of the arguments
+        """
+        tilt_x, tilt_y, viscosity = np.broadcast_arrays(tilt_x, tilt_y, viscosity)
+        # Viscosity coordinates are shared by both axes
+        column, viscosity_weight = self._grid_coordinates(
+            viscosity, self.viscosity_range[0], self._viscosity_scale, self.table.shape[1]
+        )
+        return (self._axis(tilt_x, column, viscosity_weight),
+                self._axis(tilt_y, column, viscosity_weight))
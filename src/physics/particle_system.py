@@ -1,9 +1,88 @@
 """Taichi-based particle system for paint simulation."""
 
+import time
+
 import taichi as ti
 import numpy as np
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 from src.config import Config
+from src.physics.backend import StartupMetrics, init_backend
+from src.physics.fluid_dynamics import FluidDynamics
+from src.physics.timestep import cfl_substeps
+
+
+class ParticleReadback:
+    """Caller-owned host buffers that particle data is copied into.
+    
+    Buffers are allocated once at full capacity and reused every frame.
+    Only the first n active particles are copied, and colors (immutable
+    after emission) are only re-read when slots have been reused.
+    """
+    
+    def __init__(self, capacity: int):
+        """Initialize readback buffers.
+        
+        Args:
+            capacity: Maximum number of particles the buffers can hold
+        """
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.colors = np.zeros((capacity, 4), dtype=np.float32)
+        self.count = 0
+        
+        # Color bookkeeping: rows [0, colors_valid) hold current colors
+        # as of the particle system's color generation
+        self.color_generation = -1
+        self.colors_valid = 0
+    
+    def reserve(self, capacity: int):
+        """Enlarge the buffers to hold at least capacity particles."""
+        if capacity > len(self.positions):
+            self.positions = np.zeros((capacity, 2), dtype=np.float32)
+            self.colors = np.zeros((capacity, 4), dtype=np.float32)
+            self.colors_valid = 0
+
+
+def field_bytes(field) -> int:
+    """Device memory held by a Taichi field, in bytes."""
+    itemsize = np.dtype(ti.lang.util.to_numpy_type(field.dtype)).itemsize
+    components = getattr(field, "n", 1) * getattr(field, "m", 1)
+    return int(np.prod(field.shape)) * components * itemsize
+
+
+@ti.data_oriented
+class ParticleFields:
+    """The per-particle fields of one capacity, in an SNode tree of their own.
+    
+    Keeping them out of ti.root lets the particle system allocate a set of
+    another capacity, copy the live particles across and free the old set.
+    """
+    
+    def __init__(self, capacity: int, layout: Dict[str, Tuple[int, Any]], scan_block: int):
+        """Allocate fields.
+        
+        Args:
+            capacity: Particle slots
+            layout: Field name -> (components, dtype)
+            scan_block: Particles per compaction scan block (sizes the block fields)
+        """
+        self.capacity = capacity
+        self.names = [*layout, "block_count", "block_offset"]
+        builder = ti.FieldsBuilder()
+        for name, (components, dtype) in layout.items():
+            field = ti.Vector.field(components, dtype) if components > 1 else ti.field(dtype)
+            builder.dense(ti.i, capacity).place(field)
+            setattr(self, name, field)
+        num_blocks = (capacity + scan_block - 1) // scan_block
+        self.block_count = ti.field(dtype=ti.i32)
+        self.block_offset = ti.field(dtype=ti.i32)
+        builder.dense(ti.i, num_blocks).place(self.block_count)
+        builder.dense(ti.i, num_blocks + 1).place(self.block_offset)
+        self.tree = builder.finalize()
+        self.nbytes = sum(field_bytes(getattr(self, name)) for name in self.names)
+    
+    def destroy(self):
+        """Free the fields' memory (compiled kernels are invalidated)."""
+        self.tree.destroy()
 
 
 @ti.data_oriented
@@ -11,9 +90,43 @@ class ParticleSystem:
     """GPU-accelerated particle system using Taichi.
     
     Handles particle creation, physics updates, and state management.
-    Uses Smoothed Particle Hydrodynamics (SPH) principles.
+    Uses Smoothed Particle Hydrodynamics (SPH) for paint interaction, with
+    neighbors found through a uniform grid whose cell size is the smoothing
+    radius, so each step costs O(N) rather than O(N²).
+    
+    Particles that drip off the canvas or are removed are retired in place;
+    a periodic order-preserving compaction keeps live particles dense at the
+    front of the fields and frees their slots for new paint.
+    
+    Several independent canvases can share the fields (num_canvases): each
+    particle carries a canvas id, tilt and gravity are per canvas, and the
+    neighbor grid is keyed by canvas, so one update advances every canvas
+    with the same few kernel launches.
+    
+    Paint properties are stored once per distinct paint in a material table
+    (color, density and precomputed viscosity terms); each particle holds a
+    small index into it instead of its own copy.
+    
+    Per-particle memory grows on demand: fields start at initial_capacity
+    slots and are reallocated at double the size (up to max_particles) when
+    paint no longer fits, with live particles copied across in bulk.
+    shrink() and reset(shrink=True) release memory again.
     """
     
+    # Parking spot for retired particles (far outside any canvas)
+    RETIRED_POSITION = -1.0e6
+    
+    # Particles per block in the compaction prefix scan
+    SCAN_BLOCK = 256
+    
+    # Distinct paints addressable by a particle's u16 material index
+    MATERIAL_LIMIT = 65536
+    
+    # Per-particle state carried over when capacity changes (the rest is
+    # rebuilt every step)
+    MIGRATED_FIELDS = ("position", "velocity", "material", "is_active", "canvas_id",
+                       "rest_steps", "fluid_density", "pressure", "acceleration")
+    
     def __init__(self, config: Config):
         """Initialize particle system.
         
@@ -22,101 +135,757 @@ class ParticleSystem:
         """
         self.config = config
         self.max_particles = config.physics.max_particles
+        if config.physics.initial_capacity <= 0:
+            raise ValueError("initial_capacity must be positive")
+        self.initial_capacity = (min(config.physics.initial_capacity, self.max_particles)
+                                 if self.max_particles else config.physics.initial_capacity)
+        self.num_canvases = config.physics.num_canvases
+        self.max_materials = config.physics.max_materials
+        if not 0 < self.max_materials <= self.MATERIAL_LIMIT:
+            raise ValueError(f"max_materials must be in 1..{self.MATERIAL_LIMIT}")
         
-        # Initialize Taichi
-        try:
-            ti.init(arch=ti.gpu)
-            self.backend = "GPU"
-        except Exception:
-            ti.init(arch=ti.cpu)
-            self.backend = "CPU"
+        # Initialize Taichi (resets the runtime for this system's fields)
+        self.startup_metrics = StartupMetrics()
+        self.backend = init_backend(
+            config.physics.backend,
+            offline_cache=config.physics.offline_cache,
+            cache_dir=config.physics.kernel_cache_dir,
+            random_seed=config.physics.random_seed,
+            metrics=self.startup_metrics
+        )
+        allocation_start = time.perf_counter()
         
-        # Particle count
+        # Particle count (slots in use, including retired ones)
         self.num_particles = ti.field(dtype=ti.i32, shape=())
         self.num_particles[None] = 0
+        self.num_retired = ti.field(dtype=ti.i32, shape=())
+        self.num_retired[None] = 0
+        
+        # Index into the material table. 16-bit on GPUs; Taichi's CPU backend
+        # loads 16-bit fields slowly in the neighbor loops, so 32-bit there
+        self.material_dtype = ti.u16 if self.backend == "GPU" else ti.i32
         
-        # Particle properties
-        self.position = ti.Vector.field(2, dtype=ti.f32, shape=self.max_particles)
-        self.velocity = ti.Vector.field(2, dtype=ti.f32, shape=self.max_particles)
-        self.color = ti.Vector.field(4, dtype=ti.f32, shape=self.max_particles)
-        self.density = ti.field(dtype=ti.f32, shape=self.max_particles)
-        self.viscosity = ti.field(dtype=ti.f32, shape=self.max_particles)
-        self.is_active = ti.field(dtype=ti.i32, shape=self.max_particles)
+        # Per-particle fields: name -> (components, dtype). They are allocated
+        # together in a ParticleFields set and exposed as attributes.
+        self.particle_layout = {
+            # Particle properties
+            "position": (2, ti.f32),
+            "velocity": (2, ti.f32),
+            "material": (1, self.material_dtype),
+            "is_active": (1, ti.i32),
+            "canvas_id": (1, ti.i32),
+            # SPH state (density here is the computed fluid density, not the
+            # paint's material density from the material table)
+            "fluid_density": (1, ti.f32),
+            "pressure": (1, ti.f32),
+            "acceleration": (2, ti.f32),
+            # Neighbor grid: each particle's cell and the cell-sorted order
+            "particle_cell": (1, ti.i32),
+            "sorted_index": (1, ti.i32),
+            # Compaction prefix scan and gather permutation
+            "scan_offset": (1, ti.i32),
+            "permutation": (1, ti.i32),
+            # Sleeping: steps spent at rest and this step's awake list
+            "rest_steps": (1, ti.i32),
+            "awake_index": (1, ti.i32),
+            # Scratch of each field type for out-of-place gathers
+            "scratch_vec2": (2, ti.f32),
+            "scratch_material": (1, self.material_dtype),
+            "scratch_i32": (1, ti.i32),
+            "scratch_f32": (1, ti.f32),
+        }
+        self.peak_capacity = 0
+        self.peak_particle_bytes = 0
+        self.resize_count = 0
+        self._attach_fields(ParticleFields(self.initial_capacity, self.particle_layout,
+                                           self.SCAN_BLOCK))
         
         # Canvas properties
         self.canvas_width = float(config.canvas.width)
         self.canvas_height = float(config.canvas.height)
         
-        # Physics parameters
-        self.gravity = ti.field(dtype=ti.f32, shape=())
-        self.gravity[None] = config.physics.gravity
-        self.friction = config.physics.friction
+        # Physics parameters (per canvas)
+        self.gravity = ti.field(dtype=ti.f32, shape=self.num_canvases)
+        self.gravity.fill(config.physics.gravity)
+        self.friction = config.physics.friction  # Velocity kept per time_step
+        self.time_step = config.physics.time_step
         
-        # Tilt angles
-        self.tilt_x = ti.field(dtype=ti.f32, shape=())
-        self.tilt_y = ti.field(dtype=ti.f32, shape=())
-        self.tilt_x[None] = 0.0
-        self.tilt_y[None] = 0.0
+        # Tilt angles (per canvas) and the resulting gravity vectors
+        self.tilt_x = ti.field(dtype=ti.f32, shape=self.num_canvases)
+        self.tilt_y = ti.field(dtype=ti.f32, shape=self.num_canvases)
+        self.gravity_vector = ti.Vector.field(2, dtype=ti.f32, shape=self.num_canvases)
+        
+        # SPH parameters
+        self.fluid = FluidDynamics()
+        self.smoothing_radius = self.fluid.smoothing_radius
+        self.rest_density = self.fluid.rest_density
+        self.gas_constant = self.fluid.gas_constant
+        self.viscosity_coefficient = self.fluid.viscosity_coefficient
+        self.particle_mass = self.fluid.particle_mass
+        self.poly6, self.spiky_grad, self.viscosity_laplacian = (
+            self.fluid.kernel_coefficients()
+        )
+        
+        # Material table: one row per distinct (color, density, viscosity),
+        # with the viscosity terms the update needs precomputed
+        self.material_color = ti.Vector.field(4, dtype=ti.f32, shape=self.max_materials)
+        self.material_density = ti.field(dtype=ti.f32, shape=self.max_materials)
+        self.material_mu = ti.field(dtype=ti.f32, shape=self.max_materials)
+        self.material_viscosity_factor = ti.field(dtype=ti.f32, shape=self.max_materials)
+        self.materials: Dict[Tuple[float, ...], int] = {}
+        
+        # Uniform neighbor grid (counting sort of particles by cell), one
+        # block of cells per canvas
+        self.grid_width = int(self.canvas_width // self.smoothing_radius) + 1
+        self.grid_height = int(self.canvas_height // self.smoothing_radius) + 1
+        self.cells_per_canvas = self.grid_width * self.grid_height
+        num_cells = self.cells_per_canvas * self.num_canvases
+        self.cell_count = ti.field(dtype=ti.i32, shape=num_cells)
+        self.cell_start = ti.field(dtype=ti.i32, shape=num_cells + 1)
+        # Cells holding a particle fast enough to wake sleeping neighbors
+        self.cell_disturbed = ti.field(dtype=ti.i32, shape=num_cells)
+        
+        # Spatial sorting: every spatial_sort_interval steps, particles are
+        # reordered by neighbor-grid cell or by the Morton code of their cell,
+        # so particles near each other in space are near each other in memory
+        self.spatial_sort_interval = config.physics.spatial_sort_interval
+        self.spatial_sort_order = config.physics.spatial_sort_order
+        if self.spatial_sort_order not in ("cell", "morton"):
+            raise ValueError(f"Unknown spatial sort order: {self.spatial_sort_order}")
+        self.morton_bits = (max(self.grid_width, self.grid_height) - 1).bit_length()
+        buckets_per_canvas = (self.cells_per_canvas if self.spatial_sort_order == "cell"
+                              else 1 << (2 * self.morton_bits))
+        self.sort_buckets_per_canvas = buckets_per_canvas
+        self.sort_count = ti.field(dtype=ti.i32, shape=buckets_per_canvas * self.num_canvases)
+        self.sort_start = ti.field(dtype=ti.i32, shape=buckets_per_canvas * self.num_canvases + 1)
+        
+        # Bumped whenever existing particle slots get new colors (e.g. reset)
+        self.color_generation = 0
+        
+        # Reproducibility: emission offsets come from a counter-based hash
+        # of (seed, emission, particle) instead of ti.random()'s per-thread
+        # streams, and neighbor lists are kept in particle order. Seeds and
+        # counters are per canvas so canvases of a batch are independent.
+        self.random_seeds = [config.physics.random_seed] * self.num_canvases
+        self.emission_counters = [0] * self.num_canvases
+        self.deterministic = config.physics.deterministic
+        
+        # Lifecycle: retirement and stream compaction
+        self.retire_off_canvas = config.physics.retire_off_canvas
+        self.compact_interval = config.physics.compact_interval
+        self.step_count = 0
+        self.compacted_count = ti.field(dtype=ti.i32, shape=())
+        
+        # Sleeping: particles slower than sleep_speed for sleep_steps steps
+        # stop being integrated until tilt, gravity or a moving neighbor
+        # wakes them. Awake particles are listed in awake_index each step.
+        self.sleep_speed = config.physics.sleep_speed
+        self.sleep_steps = config.physics.sleep_steps
+        self.sleeping = self.sleep_speed > 0.0
+        self.num_awake = ti.field(dtype=ti.i32, shape=())
+        
+        # Adaptive substepping
+        self.cfl_number = config.physics.cfl_number
+        self.max_substeps = config.physics.max_substeps
+        self.speed_max = ti.field(dtype=ti.f32, shape=())
+        
+        # Everything outside the per-particle set has a fixed size
+        self.fixed_bytes = sum(
+            field_bytes(value) for name, value in vars(self).items()
+            if isinstance(value, (ti.ScalarField, ti.MatrixField)) and name not in self.fields.names
+        )
+        self.startup_metrics.allocation_seconds = time.perf_counter() - allocation_start
+        
+        if config.physics.warm_up:
+            self.warm_up()
+    
+    def warm_up(self) -> StartupMetrics:
+        """Compile every kernel now instead of on first use.
+        
+        Each kernel is launched once with arguments that make it a no-op,
+        so the first pour or removal does not stall on JIT compilation.
+        Kernels already in the offline cache are loaded rather than compiled.
+        
+        Returns:
+            Startup metrics including warm-up time
+        
+        Raises:
+            RuntimeError: If particles have already been added
+        """
+        if self.num_particles[None] != 0:
+            raise RuntimeError("warm_up must run before particles are added")
+        
+        start = time.perf_counter()
+        launches = [
+            lambda: self._add_particles(0.0, 0.0, 0, 0, 0, 0),
+            lambda: self._set_material(-1, [0.0, 0.0, 0.0, 0.0], 0.0, 0.0, 0.0),
+            lambda: self._add_particle_batch(np.zeros((0, 8), dtype=np.float32),
+                                             np.zeros((0, 4), dtype=np.int32),
+                                             np.zeros(0, dtype=np.int32)),
+            self._reduce_max_speed,
+            self._build_awake_list,
+            lambda: self._wake(-1),
+            self._build_grid,
+            self._compute_density_pressure,
+            lambda: self._integrate(0.0, 1.0, 0),
+            lambda: self._remove_particles(0.0, 0.0, -1.0, 0),
+            self._build_compaction,
+            self._build_spatial_order,
+            lambda: self._finish_compaction(0, 0),
+            lambda: self._copy_positions(np.empty((0, 2), dtype=np.float32), 0),
+            lambda: self._copy_colors(np.empty((0, 4), dtype=np.float32), 0),
+            lambda: self._count_canvas(0),
+            self._reset,
+        ]
+        # One _permute instantiation per field type
+        launches += [
+            (lambda f=f, s=s: self._permute(f, s, 0)) for f, s in self.particle_fields
+        ]
+        for launch in launches:
+            launch()
+        ti.sync()
+        
+        metrics = self.startup_metrics
+        metrics.warm_up_seconds = time.perf_counter() - start
+        metrics.kernels_warmed = len(launches)
+        return metrics
     
-    @ti.kernel
     def add_particles(
+        self,
+        center_x: float,
+        center_y: float,
+        count: int,
+        color: ti.types.vector(4, ti.f32),
+        paint_density: float,
+        paint_viscosity: float,
+        canvas: int = 0
+    ):
+        """Add particles at position.
+        
+        If the new paint would not fit, retired slots are reclaimed by
+        compaction first and capacity grows if that is not enough.
+        
+        Args:
+            canvas: Canvas to pour onto (0 to num_canvases - 1)
+        """
+        material = self.material_index(color, paint_density, paint_viscosity)
+        self._make_room(count)
+        self._add_particles(
+            center_x,
+            center_y,
+            count,
+            material,
+            canvas,
+            self._emission_salt(canvas)
+        )
+        self.emission_counters[canvas] += 1
+    
+    def material_index(self, color, density: float, viscosity: float) -> int:
+        """Get a paint's material table slot, adding it to the table if new.
+        
+        Args:
+            color: RGBA color (0-1)
+            density: Paint density
+            viscosity: Paint viscosity (cP)
+        
+        Returns:
+            Index stored in the particles' material field
+        
+        Raises:
+            ValueError: If the table already holds max_materials paints
+        """
+        # Keyed on float32 values, as stored in the table
+        rgba = np.asarray(color, dtype=np.float32).reshape(4)
+        density = np.float32(density)
+        viscosity = np.float32(viscosity)
+        key = tuple(float(c) for c in rgba) + (float(density), float(viscosity))
+        index = self.materials.get(key)
+        if index is None:
+            index = len(self.materials)
+            if index >= self.max_materials:
+                raise ValueError(f"Material table is full ({self.max_materials} paints)")
+            self.materials[key] = index
+            self._set_material(
+                index,
+                rgba.tolist(),
+                density,
+                np.float32(self.viscosity_coefficient) * viscosity,
+                np.float32(1.0) / (np.float32(1.0) + viscosity * np.float32(0.001))
+            )
+        return index
+    
+    @ti.kernel
+    def _set_material(self, index: ti.i32, color: ti.types.vector(4, ti.f32), density: ti.f32,
+                      mu: ti.f32, viscosity_factor: ti.f32):
+        """Write one material table row (a negative index writes nothing).
+        
+        One warmed kernel, rather than Python-scope field writes that each
+        compile an accessor the first time a paint is registered.
+        """
+        if index >= 0:
+            self.material_color[index] = color
+            self.material_density[index] = density
+            self.material_mu[index] = mu
+            self.material_viscosity_factor[index] = viscosity_factor
+    
+    def material_table(self) -> np.ndarray:
+        """Get the registered paints as (M, 6) rows of (r, g, b, a, density, viscosity)."""
+        table = np.array(list(self.materials), dtype=np.float32)
+        return table.reshape(len(self.materials), 6)
+    
+    def _load_materials(self, table: np.ndarray):
+        """Replace the material table with rows from material_table()."""
+        self.materials.clear()
+        for row in np.asarray(table, dtype=np.float32).reshape(-1, 6):
+            self.material_index(row[:4], row[4], row[5])
+    
+    def _emission_salt(self, canvas: int) -> int:
+        """Hash salt for a canvas's next emission's random offsets."""
+        seed = self.random_seeds[canvas]
+        counter = self.emission_counters[canvas]
+        return (seed * 0x9E3779B1 + counter * 0x85EBCA77) & 0xFFFFFFFF
+    
+    @ti.func
+    def _hash_uniform(self, key):
+        """Map a u32 key to a uniform float in [0, 1) (PCG hash)."""
+        state = key * ti.u32(747796405) + ti.u32(2891336453)
+        word = ((state >> ((state >> ti.u32(28)) + ti.u32(4))) ^ state) * ti.u32(277803737)
+        word = (word >> ti.u32(22)) ^ word
+        return ti.cast(word >> ti.u32(8), ti.f32) / 16777216.0
+    
+    @ti.kernel
+    def _add_particles(
         self,
         center_x: ti.f32,
         center_y: ti.f32,
         count: ti.i32,
-        color: ti.types.vector(4, ti.f32),
-        paint_density: ti.f32,
-        paint_viscosity: ti.f32
+        material: ti.i32,
+        canvas: ti.i32,
+        salt: ti.u32
     ):
-        """Add particles at position."""
+        """Append particles in a random disc around a position."""
         start_idx = self.num_particles[None]
         
         for i in range(count):
-            if start_idx + i < self.max_particles:
-                idx = start_idx + i
-                
-                # Random circular distribution
-                angle = ti.random() * 2.0 * 3.14159
-                radius = ti.sqrt(ti.random()) * 10.0
-                offset_x = radius * ti.cos(angle)
-                offset_y = radius * ti.sin(angle)
-                
-                self.position[idx] = ti.Vector([center_x + offset_x, center_y + offset_y])
-                self.velocity[idx] = ti.Vector([0.0, 0.0])
-                self.color[idx] = color
-                self.density[idx] = paint_density
-                self.viscosity[idx] = paint_viscosity
-                self.is_active[idx] = 1
+            if start_idx + i < self.capacity:
+                self._emit_particle(start_idx + i, i, center_x, center_y, material, canvas, salt)
+        
+        self.num_particles[None] = ti.min(start_idx + count, self.capacity)
+    
+    @ti.func
+    def _emit_particle(self, idx, i, center_x, center_y, material, canvas, salt):
+        """Place the i-th particle of an emission in slot idx."""
+        # Random circular distribution
+        key = salt ^ (ti.cast(i, ti.u32) * ti.u32(0x27D4EB2F))
+        angle = self._hash_uniform(key) * 2.0 * 3.14159
+        radius = ti.sqrt(self._hash_uniform(key ^ ti.u32(0x165667B1))) * 10.0
+        offset_x = radius * ti.cos(angle)
+        offset_y = radius * ti.sin(angle)
         
-        self.num_particles[None] = ti.min(start_idx + count, self.max_particles)
+        self.position[idx] = ti.Vector([center_x + offset_x, center_y + offset_y])
+        self.velocity[idx] = ti.Vector([0.0, 0.0])
+        self.material[idx] = ti.cast(material, self.material_dtype)
+        self.canvas_id[idx] = canvas
+        self.rest_steps[idx] = 0
+        self.is_active[idx] = 1
+    
+    def add_particle_batch(
+        self,
+        params: np.ndarray,
+        counts: np.ndarray,
+        canvases: np.ndarray
+    ) -> int:
+        """Add several emissions with a single kernel launch.
+        
+        Produces exactly the particles of calling add_particles once per
+        row, in row order.
+        
+        Args:
+            params: (N, 8) rows of (x, y, r, g, b, a, density, viscosity)
+            counts: Particles per emission
+            canvases: Canvas of each emission
+        
+        Returns:
+            Number of particles added (less than requested if max_particles is reached)
+        """
+        params = np.ascontiguousarray(params, dtype=np.float32)
+        counts = np.asarray(counts, dtype=np.int32)
+        canvases = np.asarray(canvases, dtype=np.int32)
+        total = int(counts.sum())
+        if total == 0:
+            return 0
+        materials = [self.material_index(row[2:6], row[6], row[7]) for row in params]
+        self._make_room(total)
+        
+        # Per emission: first particle's offset in the batch, canvas, salt
+        # and material
+        info = np.empty((len(counts), 4), dtype=np.int32)
+        info[:, 0] = np.cumsum(counts) - counts
+        info[:, 1] = canvases
+        info[:, 3] = materials
+        salts = np.empty(len(counts), dtype=np.uint32)
+        for k, canvas in enumerate(canvases.tolist()):
+            salts[k] = self._emission_salt(canvas)
+            self.emission_counters[canvas] += 1
+        info[:, 2] = salts.view(np.int32)
+        owner = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+        
+        start = self.num_particles[None]
+        self._add_particle_batch(params, info, owner)
+        return min(total, self.capacity - start)
     
     @ti.kernel
-    def update(self, dt: ti.f32):
-        """Update particle physics."""
-        # Calculate gravity from tilt
-        tilt_x_rad = self.tilt_x[None] * 3.14159 / 180.0
-        tilt_y_rad = self.tilt_y[None] * 3.14159 / 180.0
+    def _add_particle_batch(
+        self,
+        params: ti.types.ndarray(dtype=ti.f32, ndim=2),
+        info: ti.types.ndarray(dtype=ti.i32, ndim=2),
+        owner: ti.types.ndarray(dtype=ti.i32, ndim=1)
+    ):
+        """Append the particles of several emissions, one thread per particle."""
+        start_idx = self.num_particles[None]
+        total = owner.shape[0]
         
-        gravity_x = self.gravity[None] * ti.sin(tilt_x_rad)
-        gravity_y = self.gravity[None] * ti.sin(tilt_y_rad)
+        for p in range(total):
+            if start_idx + p < self.capacity:
+                e = owner[p]
+                self._emit_particle(start_idx + p, p - info[e, 0], params[e, 0], params[e, 1],
+                                    info[e, 3], info[e, 1], ti.bit_cast(info[e, 2], ti.u32))
         
+        self.num_particles[None] = ti.min(start_idx + total, self.capacity)
+    
+    def advance(self, dt: float) -> int:
+        """Advance by dt using CFL-limited adaptive substeps.
+        
+        The substep count is chosen from the maximum particle speed so no
+        particle crosses more than cfl_number smoothing radii per substep.
+        
+        Args:
+            dt: Time step in seconds
+        
+        Returns:
+            Number of substeps taken
+        """
+        substeps = cfl_substeps(
+            dt,
+            self.max_speed(),
+            self.smoothing_radius,
+            self.cfl_number,
+            self.max_substeps
+        )
+        for k in range(substeps):
+            self._substep(dt / substeps, k == substeps - 1)
+        self._finish_step()
+        return substeps
+    
+    def max_speed(self) -> float:
+        """Get the fastest active particle speed (pixels/s)."""
+        self._reduce_max_speed()
+        return float(self.speed_max[None])
+    
+    @ti.kernel
+    def _reduce_max_speed(self):
+        """Parallel max reduction of particle speed."""
+        self.speed_max[None] = 0.0
         for i in range(self.num_particles[None]):
             if self.is_active[i] == 1:
-                # Apply gravity with viscosity dampening
-                viscosity_factor = 1.0 / (1.0 + self.viscosity[i] * 0.001)
+                ti.atomic_max(self.speed_max[None], self.velocity[i].norm())
+    
+    def update(self, dt: float):
+        """Update particle physics by one step, without substepping.
+        
+        Args:
+            dt: Time step in seconds
+        """
+        self._substep(dt, True)
+        self._finish_step()
+    
+    def _substep(self, dt: float, last: bool):
+        """Simulate dt seconds of one fixed step.
+        
+        Friction is scaled to dt, so a step damps paint the same however
+        it is split. Rest steps are only counted on the step's last substep.
+        
+        Args:
+            dt: Substep length in seconds
+            last: Whether this substep ends the fixed step
+        """
+        if self.sleeping:
+            self._build_awake_list()
+        self._build_grid()
+        self._compute_density_pressure()
+        self._integrate(dt, self.friction ** (dt / self.time_step), int(last))
+    
+    def _finish_step(self):
+        """Count a fixed step and run the compaction and sorting due on it."""
+        self.step_count += 1
+        if (self.compact_interval > 0 and self.step_count % self.compact_interval == 0
+                and self.num_retired[None] > 0):
+            self.compact()
+        if (self.spatial_sort_interval > 0
+                and self.step_count % self.spatial_sort_interval == 0):
+            self.spatial_sort()
+    
+    @ti.kernel
+    def _build_awake_list(self):
+        """Wake disturbed sleepers and list the awake particles, in memory order.
+        
+        A sleeper wakes when its cell or a neighboring cell held a moving
+        particle in the last update. A blocked prefix scan (as in
+        compaction) keeps the list sorted, so the SPH passes walk particles
+        in their spatially sorted order.
+        """
+        n = self.num_particles[None]
+        for i in range(n):
+            if self.is_active[i] == 1 and self.rest_steps[i] >= self.sleep_steps:
+                cx, cy = self._cell_coords(self.position[i])
+                base = self.canvas_id[i] * self.cells_per_canvas
+                for ox, oy in ti.static(ti.ndrange((-1, 2), (-1, 2))):
+                    nx = cx + ox
+                    ny = cy + oy
+                    if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
+                        if self.cell_disturbed[base + nx * self.grid_height + ny] == 1:
+                            self.rest_steps[i] = 0
+        
+        num_blocks = (n + self.SCAN_BLOCK - 1) // self.SCAN_BLOCK
+        for b in range(num_blocks):
+            total = 0
+            for k in range(self.SCAN_BLOCK):
+                i = b * self.SCAN_BLOCK + k
+                if i < n:
+                    self.scan_offset[i] = total
+                    if self.is_active[i] == 1 and self.rest_steps[i] < self.sleep_steps:
+                        total += 1
+            self.block_count[b] = total
+        
+        self.block_offset[0] = 0
+        ti.loop_config(serialize=True)
+        for b in range(num_blocks):
+            self.block_offset[b + 1] = self.block_offset[b] + self.block_count[b]
+        
+        for i in range(n):
+            if self.is_active[i] == 1 and self.rest_steps[i] < self.sleep_steps:
+                self.awake_index[self.block_offset[i // self.SCAN_BLOCK] + self.scan_offset[i]] = i
+        self.num_awake[None] = self.block_offset[num_blocks]
+    
+    @ti.func
+    def _num_updated(self):
+        """Number of particles the SPH passes visit (awake ones when sleeping)."""
+        count = 0
+        if ti.static(self.sleeping):
+            count = self.num_awake[None]
+        else:
+            count = self.num_particles[None]
+        return count
+    
+    @ti.func
+    def _updated_particle(self, k):
+        """Slot of the k-th particle visited by the SPH passes."""
+        i = k
+        if ti.static(self.sleeping):
+            i = self.awake_index[k]
+        return i
+    
+    def wake(self, canvas: Optional[int] = None):
+        """Wake sleeping particles, on one canvas or everywhere."""
+        self._wake(-1 if canvas is None else canvas)
+    
+    @ti.kernel
+    def _wake(self, canvas: ti.i32):
+        """Reset the rest counters of a canvas's particles (every canvas if -1)."""
+        for i in range(self.num_particles[None]):
+            if canvas < 0 or self.canvas_id[i] == canvas:
+                self.rest_steps[i] = 0
+    
+    def get_awake_count(self) -> int:
+        """Get the number of particles integrated in the last update."""
+        if not self.sleeping:
+            return self.get_particle_count()
+        return int(self.num_awake[None])
+    
+    def set_seed(self, seed: int, canvas: int = 0):
+        """Set a canvas's emission seed and restart its emission sequence."""
+        self.random_seeds[canvas] = seed
+        self.emission_counters[canvas] = 0
+    
+    @ti.func
+    def _cell_coords(self, pos):
+        """Get the (clamped) grid cell coordinates of a position."""
+        cx = ti.math.clamp(ti.cast(ti.floor(pos.x / self.smoothing_radius), ti.i32),
+                           0, self.grid_width - 1)
+        cy = ti.math.clamp(ti.cast(ti.floor(pos.y / self.smoothing_radius), ti.i32),
+                           0, self.grid_height - 1)
+        return cx, cy
+    
+    @ti.kernel
+    def _build_grid(self):
+        """Counting-sort active particles into grid cells."""
+        n = self.num_particles[None]
+        for c in self.cell_count:
+            self.cell_count[c] = 0
+        
+        for i in range(n):
+            self.particle_cell[i] = -1
+            if self.is_active[i] == 1:
+                cx, cy = self._cell_coords(self.position[i])
+                c = self.canvas_id[i] * self.cells_per_canvas + cx * self.grid_height + cy
+                self.particle_cell[i] = c
+                ti.atomic_add(self.cell_count[c], 1)
+        
+        # Exclusive prefix sum of cell counts (grid is small)
+        self.cell_start[0] = 0
+        ti.loop_config(serialize=True)
+        for c in range(self.cells_per_canvas * self.num_canvases):
+            self.cell_start[c + 1] = self.cell_start[c] + self.cell_count[c]
+        
+        # Reuse counts as per-cell write cursors
+        for c in self.cell_count:
+            self.cell_count[c] = self.cell_start[c]
+        
+        for i in range(n):
+            c = self.particle_cell[i]
+            if c >= 0:
+                slot = ti.atomic_add(self.cell_count[c], 1)
+                self.sorted_index[slot] = i
+        
+        if ti.static(self.deterministic):
+            # Parallel scatter order varies between runs; restore particle
+            # order inside each cell (insertion sort, cells are small and the
+            # scatter leaves them nearly sorted)
+            for c in range(self.cells_per_canvas * self.num_canvases):
+                start = self.cell_start[c]
+                for a in range(start + 1, self.cell_start[c + 1]):
+                    key = self.sorted_index[a]
+                    b = a - 1
+                    while b >= start and self.sorted_index[b] > key:
+                        self.sorted_index[b + 1] = self.sorted_index[b]
+                        b -= 1
+                    self.sorted_index[b + 1] = key
+    
+    @ti.kernel
+    def _compute_density_pressure(self):
+        """Compute SPH density (poly6 kernel) and pressure per particle."""
+        h2 = self.smoothing_radius * self.smoothing_radius
+        for u in range(self._num_updated()):
+            i = self._updated_particle(u)
+            if self.is_active[i] == 1:
+                pos_i = self.position[i]
+                cx, cy = self._cell_coords(pos_i)
+                base = self.canvas_id[i] * self.cells_per_canvas
+                rho = 0.0
+                for ox, oy in ti.static(ti.ndrange((-1, 2), (-1, 2))):
+                    nx = cx + ox
+                    ny = cy + oy
+                    if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
+                        c = base + nx * self.grid_height + ny
+                        for k in range(self.cell_start[c], self.cell_start[c + 1]):
+                            j = self.sorted_index[k]
+                            r2 = (pos_i - self.position[j]).norm_sqr()
+                            if r2 < h2:
+                                w = h2 - r2
+                                rho += (self.particle_mass * self.material_density[self.material[j]]
+                                        * w * w * w)
+                rho *= self.poly6
+                self.fluid_density[i] = rho
+                # Paint only pushes apart; no tension pulling particles together
+                self.pressure[i] = self.gas_constant * ti.max(rho - self.rest_density, 0.0)
+    
+    @ti.kernel
+    def _integrate(self, dt: ti.f32, friction: ti.f32, count_rest: ti.i32):
+        """Apply tilt gravity, SPH pressure/viscosity forces and advect.
+        
+        Args:
+            dt: Substep length in seconds
+            friction: Fraction of velocity kept over dt
+            count_rest: Whether particles at rest advance their rest counters
+        """
+        # Calculate each canvas's gravity from its tilt
+        for k in range(self.num_canvases):
+            tilt_x_rad = self.tilt_x[k] * 3.14159 / 180.0
+            tilt_y_rad = self.tilt_y[k] * 3.14159 / 180.0
+            self.gravity_vector[k] = self.gravity[k] * ti.Vector([
+                ti.sin(tilt_x_rad), ti.sin(tilt_y_rad)
+            ])
+        
+        if ti.static(self.sleeping):
+            for c in self.cell_disturbed:
+                self.cell_disturbed[c] = 0
+        
+        h = self.smoothing_radius
+        for u in range(self._num_updated()):
+            i = self._updated_particle(u)
+            if self.is_active[i] == 1:
+                pos_i = self.position[i]
+                vel_i = self.velocity[i]
+                rho_i = self.fluid_density[i]
+                p_i = self.pressure[i]
+                mu_i = self.material_mu[self.material[i]]
                 
-                accel_x = gravity_x * viscosity_factor
-                accel_y = gravity_y * viscosity_factor
+                # SPH forces from neighbors in the surrounding 3x3 cells
+                force = ti.Vector([0.0, 0.0])
+                cx, cy = self._cell_coords(pos_i)
+                base = self.canvas_id[i] * self.cells_per_canvas
+                if ti.static(self.sleeping):
+                    # Moving paint wakes sleepers around it (next update)
+                    if vel_i.norm() > self.sleep_speed:
+                        self.cell_disturbed[base + cx * self.grid_height + cy] = 1
+                for ox, oy in ti.static(ti.ndrange((-1, 2), (-1, 2))):
+                    nx = cx + ox
+                    ny = cy + oy
+                    if 0 <= nx < self.grid_width and 0 <= ny < self.grid_height:
+                        c = base + nx * self.grid_height + ny
+                        for k in range(self.cell_start[c], self.cell_start[c + 1]):
+                            j = self.sorted_index[k]
+                            rij = pos_i - self.position[j]
+                            r = rij.norm()
+                            if j != i and r < h and r > 1e-5:
+                                material_j = self.material[j]
+                                mass_j = self.particle_mass * self.material_density[material_j]
+                                rho_j = self.fluid_density[j]
+                                # Pressure (spiky kernel gradient)
+                                force += (-mass_j * (p_i + self.pressure[j]) / (2.0 * rho_j)
+                                          * self.spiky_grad * (h - r) * (h - r) * rij / r)
+                                # Viscosity (viscosity kernel laplacian)
+                                mu = 0.5 * (mu_i + self.material_mu[material_j])
+                                force += (mu * mass_j * (self.velocity[j] - vel_i) / rho_j
+                                          * self.viscosity_laplacian * (h - r))
+                self.acceleration[i] = force / ti.max(rho_i, 1e-5)
+        
+        # Integrate once every neighbor has read this step's velocities
+        for u in range(self._num_updated()):
+            i = self._updated_particle(u)
+            if self.is_active[i] == 1:
+                # Apply gravity with viscosity dampening
+                viscosity_factor = self.material_viscosity_factor[self.material[i]]
+                gravity = self.gravity_vector[self.canvas_id[i]]
                 
-                self.velocity[i].x += accel_x * dt
-                self.velocity[i].y += accel_y * dt
+                accel = gravity * viscosity_factor + self.acceleration[i]
+                self.velocity[i] += accel * dt
                 
                 # Apply friction
-                self.velocity[i] *= self.friction
+                self.velocity[i] *= friction
+                
+                if ti.static(self.sleeping):
+                    # Rest only where gravity alone cannot keep paint creeping
+                    # (its terminal speed under friction is below sleep_speed)
+                    drift = (gravity * viscosity_factor).norm() * dt / ti.max(1.0 - friction, 1e-6)
+                    if self.velocity[i].norm() < self.sleep_speed and drift < self.sleep_speed:
+                        self.rest_steps[i] += count_rest
+                        if self.rest_steps[i] >= self.sleep_steps:
+                            self.velocity[i] = ti.Vector([0.0, 0.0])
+                    else:
+                        self.rest_steps[i] = 0
                 
                 # Update position
                 self.position[i] += self.velocity[i] * dt
                 
+                if ti.static(self.retire_off_canvas):
+                    # Paint past an edge drips off the canvas
+                    pos = self.position[i]
+                    if (pos.x < 0 or pos.x > self.canvas_width
+                            or pos.y < 0 or pos.y > self.canvas_height):
+                        self._retire(i)
+                    continue
+                
                 # Boundary collision
                 if self.position[i].x < 0:
                     self.position[i].x = 0
@@ -132,32 +901,537 @@ class ParticleSystem:
                     self.position[i].y = self.canvas_height
                     self.velocity[i].y *= -0.5
     
-    def set_tilt(self, tilt_x: float, tilt_y: float):
-        """Set canvas tilt angles."""
-        self.tilt_x[None] = np.clip(tilt_x, -45.0, 45.0)
-        self.tilt_y[None] = np.clip(tilt_y, -45.0, 45.0)
+    @ti.func
+    def _retire(self, i):
+        """Deactivate a particle and park it off-canvas until compaction."""
+        self.is_active[i] = 0
+        self.position[i] = ti.Vector([self.RETIRED_POSITION, self.RETIRED_POSITION])
+        self.velocity[i] = ti.Vector([0.0, 0.0])
+        ti.atomic_add(self.num_retired[None], 1)
+    
+    def remove_particles(self, center_x: float, center_y: float, radius: float, canvas: int = 0):
+        """Retire every active particle of a canvas within a radius of a point."""
+        self._remove_particles(center_x, center_y, radius, canvas)
+    
+    @ti.kernel
+    def _remove_particles(self, center_x: ti.f32, center_y: ti.f32, radius: ti.f32, canvas: ti.i32):
+        """Retire active particles of one canvas within a radius of a point."""
+        center = ti.Vector([center_x, center_y])
+        for i in range(self.num_particles[None]):
+            if self.is_active[i] == 1 and self.canvas_id[i] == canvas:
+                distance = (self.position[i] - center).norm()
+                if distance <= radius:
+                    self._retire(i)
+                elif distance <= radius + self.smoothing_radius:
+                    # Paint around the hole may flow into it
+                    self.rest_steps[i] = 0
+    
+    def compact(self):
+        """Move live particles to the front of the fields, preserving order.
+        
+        A blocked prefix scan over is_active builds the permutation, and
+        every per-particle field is gathered through its scratch field.
+        """
+        old_count = self.num_particles[None]
+        self._build_compaction()
+        new_count = self.compacted_count[None]
+        for field, scratch in self.particle_fields:
+            self._permute(field, scratch, new_count)
+        self._finish_compaction(new_count, old_count)
+        self.color_generation += 1
+    
+    @ti.kernel
+    def _build_compaction(self):
+        """Compute the gather permutation of active particles."""
+        n = self.num_particles[None]
+        num_blocks = (n + self.SCAN_BLOCK - 1) // self.SCAN_BLOCK
+        
+        # Local exclusive scan inside each block (blocks run in parallel)
+        for b in range(num_blocks):
+            total = 0
+            for k in range(self.SCAN_BLOCK):
+                i = b * self.SCAN_BLOCK + k
+                if i < n:
+                    self.scan_offset[i] = total
+                    total += self.is_active[i]
+            self.block_count[b] = total
+        
+        # Scan of block totals
+        self.block_offset[0] = 0
+        ti.loop_config(serialize=True)
+        for b in range(num_blocks):
+            self.block_offset[b + 1] = self.block_offset[b] + self.block_count[b]
+        
+        for i in range(n):
+            if self.is_active[i] == 1:
+                dst = self.block_offset[i // self.SCAN_BLOCK] + self.scan_offset[i]
+                self.permutation[dst] = i
+        self.compacted_count[None] = self.block_offset[num_blocks]
+    
+    @ti.kernel
+    def _permute(self, field: ti.template(), scratch: ti.template(), count: ti.i32):
+        """Gather field[permutation[i]] into field[i] for i < count."""
+        for i in range(count):
+            scratch[i] = field[self.permutation[i]]
+        for i in range(count):
+            field[i] = scratch[i]
+    
+    def spatial_sort(self):
+        """Reorder particles so that spatial neighbors are adjacent in memory.
+        
+        Retired slots are compacted away first, then every per-particle
+        field is gathered through a stable counting sort by cell (or cell
+        Morton code). Particles in the same cell keep their relative order,
+        so paint poured later still draws over earlier paint in that cell.
+        """
+        if self.num_retired[None] > 0:
+            self.compact()
+        n = self.num_particles[None]
+        if n == 0:
+            return
+        self._build_spatial_order()
+        for field, scratch in self.particle_fields:
+            self._permute(field, scratch, n)
+        self.color_generation += 1
+    
+    @ti.func
+    def _morton(self, x, y):
+        """Interleave the bits of two 16-bit cell coordinates (x in the even bits)."""
+        x = (x | (x << 8)) & 0x00FF00FF
+        x = (x | (x << 4)) & 0x0F0F0F0F
+        x = (x | (x << 2)) & 0x33333333
+        x = (x | (x << 1)) & 0x55555555
+        y = (y | (y << 8)) & 0x00FF00FF
+        y = (y | (y << 4)) & 0x0F0F0F0F
+        y = (y | (y << 2)) & 0x33333333
+        y = (y | (y << 1)) & 0x55555555
+        return x | (y << 1)
+    
+    @ti.kernel
+    def _build_spatial_order(self):
+        """Counting-sort particles by spatial key into the gather permutation."""
+        n = self.num_particles[None]
+        for b in self.sort_count:
+            self.sort_count[b] = 0
+        
+        # Bucket keys go in particle_cell; the next grid build overwrites it
+        for i in range(n):
+            cx, cy = self._cell_coords(self.position[i])
+            key = 0
+            if ti.static(self.spatial_sort_order == "morton"):
+                key = self._morton(cx, cy)
+            else:
+                key = cx * self.grid_height + cy
+            b = self.canvas_id[i] * self.sort_buckets_per_canvas + key
+            self.particle_cell[i] = b
+            ti.atomic_add(self.sort_count[b], 1)
+        
+        num_buckets = self.sort_buckets_per_canvas * self.num_canvases
+        self.sort_start[0] = 0
+        ti.loop_config(serialize=True)
+        for b in range(num_buckets):
+            self.sort_start[b + 1] = self.sort_start[b] + self.sort_count[b]
+        
+        for b in self.sort_count:
+            self.sort_count[b] = self.sort_start[b]
+        
+        for i in range(n):
+            slot = ti.atomic_add(self.sort_count[self.particle_cell[i]], 1)
+            self.permutation[slot] = i
+        
+        if ti.static(self.deterministic):
+            # Stable: restore particle order inside each bucket
+            for b in range(num_buckets):
+                start = self.sort_start[b]
+                for a in range(start + 1, self.sort_start[b + 1]):
+                    key = self.permutation[a]
+                    c = a - 1
+                    while c >= start and self.permutation[c] > key:
+                        self.permutation[c + 1] = self.permutation[c]
+                        c -= 1
+                    self.permutation[c + 1] = key
+    
+    @ti.kernel
+    def _finish_compaction(self, new_count: ti.i32, old_count: ti.i32):
+        """Mark compacted slots active and free the tail."""
+        for i in range(old_count):
+            self.is_active[i] = 1 if i < new_count else 0
+        self.num_particles[None] = new_count
+        self.num_retired[None] = 0
+    
+    def set_tilt(self, tilt_x: float, tilt_y: float, canvas: int = 0):
+        """Set a canvas's tilt angles (waking its particles if they change)."""
+        tilt_x = float(np.float32(np.clip(tilt_x, -45.0, 45.0)))
+        tilt_y = float(np.float32(np.clip(tilt_y, -45.0, 45.0)))
+        if self.sleeping and (tilt_x, tilt_y) != self.get_tilt(canvas):
+            self.wake(canvas)
+        self.tilt_x[canvas] = tilt_x
+        self.tilt_y[canvas] = tilt_y
+    
+    def set_gravity(self, gravity: float, canvas: int = 0):
+        """Set a canvas's gravitational acceleration (waking its particles)."""
+        if self.sleeping:
+            self.wake(canvas)
+        self.gravity[canvas] = gravity
     
-    def get_particle_data(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Get particle data for rendering."""
+    def get_tilt(self, canvas: int = 0) -> Tuple[float, float]:
+        """Get a canvas's tilt angles."""
+        return float(self.tilt_x[canvas]), float(self.tilt_y[canvas])
+    
+    def get_particle_data(self, canvas: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get particle data for rendering.
+        
+        Allocates new arrays on every call; prefer read_particles() with a
+        reusable ParticleReadback in per-frame code.
+        
+        Args:
+            canvas: Only return this canvas's live particles (None for every slot)
+        """
         n = self.num_particles[None]
         if n == 0:
             return np.array([]), np.array([])
         
-        positions = self.position.to_numpy()[:n]
-        colors = self.color.to_numpy()[:n]
+        positions = np.empty((n, 2), dtype=np.float32)
+        colors = np.empty((n, 4), dtype=np.float32)
+        self._copy_positions(positions, 0)
+        self._copy_colors(colors, 0)
+        if canvas is not None:
+            mask = ((self.canvas_id.to_numpy()[:n] == canvas)
+                    & (self.is_active.to_numpy()[:n] == 1))
+            return positions[mask], colors[mask]
         return positions, colors
     
-    def get_particle_count(self) -> int:
-        """Get current particle count."""
-        return self.num_particles[None]
+    def create_readback(self) -> ParticleReadback:
+        """Create reusable readback buffers sized for this system."""
+        return ParticleReadback(self.capacity)
+    
+    def read_particles(self, readback: ParticleReadback) -> Tuple[np.ndarray, np.ndarray]:
+        """Copy the active particles into caller-owned buffers.
+        
+        Buffers are enlarged when the system has grown past their size.
+        
+        Args:
+            readback: Buffers to fill (from create_readback)
+        
+        Returns:
+            Tuple of (positions, colors) views of the first n buffer rows
+        """
+        n = self.num_particles[None]
+        readback.reserve(n and self.capacity)
+        if n > 0:
+            # Contiguous row slices, so only n rows cross the host/device boundary
+            self._copy_positions(readback.positions[:n], 0)
+            
+            if readback.color_generation != self.color_generation:
+                readback.colors_valid = 0
+            if readback.colors_valid < n:
+                self._copy_colors(readback.colors[readback.colors_valid:n], readback.colors_valid)
+            readback.colors_valid = n
+            readback.color_generation = self.color_generation
+        
+        readback.count = n
+        return readback.positions[:n], readback.colors[:n]
+    
+    @ti.kernel
+    def _copy_positions(self, out: ti.types.ndarray(dtype=ti.f32, ndim=2), start: ti.i32):
+        """Copy positions [start, start + len(out)) into a host array."""
+        for i in range(out.shape[0]):
+            for k in ti.static(range(2)):
+                out[i, k] = self.position[start + i][k]
+    
+    @ti.kernel
+    def _copy_colors(self, out: ti.types.ndarray(dtype=ti.f32, ndim=2), start: ti.i32):
+        """Copy colors [start, start + len(out)) into a host array."""
+        for i in range(out.shape[0]):
+            for k in ti.static(range(4)):
+                out[i, k] = self.material_color[self.material[start + i]][k]
+    
+    def state_arrays(self) -> Dict[str, Any]:
+        """Name -> field of every per-particle array in the simulation state."""
+        return {
+            "position": self.position,
+            "velocity": self.velocity,
+            "material": self.material,
+            "is_active": self.is_active,
+            "canvas_id": self.canvas_id,
+            "rest_steps": self.rest_steps,
+            "fluid_density": self.fluid_density,
+            "pressure": self.pressure,
+        }
+    
+    def get_state(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """Snapshot the full simulation state with bulk device transfers.
+        
+        Returns:
+            Tuple of (scalars, arrays): counters, tilt and gravity, and the
+            first num_particles rows of every per-particle field
+        """
+        n = self.num_particles[None]
+        scalars = {
+            "num_particles": n,
+            "num_retired": int(self.num_retired[None]),
+            "num_canvases": self.num_canvases,
+            "tilt_x": self.tilt_x.to_numpy().tolist(),
+            "tilt_y": self.tilt_y.to_numpy().tolist(),
+            "gravity": self.gravity.to_numpy().tolist(),
+            "step_count": self.step_count,
+            "emission_counters": list(self.emission_counters),
+            "random_seeds": list(self.random_seeds),
+            "materials": self.material_table().tolist(),
+            "canvas": [self.canvas_width, self.canvas_height],
+        }
+        arrays = {name: field.to_numpy()[:n] for name, field in self.state_arrays().items()}
+        arrays["material"] = arrays["material"].astype(np.uint16)
+        return scalars, arrays
+    
+    def set_state(self, scalars: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        """Restore a state captured with get_state.
+        
+        Args:
+            scalars: Counters, tilt and gravity
+            arrays: First num_particles rows of every per-particle field
+        
+        Raises:
+            ValueError: If the state is incomplete or does not fit this
+                system (which is then left unchanged)
+        """
+        # Everything is checked before the live system is touched, so a
+        # rejected state leaves it running unchanged
+        missing = [key for key in ("num_particles", "num_retired", "tilt_x", "tilt_y",
+                                   "gravity", "step_count", "emission_counters",
+                                   "random_seeds") if key not in scalars]
+        if missing:
+            raise ValueError(f"State is missing {', '.join(missing)}")
+        n = int(scalars["num_particles"])
+        if self.max_particles and n > self.max_particles:
+            raise ValueError(
+                f"State holds {n} particles but max_particles is {self.max_particles}"
+            )
+        if scalars.get("num_canvases", 1) != self.num_canvases:
+            raise ValueError(
+                f"State has {scalars.get('num_canvases', 1)} canvases, expected {self.num_canvases}"
+            )
+        for key in ("tilt_x", "tilt_y", "emission_counters", "random_seeds"):
+            if len(scalars[key]) != self.num_canvases:
+                raise ValueError(f"State {key} has {len(scalars[key])} entries, "
+                                 f"expected {self.num_canvases}")
+        if "canvas" in scalars and list(scalars["canvas"]) != [self.canvas_width,
+                                                               self.canvas_height]:
+            width, height = scalars["canvas"]
+            raise ValueError(f"State canvas is {width}x{height}, expected "
+                             f"{self.canvas_width}x{self.canvas_height}")
+        
+        if "material" in arrays:
+            if "materials" not in scalars:
+                raise ValueError("State is missing materials")
+            table = np.array(scalars["materials"], dtype=np.float32).reshape(-1, 6)
+        else:
+            # Older states store color, density and viscosity per particle
+            missing = [name for name in ("color", "density", "viscosity") if name not in arrays]
+            if missing:
+                raise ValueError(f"State is missing arrays {', '.join(missing)}")
+            paints = np.concatenate([
+                np.asarray(arrays["color"], dtype=np.float32).reshape(-1, 4),
+                np.asarray(arrays["density"], dtype=np.float32).reshape(-1, 1),
+                np.asarray(arrays["viscosity"], dtype=np.float32).reshape(-1, 1),
+            ], axis=1)
+            table, inverse = np.unique(paints, axis=0, return_inverse=True)
+            arrays = {**arrays, "material": inverse.reshape(-1).astype(np.uint16)}
+        if len(table) > self.max_materials:
+            raise ValueError(f"State has {len(table)} paints, the table holds "
+                             f"{self.max_materials}")
+        if "rest_steps" not in arrays or "fluid_density" not in arrays:
+            # Saved before sleeping existed, or without the densities sleeping
+            # particles keep: everything starts awake and recomputes them
+            arrays = {
+                **arrays,
+                "rest_steps": np.zeros(n, dtype=np.int32),
+                "fluid_density": np.zeros(n, dtype=np.float32),
+                "pressure": np.zeros(n, dtype=np.float32),
+            }
+        for name in self.state_arrays():
+            if name not in arrays:
+                raise ValueError(f"State is missing array {name}")
+            if len(arrays[name]) != n:
+                raise ValueError(
+                    f"State array {name} has {len(arrays[name])} rows, expected {n}"
+                )
+        if n and int(np.max(arrays["material"])) >= len(table):
+            raise ValueError("State particles refer to paints missing from its table")
+        
+        self._load_materials(table)
+        self._reset()
+        self.reserve(n)
+        for name, field in self.state_arrays().items():
+            data = arrays[name]
+            full = np.zeros(field.shape + tuple(data.shape[1:]), dtype=data.dtype)
+            full[:n] = data
+            field.from_numpy(full)
+        
+        self.num_particles[None] = n
+        self.num_retired[None] = int(scalars["num_retired"])
+        for name in ("tilt_x", "tilt_y", "gravity"):
+            getattr(self, name).from_numpy(np.array(scalars[name], dtype=np.float32))
+        self.step_count = int(scalars["step_count"])
+        self.emission_counters = [int(c) for c in scalars["emission_counters"]]
+        self.random_seeds = [int(seed) for seed in scalars["random_seeds"]]
+        self.color_generation += 1
+    
+    def get_particle_count(self, canvas: Optional[int] = None) -> int:
+        """Get current (live) particle count, in total or on one canvas."""
+        if canvas is None:
+            return self.num_particles[None] - self.num_retired[None]
+        return self._count_canvas(canvas)
+    
+    @ti.kernel
+    def _count_canvas(self, canvas: ti.i32) -> ti.i32:
+        """Count live particles on one canvas."""
+        total = 0
+        for i in range(self.num_particles[None]):
+            if self.is_active[i] == 1 and self.canvas_id[i] == canvas:
+                total += 1
+        return total
     
     def get_backend(self) -> str:
         """Get Taichi backend."""
         return self.backend
     
+    def reset(self, shrink: bool = False):
+        """Reset all particles and empty the material table.
+        
+        Args:
+            shrink: Also release particle memory down to the initial capacity
+                (the next large pour grows it again)
+        """
+        self._reset()
+        self.materials.clear()
+        if shrink:
+            self.shrink()
+        self.color_generation += 1
+    
     @ti.kernel
-    def reset(self):
-        """Reset all particles."""
+    def _reset(self):
+        """Deactivate every particle slot."""
         self.num_particles[None] = 0
-        for i in range(self.max_particles):
+        self.num_retired[None] = 0
+        for i in range(self.capacity):
             self.is_active[i] = 0
+    
+    def _attach_fields(self, fields: ParticleFields):
+        """Expose a per-particle field set as this system's attributes."""
+        self.fields = fields
+        self.capacity = fields.capacity
+        self.peak_capacity = max(self.peak_capacity, self.capacity)
+        self.peak_particle_bytes = max(self.peak_particle_bytes, fields.nbytes)
+        for name in fields.names:
+            setattr(self, name, getattr(fields, name))
+        # Per-particle state moved by compaction, each with a scratch field
+        # of matching type for out-of-place gathers. Sleeping particles keep
+        # the density and pressure their awake neighbors read, so those move
+        # with them.
+        self.particle_fields = [
+            (self.position, self.scratch_vec2),
+            (self.velocity, self.scratch_vec2),
+            (self.material, self.scratch_material),
+            (self.canvas_id, self.scratch_i32),
+            (self.rest_steps, self.scratch_i32),
+            (self.fluid_density, self.scratch_f32),
+            (self.pressure, self.scratch_f32),
+        ]
+    
+    def _capacity_for(self, count: int) -> int:
+        """Smallest capacity of the series initial_capacity * 2^k holding count.
+        
+        Sticking to one series of sizes lets kernels compiled for a capacity
+        be reused from the offline cache when it comes back.
+        """
+        capacity = self.initial_capacity
+        while capacity < count:
+            capacity *= 2
+        return min(capacity, self.max_particles) if self.max_particles else capacity
+    
+    def _make_room(self, count: int):
+        """Make room for count more particles: reclaim retired slots, then grow."""
+        if self.num_particles[None] + count > self.capacity:
+            if self.num_retired[None] > 0:
+                self.compact()
+            self.reserve(self.num_particles[None] + count)
+    
+    def reserve(self, count: int) -> int:
+        """Grow capacity to hold at least count particles (up to max_particles).
+        
+        Returns:
+            The capacity
+        """
+        if count > self.capacity:
+            self.resize(self._capacity_for(count))
+        return self.capacity
+    
+    def shrink(self) -> int:
+        """Release particle memory the live paint does not need.
+        
+        Retired slots are compacted away, then capacity drops to the
+        smallest size step that holds the remaining particles.
+        
+        Returns:
+            The capacity
+        """
+        if self.num_retired[None] > 0:
+            self.compact()
+        capacity = self._capacity_for(self.num_particles[None])
+        if capacity < self.capacity:
+            self.resize(capacity)
+        return self.capacity
+    
+    def resize(self, capacity: int):
+        """Reallocate the per-particle fields with a new capacity.
+        
+        Live particles are copied to the new fields by one kernel launch and
+        the old fields are freed. Freeing them invalidates compiled kernels,
+        so each kernel is recompiled (or loaded from the offline cache) on
+        its next launch.
+        
+        Args:
+            capacity: New number of particle slots
+        
+        Raises:
+            ValueError: If capacity is below the slots in use or above max_particles
+        """
+        n = self.num_particles[None]
+        if capacity < n:
+            raise ValueError(f"Capacity {capacity} cannot hold the {n} slots in use")
+        if self.max_particles and capacity > self.max_particles:
+            raise ValueError(f"Capacity {capacity} exceeds max_particles ({self.max_particles})")
+        if capacity == self.capacity:
+            return
+        old = self.fields
+        self._attach_fields(ParticleFields(capacity, self.particle_layout, self.SCAN_BLOCK))
+        self._migrate(old, n)
+        old.destroy()
+        self.resize_count += 1
+    
+    @ti.kernel
+    def _migrate(self, old: ti.template(), count: ti.i32):
+        """Copy the first count slots of another field set into the current one."""
+        for i in range(count):
+            for name in ti.static(self.MIGRATED_FIELDS):
+                ti.static(getattr(self, name))[i] = ti.static(getattr(old, name))[i]
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """Report the device memory held by the simulation's fields.
+        
+        Returns:
+            Dictionary with the current and peak capacity, bytes that scale
+            with capacity (particle_bytes, bytes_per_particle), bytes of the
+            fixed-size grid, material table and counters (fixed_bytes), and
+            the current and peak totals (total_bytes, peak_bytes)
+        """
+        return {
+            "capacity": self.capacity,
+            "peak_capacity": self.peak_capacity,
+            "bytes_per_particle": round(self.fields.nbytes / self.capacity),
+            "particle_bytes": self.fields.nbytes,
+            "fixed_bytes": self.fixed_bytes,
+            "total_bytes": self.fields.nbytes + self.fixed_bytes,
+            "peak_bytes": self.peak_particle_bytes + self.fixed_bytes,
+        }
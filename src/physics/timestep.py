@@ -0,0 +1,76 @@
+"""Fixed-timestep accumulator and CFL-limited substepping."""
+
+import math
+
+
+class FixedTimestep:
+    """Decouple the physics clock from the display frame rate.
+    
+    Real elapsed time is accumulated and consumed in fixed physics steps,
+    so simulation speed does not depend on how fast frames are rendered.
+    """
+    
+    def __init__(self, step: float, max_steps_per_frame: int = 4):
+        """Initialize accumulator.
+        
+        Args:
+            step: Fixed physics step in seconds
+            max_steps_per_frame: Cap on steps per frame (prevents a spiral
+                of death when physics is slower than real time)
+        """
+        self.step = step
+        self.max_steps_per_frame = max_steps_per_frame
+        self.accumulator = 0.0
+    
+    def advance(self, frame_time: float) -> int:
+        """Add elapsed frame time and return the number of steps to run.
+        
+        Args:
+            frame_time: Real time since the previous frame in seconds
+        
+        Returns:
+            Number of fixed steps to simulate this frame
+        """
+        self.accumulator += max(frame_time, 0.0)
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps_per_frame:
+            # Drop the backlog rather than falling further behind
+            steps = self.max_steps_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+    
+    def reset(self):
+        """Discard accumulated time (e.g. while paused)."""
+        self.accumulator = 0.0
+    
+    @property
+    def alpha(self) -> float:
+        """Fraction of a step left in the accumulator (0-1)."""
+        return self.accumulator / self.step
+
+
+def cfl_substeps(
+    dt: float,
+    max_speed: float,
+    length_scale: float,
+    cfl_number: float = 0.4,
+    max_substeps: int = 8
+) -> int:
+    """Number of substeps keeping particle travel within the CFL limit.
+    
+    Args:
+        dt: Step to subdivide in seconds
+        max_speed: Fastest particle speed (pixels/s)
+        length_scale: Characteristic length, e.g. the smoothing radius (pixels)
+        cfl_number: Fraction of the length scale a particle may cross per substep
+        max_substeps: Upper bound on substeps
+    
+    Returns:
+        Substep count in [1, max_substeps]
+    """
+    if max_speed <= 0.0:
+        return 1
+    substeps = math.ceil(dt * max_speed / (cfl_number * length_scale))
+    return max(1, min(substeps, max_substeps))
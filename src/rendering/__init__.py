@@ -4,5 +4,17 @@ Contains particle renderer for Pygame (Phase 1).
 """
 
 from src.rendering.renderer import ParticleRenderer
+from src.rendering.device_raster import DeviceRasterizer
+from src.rendering.hud import HudLayer
+from src.rendering.print_render import PrintRenderer, PrintStats
+from src.rendering.frame_ring import FrameRing, SharedFrame
 
-__all__ = ["ParticleRenderer"]
+__all__ = [
+    "ParticleRenderer",
+    "DeviceRasterizer",
+    "HudLayer",
+    "PrintRenderer",
+    "PrintStats",
+    "FrameRing",
+    "SharedFrame",
+]
@@ -0,0 +1,221 @@
+"""On-device particle rasterizer (Taichi).
+
+Particles are splatted into a canvas-sized framebuffer where they live, so
+only the finished image crosses to the host each frame instead of every
+particle's position and color.
+"""
+
+import numpy as np
+import pygame
+import taichi as ti
+from typing import Tuple
+
+from src.physics.particle_system import ParticleSystem
+
+
+@ti.data_oriented
+class DeviceRasterizer:
+    """Splat a ParticleSystem's particles into an RGB framebuffer on the device.
+    
+    Uses the same disc stamp and stacking rule as the batched NumPy
+    renderer: every pixel shows the opaque particle drawn last over it
+    (found with an atomic max of particle indices). Translucent particles
+    above that owner are composited with an order-independent weighted
+    blend, since parallel splats have no draw order; for stacks of one
+    translucent layer this matches ordered blending.
+    
+    On the CPU backend the splat loops run serially with plain stores:
+    contended atomics cost more there than the parallelism gains.
+    
+    The framebuffer can show a scaled window of the canvas (scale and
+    set_view), which is how print renders draw large images tile by tile.
+    """
+    
+    def __init__(
+        self,
+        particle_system: ParticleSystem,
+        size: Tuple[int, int],
+        stamp_offsets: Tuple[np.ndarray, np.ndarray],
+        particle_size: int,
+        background_color: Tuple[int, int, int],
+        scale: float = 1.0
+    ):
+        """Initialize rasterizer.
+        
+        Must be created after the particle system (which initializes Taichi).
+        
+        Args:
+            particle_system: Particle system whose fields are drawn
+            size: Framebuffer (width, height) in pixels
+            stamp_offsets: (dx, dy) pixel offsets of the particle disc stamp
+            particle_size: Particle radius in framebuffer pixels
+            background_color: RGB background (0-255)
+            scale: Framebuffer pixels per canvas pixel
+        """
+        self.particle_system = particle_system
+        self.serial = particle_system.get_backend() == "CPU"
+        self.width, self.height = size
+        self.particle_size = particle_size
+        self.scale = float(scale)
+        self.background = tuple(float(c) for c in background_color)
+        
+        stamp_dx, stamp_dy = stamp_offsets
+        self.stamp_len = len(stamp_dx)
+        self.stamp = ti.Vector.field(2, dtype=ti.i32, shape=max(self.stamp_len, 1))
+        self.stamp.from_numpy(np.stack([stamp_dx, stamp_dy], axis=1).astype(np.int32))
+        
+        # View: canvas pixel at the framebuffer's corner (after scaling) and
+        # the canvas drawn (-1 for all)
+        self.origin = ti.Vector.field(2, dtype=ti.i32, shape=())
+        self.view_canvas = ti.field(dtype=ti.i32, shape=())
+        self.view_canvas[None] = -1
+        
+        # Per-pixel opaque owner and translucent accumulators
+        self.owner = ti.field(dtype=ti.i32, shape=size)
+        self.layer_color = ti.Vector.field(3, dtype=ti.f32, shape=size)
+        self.layer_weight = ti.field(dtype=ti.f32, shape=size)
+        self.layer_log_transmittance = ti.field(dtype=ti.f32, shape=size)
+        
+        # Host image reused every frame (width x height x RGB, surfarray layout)
+        self.image = np.zeros((self.width, self.height, 3), dtype=np.uint8)
+    
+    def set_view(self, x: int = 0, y: int = 0, canvas: int = -1):
+        """Choose the region and canvas drawn by the next rasterize.
+        
+        Args:
+            x: Scaled canvas x of the framebuffer's left edge
+            y: Scaled canvas y of the framebuffer's top edge
+            canvas: Canvas to draw (-1 for every canvas)
+        """
+        self.origin[None] = (x, y)
+        self.view_canvas[None] = canvas
+    
+    def rasterize(self) -> np.ndarray:
+        """Rasterize the particles into the host image.
+        
+        Returns:
+            The (width, height, 3) uint8 image, reused by the next call
+        """
+        ps = self.particle_system
+        n = ps.num_particles[None]
+        self._clear()
+        if n > 0:
+            self._splat_opaque(ps.position, ps.material, ps.material_color, ps.is_active,
+                               ps.canvas_id, n)
+            self._splat_translucent(ps.position, ps.material, ps.material_color, ps.is_active,
+                                    ps.canvas_id, n)
+        self._resolve(ps.material, ps.material_color, self.image)
+        return self.image
+    
+    def render(self, surface: pygame.Surface):
+        """Rasterize the particles and copy the image to a surface.
+        
+        Args:
+            surface: Surface of the framebuffer's size to draw into
+        """
+        pygame.surfarray.blit_array(surface, self.rasterize())
+    
+    @ti.func
+    def _stamp_corner(self, pos):
+        """Framebuffer pixel at the top-left of a particle's stamp."""
+        return ti.cast(pos * self.scale, ti.i32) - self.origin[None] - self.particle_size
+    
+    @ti.func
+    def _in_view(self, corner, canvas):
+        """Whether a particle's stamp can touch the framebuffer."""
+        extent = 2 * self.particle_size
+        return ((self.view_canvas[None] < 0 or canvas == self.view_canvas[None])
+                and corner.x + extent >= 0 and corner.x < self.width
+                and corner.y + extent >= 0 and corner.y < self.height)
+    
+    @ti.func
+    def _is_opaque(self, rgba):
+        """Whether a color is opaque after 8-bit quantization."""
+        return ti.cast(rgba[3] * 255.0, ti.i32) >= 255
+    
+    @ti.func
+    def _rgb_255(self, rgba):
+        """8-bit quantized RGB of a 0-1 color, as floats."""
+        return ti.floor(ti.Vector([rgba[0], rgba[1], rgba[2]]) * 255.0)
+    
+    @ti.kernel
+    def _clear(self):
+        """Reset owners and translucent accumulators."""
+        for x, y in self.owner:
+            self.owner[x, y] = -1
+            self.layer_color[x, y] = ti.Vector([0.0, 0.0, 0.0])
+            self.layer_weight[x, y] = 0.0
+            self.layer_log_transmittance[x, y] = 0.0
+    
+    @ti.kernel
+    def _splat_opaque(
+        self,
+        position: ti.template(),
+        material: ti.template(),
+        material_color: ti.template(),
+        is_active: ti.template(),
+        canvas_id: ti.template(),
+        n: ti.i32
+    ):
+        """Depth test: the highest-index opaque particle owns each pixel."""
+        ti.loop_config(serialize=self.serial)
+        for i in range(n):
+            corner = self._stamp_corner(position[i])
+            if (is_active[i] == 1 and self._in_view(corner, canvas_id[i])
+                    and self._is_opaque(material_color[material[i]])):
+                for k in range(self.stamp_len):
+                    p = corner + self.stamp[k]
+                    if 0 <= p.x < self.width and 0 <= p.y < self.height:
+                        if ti.static(self.serial):
+                            # Ascending order: the last write is the highest index
+                            self.owner[p.x, p.y] = i
+                        else:
+                            ti.atomic_max(self.owner[p.x, p.y], i)
+    
+    @ti.kernel
+    def _splat_translucent(
+        self,
+        position: ti.template(),
+        material: ti.template(),
+        material_color: ti.template(),
+        is_active: ti.template(),
+        canvas_id: ti.template(),
+        n: ti.i32
+    ):
+        """Accumulate translucent particles drawn above each pixel's owner."""
+        ti.loop_config(serialize=self.serial)
+        for i in range(n):
+            color = material_color[material[i]]
+            corner = self._stamp_corner(position[i])
+            if (is_active[i] == 1 and self._in_view(corner, canvas_id[i])
+                    and not self._is_opaque(color)):
+                alpha = ti.floor(color[3] * 255.0) / 255.0
+                rgb = self._rgb_255(color) * alpha
+                log_transmittance = ti.log(1.0 - alpha)
+                for k in range(self.stamp_len):
+                    p = corner + self.stamp[k]
+                    if 0 <= p.x < self.width and 0 <= p.y < self.height:
+                        if i > self.owner[p.x, p.y]:
+                            self.layer_color[p.x, p.y] += rgb
+                            self.layer_weight[p.x, p.y] += alpha
+                            self.layer_log_transmittance[p.x, p.y] += log_transmittance
+    
+    @ti.kernel
+    def _resolve(
+        self,
+        material: ti.template(),
+        material_color: ti.template(),
+        out: ti.types.ndarray(dtype=ti.u8, ndim=3)
+    ):
+        """Composite owners, translucent layers and background into out."""
+        for x, y in self.owner:
+            owner = self.owner[x, y]
+            rgb = ti.Vector(self.background)
+            if owner >= 0:
+                rgb = self._rgb_255(material_color[material[owner]])
+            weight = self.layer_weight[x, y]
+            if weight > 0.0:
+                coverage = 1.0 - ti.exp(self.layer_log_transmittance[x, y])
+                rgb = rgb * (1.0 - coverage) + self.layer_color[x, y] / weight * coverage
+            for c in ti.static(range(3)):
+                out[x, y, c] = ti.cast(ti.math.clamp(rgb[c], 0.0, 255.0), ti.u8)
@@ -0,0 +1,272 @@
+"""Asynchronous PNG snapshot and PNG-sequence recording, and streamed PNG output."""
+
+import queue
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pygame
+from PIL import Image
+
+# Queue-full policies
+DROP = "drop"    # Drop the new frame (the render loop never waits)
+BLOCK = "block"  # Wait for a free slot (backpressure, no frames lost)
+
+
+def capture_frame(surface: pygame.Surface) -> np.ndarray:
+    """Copy a surface's pixels for encoding.
+    
+    Args:
+        surface: Surface to capture
+    
+    Returns:
+        (width, height, 3) uint8 array in Pygame's surfarray layout
+    """
+    return pygame.surfarray.array3d(surface)
+
+
+class FrameRecorder:
+    """Encode frames to PNG files on background worker threads.
+    
+    Frames go into a bounded queue so the render loop only pays for the
+    pixel copy; Pillow's PNG encoder releases the GIL while compressing.
+    When the encoders fall behind, the queue-full policy either drops
+    frames or blocks the caller.
+    """
+    
+    def __init__(
+        self,
+        output_dir: Union[str, Path] = "data/exports",
+        workers: int = 2,
+        queue_size: int = 16,
+        policy: str = DROP,
+        compress_level: int = 1
+    ):
+        """Initialize recorder and start its workers.
+        
+        Args:
+            output_dir: Directory for snapshots and recordings
+            workers: Number of encoder threads
+            queue_size: Maximum frames waiting to be encoded
+            policy: Queue-full policy for recorded frames ("drop" or "block")
+            compress_level: PNG zlib level (0-9, lower is faster)
+        """
+        if policy not in (DROP, BLOCK):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.output_dir = Path(output_dir)
+        self.policy = policy
+        self.compress_level = compress_level
+        
+        self.recording_dir: Optional[Path] = None
+        self.frame_index = 0
+        self.frames_submitted = 0
+        self.frames_dropped = 0
+        self.frames_written = 0
+        self.errors: List[Tuple[Path, Exception]] = []
+        
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Path]]]" = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"frame-encoder-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+    
+    @property
+    def recording(self) -> bool:
+        """Whether a PNG sequence is being recorded."""
+        return self.recording_dir is not None
+    
+    @property
+    def pending(self) -> int:
+        """Frames waiting in the queue."""
+        return self._queue.qsize()
+    
+    def snapshot(self, frame: np.ndarray, path: Optional[Union[str, Path]] = None) -> Path:
+        """Queue a single PNG snapshot (never dropped).
+        
+        Args:
+            frame: Frame from capture_frame()
+            path: Output file (timestamped in output_dir if None)
+        
+        Returns:
+            Path the snapshot will be written to
+        """
+        if path is None:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            path = self.output_dir / f"snapshot_{stamp}_{self.frames_submitted:04d}.png"
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.frames_submitted += 1
+        self._queue.put((frame, path))
+        return path
+    
+    def start_recording(self, name: Optional[str] = None) -> Path:
+        """Start recording a PNG sequence.
+        
+        Args:
+            name: Sequence directory name (timestamped if None)
+        
+        Returns:
+            Directory the frames are written to
+        """
+        name = name or time.strftime("recording_%Y%m%d_%H%M%S")
+        self.recording_dir = self.output_dir / name
+        self.recording_dir.mkdir(parents=True, exist_ok=True)
+        self.frame_index = 0
+        return self.recording_dir
+    
+    def stop_recording(self):
+        """Stop recording (queued frames are still written)."""
+        self.recording_dir = None
+    
+    def submit_frame(self, frame: np.ndarray) -> bool:
+        """Queue the next frame of the current recording.
+        
+        Args:
+            frame: Frame from capture_frame()
+        
+        Returns:
+            True if queued, False if dropped (or not recording)
+        """
+        if self.recording_dir is None:
+            return False
+        path = self.recording_dir / f"frame_{self.frame_index:06d}.png"
+        self.frames_submitted += 1
+        if self.policy == BLOCK:
+            self._queue.put((frame, path))
+        else:
+            try:
+                self._queue.put_nowait((frame, path))
+            except queue.Full:
+                self.frames_dropped += 1
+                return False
+        self.frame_index += 1
+        return True
+    
+    def flush(self):
+        """Wait until every queued frame has been written."""
+        self._queue.join()
+    
+    def close(self):
+        """Write remaining frames and stop the workers."""
+        self.stop_recording()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+    
+    def _work(self):
+        """Worker loop: encode queued frames until a stop sentinel."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                frame, path = item
+                try:
+                    self.encode(frame, path)
+                    with self._lock:
+                        self.frames_written += 1
+                except Exception as e:
+                    with self._lock:
+                        self.errors.append((path, e))
+            finally:
+                self._queue.task_done()
+    
+    def encode(self, frame: np.ndarray, path: Path):
+        """Encode one frame to a PNG file.
+        
+        Args:
+            frame: (width, height, 3) uint8 frame
+            path: Output file
+        """
+        image = Image.fromarray(np.ascontiguousarray(frame.swapaxes(0, 1)))
+        image.save(path, format="PNG", compress_level=self.compress_level)
+
+
+class PngStreamWriter:
+    """Write an RGB PNG file band by band, never holding the whole image.
+    
+    Rows are Sub-filtered, fed to a streaming zlib compressor, and each
+    compressed piece is written out as its own IDAT chunk.
+    """
+    
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    
+    def __init__(self, path: Union[str, Path], width: int, height: int, compress_level: int = 6):
+        """Open the file and write the PNG header.
+        
+        Args:
+            path: Output file
+            width: Image width in pixels
+            height: Image height in pixels
+            compress_level: zlib level (0-9)
+        """
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._file = open(path, "wb")
+        self._compressor = zlib.compressobj(compress_level)
+        self._file.write(self.SIGNATURE)
+        # 8-bit truecolor, no interlacing
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+    
+    def __enter__(self) -> "PngStreamWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+    
+    def _chunk(self, kind: bytes, data: bytes):
+        """Write one length-prefixed, CRC-checked chunk."""
+        self._file.write(struct.pack(">I", len(data)) + kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+    
+    def write_rows(self, rows: np.ndarray):
+        """Append the next rows of the image.
+        
+        Args:
+            rows: (k, width, 3) uint8 rows, top to bottom
+        
+        Raises:
+            ValueError: If the rows have the wrong width or overrun the height
+        """
+        if rows.shape[1:] != (self.width, 3):
+            raise ValueError(f"Rows of shape {rows.shape[1:]}, expected {(self.width, 3)}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError("More rows than the image height")
+        flat = np.ascontiguousarray(rows, dtype=np.uint8).reshape(len(rows), -1)
+        # Sub filter: each byte minus the same channel of the previous pixel
+        filtered = np.empty((len(rows), flat.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        filtered[:, 1:4] = flat[:, :3]
+        np.subtract(flat[:, 3:], flat[:, :-3], out=filtered[:, 4:])
+        data = self._compressor.compress(filtered.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows_written += len(rows)
+    
+    def close(self):
+        """Finish the compressed stream and the file.
+        
+        Raises:
+            ValueError: If fewer rows than the image height were written
+        """
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Wrote {self.rows_written} of {self.height} rows")
+            self._chunk(b"IDAT", self._compressor.flush())
+            self._chunk(b"IEND", b"")
+        finally:
+            self._file.close()
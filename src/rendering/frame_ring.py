@@ -0,0 +1,382 @@
+"""Shared-memory ring buffer of rendered frames for other local processes.
+
+The simulator publishes each rendered frame, optionally with the active
+particles' positions and colors, into a fixed number of slots of a named
+multiprocessing.shared_memory block. Consumers (recorders, preview walls)
+attach by name and read the slots as NumPy views, so no frame is encoded,
+serialized or copied on its way out of the simulator beyond the single
+write into the slot.
+
+Layout (little-endian):
+    header   64 bytes: magic, version, slots, width, height,
+             max_particles, slot_bytes, latest sequence number
+    slot k   64-byte slot header (begin/end sequence, step, time, counts),
+             then the (height, width, 3) uint8 RGB frame, then
+             max_particles (x, y) float32 positions and (r, g, b, a)
+             float32 colors
+
+Frame n (numbered from 1) goes into slot (n - 1) % slots. The writer
+stamps the slot's begin sequence before writing and its end sequence after,
+then advances the header's latest sequence. A reader that sees equal begin
+and end sequences after reading (SharedFrame.valid) read a complete frame;
+otherwise the writer lapped it and the frame should be dropped.
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Set, Union
+
+import numpy as np
+import pygame
+
+from src.config import Config
+
+MAGIC = b"PPFR"
+VERSION = 1
+HEADER_BYTES = 64
+SLOT_HEADER_BYTES = 64
+
+HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u4"),
+    ("slots", "<u4"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("max_particles", "<u4"),
+    ("slot_bytes", "<u8"),
+    ("latest", "<u8"),
+    ("reserved", "V24"),
+])
+SLOT_HEADER = np.dtype([
+    ("begin", "<u8"),
+    ("end", "<u8"),
+    ("step", "<u8"),
+    ("time", "<f8"),  # time.time() when the frame was published
+    ("count", "<u4"),  # Particles in the slot
+    ("total", "<u4"),  # Active particles (more than count when truncated)
+    ("reserved", "V24"),
+])
+
+# Blocks created by this process (attaching to them must not untrack them)
+_owned: Set[str] = set()
+
+
+def _aligned(nbytes: int) -> int:
+    """Round a byte count up to a 64-byte boundary."""
+    return (nbytes + 63) // 64 * 64
+
+
+def slot_bytes(width: int, height: int, max_particles: int) -> int:
+    """Bytes of one ring slot."""
+    return (SLOT_HEADER_BYTES + _aligned(width * height * 3)
+            + _aligned(max_particles * 8) + _aligned(max_particles * 16))
+
+
+def open_frame_ring(config: Config) -> Optional["FrameRing"]:
+    """Create the ring configured in export.shared_frames, if any.
+    
+    Frames are canvas-sized; particle arrays are sized for
+    physics.max_particles.
+    
+    Raises:
+        ValueError: If particle arrays are requested without a particle limit
+    """
+    export = config.export
+    if not export.shared_frames:
+        return None
+    max_particles = 0
+    if export.shared_frames_particles:
+        max_particles = config.physics.max_particles
+        if max_particles == 0:
+            raise ValueError("Publishing particle arrays needs a particle limit "
+                             "(physics.max_particles)")
+    return FrameRing.create(
+        export.shared_frames,
+        config.canvas.width,
+        config.canvas.height,
+        max_particles,
+        export.shared_frames_slots
+    )
+
+
+@dataclass
+class SharedFrame:
+    """One published frame, as views into the shared block.
+    
+    The arrays alias the ring slot, which the writer reuses once it has
+    published `slots` more frames. Copy what must outlive that, and check
+    valid() after reading.
+    """
+    seq: int
+    step: int
+    time: float
+    frame: np.ndarray  # (height, width, 3) uint8 RGB
+    positions: np.ndarray  # (count, 2) float32
+    colors: np.ndarray  # (count, 4) float32 RGBA
+    total_particles: int
+    _slot: np.ndarray
+    
+    def valid(self) -> bool:
+        """Whether the slot still holds this frame, unmodified."""
+        slot = self._slot[0]
+        return int(slot["begin"]) == self.seq and int(slot["end"]) == self.seq
+
+
+class FrameRing:
+    """Named shared-memory ring of rendered frames and particle arrays.
+    
+    Use FrameRing.create in the simulator and FrameRing.attach in consumers.
+    The creator owns the block and unlinks it when closed.
+    """
+    
+    def __init__(self, shm: SharedMemory, owner: bool):
+        """Map a shared block (use create or attach).
+        
+        Args:
+            shm: Shared memory holding an initialized ring
+            owner: Whether closing the ring also unlinks the block
+        
+        Raises:
+            ValueError: If the block does not hold a frame ring
+        """
+        self.shm = shm
+        self.owner = owner
+        self._header = None
+        # Checked on a copy, so a rejected block holds no views and can be closed
+        header = np.frombuffer(bytes(shm.buf[:HEADER_BYTES]).ljust(HEADER_BYTES, b"\0"),
+                               dtype=HEADER, count=1)[0]
+        if (bytes(header["magic"]) != MAGIC or int(header["version"]) != VERSION
+                or shm.size < HEADER_BYTES + int(header["slots"]) * int(header["slot_bytes"])):
+            raise ValueError(f"Shared memory {shm.name!r} is not a frame ring")
+        buffer = np.frombuffer(shm.buf, dtype=np.uint8)
+        self._header = buffer[:HEADER_BYTES].view(HEADER)
+        self.slots = int(header["slots"])
+        self.width = int(header["width"])
+        self.height = int(header["height"])
+        self.max_particles = int(header["max_particles"])
+        
+        # Fixed views of every slot's parts
+        size = int(header["slot_bytes"])
+        frame_bytes = self.height * self.width * 3
+        self._slot_headers = []
+        self._frames = []
+        self._positions = []
+        self._colors = []
+        self._targets: Optional[List[pygame.Surface]] = None  # Slot frames as surfaces (writer)
+        for k in range(self.slots):
+            start = HEADER_BYTES + k * size
+            self._slot_headers.append(buffer[start:start + SLOT_HEADER_BYTES].view(SLOT_HEADER))
+            start += SLOT_HEADER_BYTES
+            self._frames.append(
+                buffer[start:start + frame_bytes].reshape(self.height, self.width, 3)
+            )
+            start += _aligned(frame_bytes)
+            self._positions.append(
+                buffer[start:start + self.max_particles * 8].view(np.float32).reshape(-1, 2)
+            )
+            start += _aligned(self.max_particles * 8)
+            self._colors.append(
+                buffer[start:start + self.max_particles * 16].view(np.float32).reshape(-1, 4)
+            )
+    
+    @classmethod
+    def create(
+        cls,
+        name: str,
+        width: int,
+        height: int,
+        max_particles: int = 0,
+        slots: int = 4
+    ) -> "FrameRing":
+        """Create a ring for frames of one size.
+        
+        Args:
+            name: Shared memory name consumers attach to
+            width, height: Frame size in pixels
+            max_particles: Particles stored per frame (0 = frames only)
+            slots: Frames kept before the oldest is overwritten
+        
+        Raises:
+            FileExistsError: If a block of that name already exists
+            ValueError: If the sizes are not positive
+        """
+        if width < 1 or height < 1 or slots < 1 or max_particles < 0:
+            raise ValueError("Frame size and slot count must be positive")
+        size = slot_bytes(width, height, max_particles)
+        shm = SharedMemory(name, create=True, size=HEADER_BYTES + slots * size)
+        _owned.add(shm._name)
+        header = np.ndarray(1, HEADER, buffer=shm.buf)
+        header[0] = (MAGIC, VERSION, slots, width, height, max_particles, size, 0, b"")
+        del header
+        return cls(shm, owner=True)
+    
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        """Map an existing ring for reading.
+        
+        Raises:
+            FileNotFoundError: If no block of that name exists
+            ValueError: If the block does not hold a frame ring
+        """
+        if sys.version_info >= (3, 13):
+            shm = SharedMemory(name, track=False)
+        else:
+            shm = SharedMemory(name)
+            if shm._name not in _owned:
+                # Otherwise this process's resource tracker would unlink the
+                # writer's block when the consumer exits
+                resource_tracker.unregister(shm._name, "shared_memory")
+        try:
+            return cls(shm, owner=False)
+        except ValueError:
+            shm.close()
+            raise
+    
+    @property
+    def name(self) -> str:
+        """Shared memory name."""
+        return self.shm.name
+    
+    @property
+    def latest(self) -> int:
+        """Sequence number of the newest complete frame (0 before the first)."""
+        return int(self._header[0]["latest"])
+    
+    def publish(
+        self,
+        frame: Union[pygame.Surface, np.ndarray],
+        positions: Optional[np.ndarray] = None,
+        colors: Optional[np.ndarray] = None,
+        step: int = 0
+    ) -> int:
+        """Write a frame into the next slot.
+        
+        Particles beyond max_particles are left out (the slot records the
+        full count in total_particles).
+        
+        Args:
+            frame: Rendered surface, or (height, width, 3) uint8 RGB array
+            positions: (n, 2) particle positions
+            colors: (n, 4) particle colors
+            step: Simulation step the frame shows
+        
+        Returns:
+            The frame's sequence number
+        
+        Raises:
+            ValueError: If the frame is not the ring's size
+        """
+        size = frame.get_size() if isinstance(frame, pygame.Surface) else frame.shape[1::-1]
+        if tuple(size) != (self.width, self.height):
+            raise ValueError(f"Frame is {size[0]}x{size[1]}, ring holds "
+                             f"{self.width}x{self.height}")
+        seq = self.latest + 1
+        k = (seq - 1) % self.slots
+        slot = self._slot_headers[k]
+        slot["begin"] = seq
+        
+        if not isinstance(frame, pygame.Surface):
+            np.copyto(self._frames[k], frame)
+        elif frame.get_flags() & pygame.SRCALPHA:
+            # Blitting would blend with the slot's previous frame
+            pixels = pygame.surfarray.pixels3d(frame)
+            np.copyto(self._frames[k], pixels.swapaxes(0, 1))
+            del pixels
+        else:
+            # SDL converts the pixels straight into the slot
+            if self._targets is None:
+                self._targets = [pygame.image.frombuffer(pixels, (self.width, self.height), "RGB")
+                                 for pixels in self._frames]
+            self._targets[k].blit(frame, (0, 0))
+        
+        total = 0 if positions is None else len(positions)
+        count = min(total, self.max_particles)
+        if count:
+            self._positions[k][:count] = positions[:count]
+            self._colors[k][:count] = colors[:count]
+        slot["step"] = step
+        slot["time"] = time.time()
+        slot["count"] = count
+        slot["total"] = total
+        
+        slot["end"] = seq
+        self._header["latest"] = seq
+        return seq
+    
+    def read(self, seq: Optional[int] = None) -> Optional[SharedFrame]:
+        """Get a published frame without copying it.
+        
+        Args:
+            seq: Sequence number (None for the newest frame)
+        
+        Returns:
+            The frame, or None if it is not published yet or was overwritten
+        """
+        latest = self.latest
+        if seq is None:
+            seq = latest
+        if seq < 1 or seq > latest or seq <= latest - self.slots:
+            return None
+        k = (seq - 1) % self.slots
+        slot = self._slot_headers[k]
+        record = slot[0].copy()
+        if int(record["end"]) != seq or int(record["begin"]) != seq:
+            return None
+        count = int(record["count"])
+        return SharedFrame(
+            seq,
+            int(record["step"]),
+            float(record["time"]),
+            self._frames[k],
+            self._positions[k][:count],
+            self._colors[k][:count],
+            int(record["total"]),
+            slot
+        )
+    
+    def wait(self, after: int = 0, timeout: Optional[float] = None,
+             poll: float = 0.001) -> Optional[SharedFrame]:
+        """Wait for a frame newer than a sequence number.
+        
+        Args:
+            after: Sequence number already seen
+            timeout: Seconds to wait (None waits indefinitely)
+            poll: Seconds between checks
+        
+        Returns:
+            The newest frame, or None on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.latest > after:
+                frame = self.read()
+                if frame is not None:
+                    return frame
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+    
+    def close(self):
+        """Unmap the block (and unlink it if this ring created it).
+        
+        Raises:
+            BufferError: If SharedFrame views of the ring are still alive
+        """
+        if self._header is None:
+            return
+        self._header = None
+        self._slot_headers = self._frames = self._positions = self._colors = []
+        self._targets = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+            _owned.discard(self.shm._name)
+    
+    def __enter__(self) -> "FrameRing":
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
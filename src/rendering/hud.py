@@ -0,0 +1,162 @@
+"""Retained-mode HUD overlay with cached text surfaces."""
+
+import pygame
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+_font_cache: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+
+def get_font(size: int, name: Optional[str] = None) -> pygame.font.Font:
+    """Get a cached font.
+    
+    Args:
+        size: Font size
+        name: Font file (None for the Pygame default font)
+    
+    Returns:
+        Shared font instance
+    """
+    key = (name, size)
+    if key not in _font_cache:
+        _font_cache[key] = pygame.font.Font(name, size)
+    return _font_cache[key]
+
+
+@dataclass
+class HudLine:
+    """One line of HUD text and its rendered surface."""
+    text: str
+    position: Tuple[int, int]
+    surface: pygame.Surface
+    rect: pygame.Rect
+    previous_rect: Optional[pygame.Rect] = None
+    dirty: bool = True
+
+
+class HudLayer:
+    """Text overlay that only re-renders and re-displays changed lines.
+    
+    Each line's text surface is rendered once and reused until its text
+    changes. When the scene under the HUD has not been redrawn, changed
+    lines are updated in place by restoring the saved scene pixels beneath
+    them, so only those regions need to be pushed to the display.
+    """
+    
+    def __init__(
+        self,
+        color: Tuple[int, int, int] = (50, 50, 50),
+        size: int = 20,
+        panel_width: int = 320
+    ):
+        """Initialize HUD layer.
+        
+        Args:
+            color: RGB text color (0-255)
+            size: Font size
+            panel_width: Minimum width of the saved scene region under the HUD
+        """
+        self.color = color
+        self.size = size
+        self.panel_width = panel_width
+        self.lines: Dict[str, HudLine] = {}
+        self._removed_rects: List[pygame.Rect] = []
+        
+        # Scene pixels under the HUD, captured on every full redraw
+        self._underlay: Optional[pygame.Surface] = None
+        self._underlay_rect: Optional[pygame.Rect] = None
+    
+    def set_line(self, key: str, text: str, position: Tuple[int, int]):
+        """Set the text of a HUD line, re-rendering it only if it changed.
+        
+        Args:
+            key: Line identifier
+            text: Text to show
+            position: (x, y) position
+        """
+        line = self.lines.get(key)
+        if line is not None and line.text == text and line.position == position:
+            return
+        
+        surface = get_font(self.size).render(text, True, self.color)
+        rect = surface.get_rect(topleft=position)
+        if line is None:
+            self.lines[key] = HudLine(text, position, surface, rect)
+        else:
+            if not line.dirty:
+                line.previous_rect = line.rect
+            line.text = text
+            line.position = position
+            line.surface = surface
+            line.rect = rect
+            line.dirty = True
+    
+    def remove_line(self, key: str):
+        """Remove a HUD line.
+        
+        Args:
+            key: Line identifier
+        """
+        line = self.lines.pop(key, None)
+        if line is not None:
+            self._removed_rects.append(line.previous_rect or line.rect)
+    
+    def draw(self, screen: pygame.Surface, scene_redrawn: bool) -> Optional[List[pygame.Rect]]:
+        """Draw the HUD.
+        
+        Args:
+            screen: Surface to draw on
+            scene_redrawn: Whether the scene was fully redrawn this frame
+        
+        Returns:
+            Screen regions that changed, or None if the scene must be
+            redrawn because a changed line lies outside the saved region
+        """
+        if scene_redrawn:
+            self._capture_underlay(screen)
+            for line in self.lines.values():
+                screen.blit(line.surface, line.rect)
+                line.dirty = False
+                line.previous_rect = None
+            self._removed_rects = []
+            return [screen.get_rect()]
+        
+        changed = [line for line in self.lines.values() if line.dirty]
+        if not changed and not self._removed_rects:
+            return []
+        if self._underlay is None:
+            return None
+        
+        dirty_rects = list(self._removed_rects)
+        for line in changed:
+            region = line.rect.union(line.previous_rect) if line.previous_rect else line.rect
+            dirty_rects.append(region)
+        if not all(self._underlay_rect.contains(region) for region in dirty_rects):
+            return None
+        
+        # Restore the scene under every changed region, then redraw the
+        # lines overlapping them so neighbors clipped by a restore reappear
+        for region in dirty_rects:
+            screen.blit(self._underlay, region, region.move(
+                -self._underlay_rect.x, -self._underlay_rect.y
+            ))
+        for line in self.lines.values():
+            if line.rect.collidelist(dirty_rects) != -1:
+                screen.blit(line.surface, line.rect)
+        for line in changed:
+            line.dirty = False
+            line.previous_rect = None
+        self._removed_rects = []
+        return dirty_rects
+    
+    def _capture_underlay(self, screen: pygame.Surface):
+        """Save the scene pixels under the HUD before lines are drawn."""
+        if not self.lines:
+            self._underlay = None
+            return
+        rects = [line.rect for line in self.lines.values()]
+        region = rects[0].unionall(rects[1:])
+        region.width = max(region.width, self.panel_width)
+        region = region.inflate(0, self.size).clip(screen.get_rect())
+        self._underlay_rect = region
+        self._underlay = screen.subsurface(region).copy()
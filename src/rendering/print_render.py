@@ -0,0 +1,146 @@
+"""Tiled, supersampled high-resolution renders of the final pour (for print).
+
+The canvas is drawn at an arbitrary scale without a display: each output
+tile is rasterized on the device at scale x supersample resolution,
+box-filtered down, and its band of rows is streamed into a PNG file. Peak
+memory is one tile's framebuffer plus one band of output rows, whatever
+the output size.
+"""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+from src.rendering.device_raster import DeviceRasterizer
+from src.rendering.export import PngStreamWriter
+from src.rendering.renderer import ParticleRenderer
+
+
+@dataclass
+class PrintStats:
+    """Outcome of a print render."""
+    path: Path
+    size: Tuple[int, int]
+    tiles: int
+    seconds: float
+
+
+class PrintRenderer:
+    """Render a particle system's canvas at high resolution, tile by tile.
+    
+    Particles are drawn with the device rasterizer's stacking rules at
+    scale x supersample pixels per canvas pixel; each block of
+    supersample x supersample samples is averaged into one output pixel.
+    """
+    
+    def __init__(
+        self,
+        particle_system: ParticleSystem,
+        config: Config,
+        scale: float = 10.0,
+        supersample: int = 2,
+        tile_size: int = 512
+    ):
+        """Initialize print renderer.
+        
+        Args:
+            particle_system: Particle system to draw
+            config: Configuration (particle size and background color)
+            scale: Output pixels per canvas pixel
+            supersample: Samples per output pixel along each axis
+            tile_size: Output tile edge in pixels (bounds device memory)
+        """
+        if scale <= 0 or supersample < 1 or tile_size < 1:
+            raise ValueError("scale, supersample and tile_size must be positive")
+        self.particle_system = particle_system
+        self.scale = float(scale)
+        self.supersample = int(supersample)
+        self.tile_size = int(tile_size)
+        self.width = max(1, round(particle_system.canvas_width * self.scale))
+        self.height = max(1, round(particle_system.canvas_height * self.scale))
+        
+        # Tiles are rasterized at sample resolution
+        sample_scale = self.scale * self.supersample
+        radius = max(1, round(config.render.particle_size * sample_scale))
+        samples = self.tile_size * self.supersample
+        self.rasterizer = DeviceRasterizer(
+            particle_system,
+            (samples, samples),
+            ParticleRenderer._build_stamp(radius),
+            radius,
+            config.canvas.background_color,
+            scale=sample_scale
+        )
+    
+    @property
+    def size(self) -> Tuple[int, int]:
+        """Output (width, height) in pixels."""
+        return self.width, self.height
+    
+    def tiles(self) -> Iterator[Tuple[int, int, int, int]]:
+        """Output tiles as (x, y, width, height), row band by row band."""
+        for y in range(0, self.height, self.tile_size):
+            for x in range(0, self.width, self.tile_size):
+                yield (x, y, min(self.tile_size, self.width - x),
+                       min(self.tile_size, self.height - y))
+    
+    def render_tile(self, x: int, y: int, width: int, height: int,
+                    canvas: Optional[int] = None) -> np.ndarray:
+        """Render one output tile.
+        
+        Args:
+            x, y: Tile's top-left output pixel
+            width, height: Tile size (at most tile_size)
+            canvas: Canvas to draw when several are simulated (None draws all)
+        
+        Returns:
+            (height, width, 3) uint8 rows
+        """
+        ss = self.supersample
+        self.rasterizer.set_view(x * ss, y * ss, -1 if canvas is None else canvas)
+        samples = self.rasterizer.rasterize()[:width * ss, :height * ss]
+        if ss > 1:
+            # Box filter: average each ss x ss block of samples
+            total = samples.reshape(width, ss, height, ss, 3).sum(axis=(1, 3), dtype=np.uint32)
+            samples = ((total + ss * ss // 2) // (ss * ss)).astype(np.uint8)
+        return samples.swapaxes(0, 1)
+    
+    def render(
+        self,
+        path: Union[str, Path],
+        canvas: Optional[int] = None,
+        compress_level: int = 6
+    ) -> PrintStats:
+        """Render the whole canvas and stream it into a PNG file.
+        
+        Args:
+            path: Output PNG file
+            canvas: Canvas to draw when several are simulated (None draws all)
+            compress_level: PNG zlib level (0-9)
+        
+        Returns:
+            Output path, size, tile count and wall-clock time
+        
+        Raises:
+            ValueError: If path is not a .png file
+        """
+        start = time.perf_counter()
+        path = Path(path)
+        if path.suffix.lower() != ".png":
+            raise ValueError(f"Print renders are written as PNG, not {path.suffix or path.name}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        band = np.empty((min(self.tile_size, self.height), self.width, 3), dtype=np.uint8)
+        tiles = 0
+        with PngStreamWriter(path, self.width, self.height, compress_level) as writer:
+            for x, y, width, height in self.tiles():
+                band[:height, x:x + width] = self.render_tile(x, y, width, height, canvas)
+                tiles += 1
+                if x + width == self.width:
+                    writer.write_rows(band[:height])
+        return PrintStats(path, self.size, tiles, time.perf_counter() - start)
+
@@ -2,8 +2,11 @@
 
 import pygame
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
 from src.config import Config
+from src.physics.particle_system import ParticleReadback, ParticleSystem
+from src.rendering.device_raster import DeviceRasterizer
+from src.rendering.hud import get_font
 
 
 class ParticleRenderer:
@@ -13,6 +16,9 @@ class ParticleRenderer:
     Will be replaced with ModernGL in Phase 3+ for better performance.
     """
     
+    # Particles splatted per NumPy batch (bounds temporary memory)
+    SPLAT_CHUNK = 16384
+    
     def __init__(self, config: Config, screen: pygame.Surface):
         """Initialize renderer.
         
@@ -23,15 +29,74 @@ class ParticleRenderer:
         self.config = config
         self.screen = screen
         self.particle_size = config.render.particle_size
+        self.render_mode = config.render.render_mode
         
         # Convert background color from 0-1 to 0-255
         bg = config.canvas.background_color
         self.background_color = bg
+        
+        # Precomputed disc stamp for the batched renderer
+        self.stamp_offsets = self._build_stamp(self.particle_size)
+        self._owner = None
+        
+        # Created on first use in "device" mode, bound to one particle system
+        self._rasterizer: Optional[DeviceRasterizer] = None
+    
+    @staticmethod
+    def _build_stamp(particle_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Build the pixel offsets covered by one particle disc.
+        
+        The disc is rasterized with ``pygame.draw.circle`` so the batched
+        path covers exactly the same pixels as the per-particle blit path.
+        
+        Args:
+            particle_size: Particle radius in pixels
+        
+        Returns:
+            Tuple of (dx, dy) offset arrays relative to the stamp's top-left
+        """
+        stamp = pygame.Surface((particle_size * 2, particle_size * 2), pygame.SRCALPHA)
+        stamp.fill((0, 0, 0, 0))
+        pygame.draw.circle(
+            stamp,
+            (255, 255, 255, 255),
+            (particle_size, particle_size),
+            particle_size
+        )
+        dx, dy = np.nonzero(pygame.surfarray.array_alpha(stamp))
+        return dx.astype(np.int64), dy.astype(np.int64)
     
     def clear(self):
         """Clear the screen with background color."""
         self.screen.fill(self.background_color)
     
+    def render_system(self, particle_system: ParticleSystem, readback: ParticleReadback):
+        """Render the particles of a particle system.
+        
+        In "device" mode the particles are rasterized where they live and
+        only the finished image is copied back; other modes read the
+        particles into host buffers and draw them with render_particles.
+        
+        Args:
+            particle_system: Particle system to draw
+            readback: Host buffers for the readback modes
+        """
+        if self.render_mode == "device":
+            if (self._rasterizer is None
+                    or self._rasterizer.particle_system is not particle_system):
+                self._rasterizer = DeviceRasterizer(
+                    particle_system,
+                    self.screen.get_size(),
+                    self.stamp_offsets,
+                    self.particle_size,
+                    self.background_color
+                )
+            self._rasterizer.render(self.screen)
+            return
+        
+        positions, colors = particle_system.read_particles(readback)
+        self.render_particles(positions, colors)
+    
     def render_particles(self, positions: np.ndarray, colors: np.ndarray):
         """Render all particles.
         
@@ -42,6 +107,173 @@ class ParticleRenderer:
         if len(positions) == 0:
             return
         
+        if self.render_mode == "blit":
+            self._render_particles_blit(positions, colors)
+        else:
+            self._render_particles_batched(positions, colors)
+    
+    def _render_particles_batched(self, positions: np.ndarray, colors: np.ndarray):
+        """Composite all particles into the screen in one NumPy pass.
+        
+        Opaque particles are resolved with a depth test: every covered pixel
+        is owned by the last particle drawn over it (the highest index,
+        matching blit order) and written once. Translucent particles above
+        that owner are then alpha-blended over it in draw order.
+        
+        Args:
+            positions: Nx2 array of (x, y) positions
+            colors: Nx4 array of (r, g, b, a) colors (0-1 range)
+        """
+        width, height = self.screen.get_size()
+        pad = self.particle_size * 2
+        padded_shape = (width + 2 * pad, height + 2 * pad)
+        if self._owner is None or self._owner.shape != padded_shape:
+            self._owner = np.empty(padded_shape, dtype=np.int32)
+        owner = self._owner
+        owner.fill(-1)
+        
+        # Stamp corners in padded buffer coordinates; particles whose stamp
+        # falls entirely off-screen are culled so no per-pixel clipping is needed
+        corners = positions.astype(int) - self.particle_size + pad
+        on_screen = (
+            (corners[:, 0] >= 0) & (corners[:, 0] < width + pad) &
+            (corners[:, 1] >= 0) & (corners[:, 1] < height + pad)
+        )
+        stamp_dx, stamp_dy = self.stamp_offsets
+        stamp_flat = stamp_dx * padded_shape[1] + stamp_dy
+        corner_flat = corners[:, 0] * padded_shape[1] + corners[:, 1]
+        
+        colors_255 = (colors[:, :3] * 255).astype(np.uint8)
+        alphas = (colors[:, 3] * 255).astype(np.uint8)
+        opaque = alphas == 255
+        
+        # Depth test: pairs are written in particle order, so with repeated
+        # pixel indices the last (highest index) particle wins, as with blits
+        self._splat_ids(owner.reshape(-1), np.flatnonzero(on_screen & opaque),
+                        corner_flat, stamp_flat)
+        visible = owner[pad:pad + width, pad:pad + height]
+        
+        covered = visible >= 0
+        if self.screen.get_bytesize() == 4:
+            # Write packed pixels in one masked full-frame copy
+            frame = pygame.surfarray.pixels2d(self.screen)
+            try:
+                packed = self._pack_colors(colors_255)
+                np.copyto(frame, packed.take(visible), where=covered)
+            finally:
+                del frame
+        else:
+            frame = pygame.surfarray.pixels3d(self.screen)
+            try:
+                px, py = np.nonzero(covered)
+                frame[px, py] = colors_255.take(visible[px, py], axis=0)
+            finally:
+                del frame
+        
+        translucent = np.flatnonzero(on_screen & ~opaque)
+        if len(translucent) > 0:
+            frame = pygame.surfarray.pixels3d(self.screen)
+            try:
+                self._blend_translucent(
+                    frame, visible, translucent, corners - pad,
+                    colors_255, alphas
+                )
+            finally:
+                # Release the surface lock held by the pixel view
+                del frame
+    
+    def _pack_colors(self, colors_255: np.ndarray) -> np.ndarray:
+        """Pack RGB colors into the screen's 32-bit pixel format.
+        
+        Args:
+            colors_255: Nx3 uint8 colors
+        
+        Returns:
+            N uint32 mapped pixel values
+        """
+        shifts = self.screen.get_shifts()
+        losses = self.screen.get_losses()
+        channels = colors_255.astype(np.uint32)
+        packed = np.full(len(colors_255), self.screen.get_masks()[3], dtype=np.uint32)
+        for c in range(3):
+            packed |= (channels[:, c] >> losses[c]) << shifts[c]
+        return packed
+    
+    def _splat_ids(
+        self,
+        owner_flat: np.ndarray,
+        ids: np.ndarray,
+        corner_flat: np.ndarray,
+        stamp_flat: np.ndarray
+    ):
+        """Write particle indices into every pixel their stamp covers.
+        
+        Args:
+            owner_flat: Flattened padded owner buffer
+            ids: Ascending particle indices to splat
+            corner_flat: Flat stamp corner index per particle
+            stamp_flat: Flat pixel offsets of the disc stamp
+        """
+        for start in range(0, len(ids), self.SPLAT_CHUNK):
+            chunk = ids[start:start + self.SPLAT_CHUNK]
+            pixels = corner_flat[chunk][:, None] + stamp_flat
+            owner_flat[pixels.ravel()] = np.repeat(chunk, len(stamp_flat))
+    
+    def _blend_translucent(
+        self,
+        frame: np.ndarray,
+        visible: np.ndarray,
+        ids: np.ndarray,
+        corners: np.ndarray,
+        colors_255: np.ndarray,
+        alphas: np.ndarray
+    ):
+        """Alpha-blend translucent particles over the resolved opaque layer.
+        
+        Args:
+            frame: Pixel view of the screen (width x height x 3)
+            visible: Opaque owner per screen pixel (-1 for background)
+            ids: Ascending indices of on-screen translucent particles
+            corners: Unpadded stamp corner per particle
+            colors_255: Nx3 uint8 colors
+            alphas: N uint8 alphas
+        """
+        width, height = visible.shape
+        stamp_dx, stamp_dy = self.stamp_offsets
+        xs = (corners[ids, 0][:, None] + stamp_dx).ravel()
+        ys = (corners[ids, 1][:, None] + stamp_dy).ravel()
+        pair_ids = np.repeat(ids, len(stamp_dx))
+        
+        # Only layers drawn after the opaque owner are visible
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        xs, ys, pair_ids = xs[inside], ys[inside], pair_ids[inside]
+        above = pair_ids > visible[xs, ys]
+        xs, ys, pair_ids = xs[above], ys[above], pair_ids[above]
+        if len(pair_ids) == 0:
+            return
+        
+        # Rank layers per pixel so each pass touches every pixel at most once
+        pixel = xs * height + ys
+        order = np.lexsort((pair_ids, pixel))
+        xs, ys, pixel, pair_ids = xs[order], ys[order], pixel[order], pair_ids[order]
+        first = np.r_[True, pixel[1:] != pixel[:-1]]
+        segment_start = np.maximum.accumulate(np.where(first, np.arange(len(pixel)), 0))
+        rank = np.arange(len(pixel)) - segment_start
+        
+        for layer in range(rank.max() + 1):
+            sel = rank == layer
+            lx, ly, lid = xs[sel], ys[sel], pair_ids[sel]
+            alpha = alphas[lid][:, None] / 255.0
+            under = frame[lx, ly]
+            frame[lx, ly] = (under * (1.0 - alpha) + colors_255[lid] * alpha).astype(np.uint8)
+    
+    def _render_particles_blit(self, positions: np.ndarray, colors: np.ndarray):
+        """Render particles one at a time with per-particle blits.
+        
+        Args:
+            positions: Nx2 array of (x, y) positions
+            colors: Nx4 array of (r, g, b, a) colors (0-1 range)
+        """
         # Convert colors from 0-1 to 0-255
         colors_255 = (colors[:, :3] * 255).astype(int)
         alphas = colors[:, 3]
@@ -88,6 +320,5 @@ class ParticleRenderer:
             color: RGB color tuple (0-255)
             size: Font size
         """
-        font = pygame.font.Font(None, size)
-        text_surface = font.render(text, True, color)
+        text_surface = get_font(size).render(text, True, color)
         self.screen.blit(text_surface, position)
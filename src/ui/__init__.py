@@ -4,5 +4,6 @@ Contains main window and UI controls.
 """
 
 from src.ui.main_window import PaintPouringWindow
+from src.ui.profiler import FrameProfiler
 
-__all__ = ["PaintPouringWindow"]
+__all__ = ["PaintPouringWindow", "FrameProfiler"]
@@ -1,11 +1,23 @@
 """Main application window with Pygame."""
 
+import time
+from pathlib import Path
+from typing import List, Optional
+
 import pygame
 import taichi as ti
 from src.config import Config
+from src.batch.recipe import Recipe, RecipeAction, RecipeRecorder, RecipeReplayer
 from src.physics.particle_system import ParticleSystem
+from src.physics.emitter import Emission, Emitter
 from src.physics.canvas import Canvas
+from src.physics.checkpoint import load_checkpoint, save_checkpoint
+from src.physics.timestep import FixedTimestep
 from src.rendering.renderer import ParticleRenderer
+from src.rendering.hud import HudLayer
+from src.rendering.export import FrameRecorder, capture_frame
+from src.rendering.frame_ring import open_frame_ring
+from src.ui.profiler import FrameProfiler
 
 
 class PaintPouringWindow:
@@ -14,11 +26,13 @@ class PaintPouringWindow:
     Handles event processing, rendering, and simulation updates.
     """
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, replay: Optional[Recipe] = None):
         """Initialize main window.
         
         Args:
             config: Configuration object
+            replay: Recorded session to play back (its settings must already
+                be applied to config, see Recipe.configure)
         """
         self.config = config
         
@@ -30,13 +44,63 @@ class PaintPouringWindow:
         
         # Initialize components
         self.particle_system = ParticleSystem(config)
+        max_particles = config.physics.max_particles
+        if max_particles and self.particle_system.capacity < max_particles:
+            # Allocate the full capacity before warming up: growing mid-pour
+            # rebuilds the fields and recompiles every kernel
+            self.particle_system.reserve(max_particles)
+            self.particle_system.warm_up()
+        elif not config.physics.warm_up:
+            # Compile kernels now so the first pour does not stall
+            self.particle_system.warm_up()
+        self.readback = self.particle_system.create_readback()
         self.canvas = Canvas(config.canvas.width, config.canvas.height)
         self.renderer = ParticleRenderer(config, self.screen)
+        self.hud = HudLayer()
+        self.recorder = FrameRecorder(
+            config.export.output_dir,
+            workers=config.export.workers,
+            queue_size=config.export.queue_size,
+            policy=config.export.queue_policy,
+            compress_level=config.export.compress_level
+        )
+        # Frames for other processes (recorders, preview walls), if configured
+        self.frame_ring = open_frame_ring(config)
+        
+        # Per-stage frame timing (only syncs the device while enabled)
+        self.profiler = FrameProfiler(
+            config.ui.profiler_window,
+            sync=ti.sync,
+            enabled=config.ui.show_profiler
+        )
+        self.show_profiler = config.ui.show_profiler
+        
+        # Clicks and drags queue paint; each frame's paint goes out in one launch
+        self.emitter = Emitter(
+            self.particle_system,
+            flow_rate=config.physics.pour_flow_rate,
+            frame_budget=config.physics.emit_budget,
+            spacing=config.physics.pour_spacing,
+            on_emit=self.on_emit
+        )
+        self.stroke = None  # Pour following the mouse while the left button is held
         
         # Simulation state
         self.running = True
         self.paused = False
+        self.scene_dirty = True  # Scene changed while paused
         self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep(
+            config.physics.time_step,
+            config.physics.max_steps_per_frame
+        )
+        self.physics_step = 0  # Fixed steps simulated; recipe action clock
+        
+        # Session recording and playback
+        self.recipe_recorder = RecipeRecorder(config)
+        self.replayer = None
+        if replay is not None:
+            self.replayer = RecipeReplayer(replay, self.particle_system, self.on_replay_action)
         
         # Current paint settings
         self.current_color = config.COLOR_PRESETS["blue"]
@@ -65,6 +129,17 @@ class PaintPouringWindow:
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
                     self.add_paint_at_mouse()
+                elif event.button == 3:  # Right click
+                    self.remove_paint_at_mouse()
+            
+            elif event.type == pygame.MOUSEMOTION:
+                if self.stroke is not None:
+                    self.stroke.move_to(*event.pos)
+            
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1 and self.stroke is not None:
+                    self.emitter.end_stroke(self.stroke)
+                    self.stroke = None
             
             elif event.type == pygame.KEYDOWN:
                 self.handle_keypress(event.key)
@@ -98,9 +173,11 @@ class PaintPouringWindow:
         # Viscosity adjustment
         elif key == pygame.K_EQUALS or key == pygame.K_PLUS:
             self.current_viscosity = min(self.current_viscosity + 50, 1000)
+            self.record_action("viscosity", self.current_viscosity)
             print(f"Viscosity: {self.current_viscosity}")
         elif key == pygame.K_MINUS:
             self.current_viscosity = max(self.current_viscosity - 50, 50)
+            self.record_action("viscosity", self.current_viscosity)
             print(f"Viscosity: {self.current_viscosity}")
         
         # Simulation controls
@@ -110,28 +187,119 @@ class PaintPouringWindow:
         elif key == pygame.K_r:
             self.reset_simulation()
         
-        # Export (placeholder for Phase 5)
+        # Export
         elif key == pygame.K_e:
-            print("Export feature coming in Phase 5!")
+            path = self.recorder.snapshot(capture_frame(self.screen))
+            print(f"Saving snapshot: {path}")
+        elif key == pygame.K_v:
+            self.toggle_recording()
         elif key == pygame.K_s:
-            print("Save recipe feature coming in Phase 5!")
+            self.save_recipe()
+        elif key == pygame.K_c:
+            self.save_checkpoint()
+        
+        # Profiling
+        elif key == pygame.K_p:
+            self.toggle_profiler()
+        elif key == pygame.K_t:
+            self.toggle_trace()
     
     def add_paint_at_mouse(self):
-        """Add paint particles at current mouse position."""
+        """Pour a burst of paint at the mouse and keep pouring while it is held."""
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        paint = (self.current_color, self.current_density, self.current_viscosity)
+        self.emitter.emit(mouse_x, mouse_y, self.config.physics.click_particles, *paint)
+        if self.stroke is not None:
+            self.emitter.end_stroke(self.stroke)
+        self.stroke = self.emitter.start_stroke(mouse_x, mouse_y, *paint)
+    
+    def emit_paint(self):
+        """Queue this frame's flow from held pours and submit all queued paint."""
+        self.emitter.pour(self.clock.get_time() / 1000.0)
+        if self.emitter.flush():
+            self.scene_dirty = True
+    
+    def on_emit(self, emissions: List[Emission]):
+        """Record submitted paint in the session recipe."""
+        for e in emissions:
+            self.record_action("emit", e.x, e.y, e.count, *e.color, e.density, e.viscosity)
+    
+    def remove_paint_at_mouse(self, radius: float = 20.0):
+        """Remove paint particles around the current mouse position."""
         mouse_x, mouse_y = pygame.mouse.get_pos()
+        self.particle_system.remove_particles(float(mouse_x), float(mouse_y), radius)
+        self.record_action("remove", mouse_x, mouse_y, radius)
+        self.scene_dirty = True
+    
+    def toggle_recording(self):
+        """Start or stop recording a PNG sequence."""
+        if self.recorder.recording:
+            self.recorder.stop_recording()
+            print(f"Recording stopped ({self.recorder.frames_dropped} frames dropped)")
+        else:
+            path = self.recorder.start_recording()
+            print(f"Recording to {path}")
+    
+    def toggle_profiler(self):
+        """Show or hide the frame profiler overlay."""
+        self.show_profiler = not self.show_profiler
+        self.profiler.enabled = self.show_profiler or self.profiler.tracing
+        self.profiler.reset()
+        if not self.show_profiler:
+            for key in [k for k in self.hud.lines if k.startswith("profile_")]:
+                self.hud.remove_line(key)
+    
+    def toggle_trace(self):
+        """Start or stop capturing a Chrome trace of frame stages."""
+        if self.profiler.tracing:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            path = self.profiler.stop_trace(
+                Path(self.config.export.output_dir) / f"trace_{stamp}.json"
+            )
+            self.profiler.enabled = self.show_profiler
+            print(f"Saved trace: {path}")
+        else:
+            self.profiler.start_trace()
+            print("Capturing trace (press T again to save)")
+    
+    def record_action(self, kind: str, *args: float):
+        """Log an action to the session recipe, stamped with the next physics step."""
+        self.recipe_recorder.record(self.physics_step, kind, *args)
+    
+    def save_recipe(self):
+        """Save the session so far as a recipe file."""
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        path = Path(self.config.export.recipe_dir) / f"recipe_{stamp}.jsonl.gz"
+        recipe = self.recipe_recorder.save(path, self.physics_step)
+        print(f"Saved recipe ({len(recipe.actions)} actions, {recipe.steps} steps): {path}")
+    
+    def save_checkpoint(self):
+        """Save the full simulation state so the pour can be resumed later."""
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        path = Path(self.config.export.checkpoint_dir) / f"checkpoint_{stamp}.npz"
+        save_checkpoint(self.particle_system, path)
+        print(f"Saved checkpoint: {path}")
+    
+    def load_checkpoint(self, path: str):
+        """Resume from a saved simulation state.
         
-        # Convert color tuple to Taichi vector
-        color_vec = ti.Vector(self.current_color)
-        
-        # Add 300 particles
-        self.particle_system.add_particles(
-            float(mouse_x),
-            float(mouse_y),
-            300,
-            color_vec,
-            self.current_density,
-            self.current_viscosity
-        )
+        Args:
+            path: Checkpoint archive or directory
+        """
+        load_checkpoint(self.particle_system, path)
+        self.canvas.set_tilt(*self.particle_system.get_tilt())
+        self.scene_dirty = True
+        print(f"Resumed {self.particle_system.get_particle_count()} particles from {path}")
+    
+    def on_replay_action(self, action: RecipeAction):
+        """Mirror a replayed action in the window state."""
+        if action.kind == "tilt":
+            self.canvas.set_tilt(*action.args)
+        elif action.kind == "viscosity":
+            self.current_viscosity = action.args[0]
+        elif action.kind == "reset":
+            self.canvas.reset_tilt()
+        self.scene_dirty = True
     
     def update_particle_system_tilt(self):
         """Update particle system with current canvas tilt."""
@@ -139,52 +307,116 @@ class PaintPouringWindow:
             self.canvas.tilt.x_angle,
             self.canvas.tilt.y_angle
         )
+        self.record_action("tilt", self.canvas.tilt.x_angle, self.canvas.tilt.y_angle)
     
     def reset_simulation(self):
-        """Reset the simulation."""
+        """Reset the simulation (keeping particle memory, so no kernels recompile)."""
         self.particle_system.reset()
+        self.emitter.clear()
+        self.stroke = None
+        self.record_action("reset")
         self.canvas.reset_tilt()
         self.update_particle_system_tilt()
+        self.scene_dirty = True
         print("Canvas reset")
     
     def update(self):
-        """Update simulation physics."""
-        if not self.paused:
-            dt = self.config.physics.time_step
-            self.particle_system.update(dt)
+        """Update simulation physics.
+        
+        Real frame time is consumed in fixed physics steps, each split into
+        adaptive substeps, so simulation speed is independent of the frame rate.
+        """
+        if self.paused:
+            self.timestep.reset()
+            return
+        
+        frame_time = self.clock.get_time() / 1000.0
+        for _ in range(self.timestep.advance(frame_time)):
+            if self.replayer is not None:
+                self.replayer.apply_actions(self.physics_step)
+            self.particle_system.advance(self.config.physics.time_step)
+            self.physics_step += 1
     
     def render(self):
-        """Render the current frame."""
-        # Clear screen
-        self.renderer.clear()
+        """Render the current frame.
         
-        # Get particle data and render
-        positions, colors = self.particle_system.get_particle_data()
-        self.renderer.render_particles(positions, colors)
+        The particle scene is redrawn only while the simulation runs or
+        after it changed; otherwise just the HUD lines that changed are
+        pushed to the display.
+        """
+        profiler = self.profiler
+        if self.paused and not self.scene_dirty:
+            with profiler.stage("hud"):
+                self.update_hud()
+                dirty_rects = self.hud.draw(self.screen, scene_redrawn=False)
+            if dirty_rects is None:
+                # A changed line lies outside the saved scene region; redraw
+                # the scene next frame so the HUD stays one stage per frame
+                self.scene_dirty = True
+            elif dirty_rects:
+                with profiler.stage("flip"):
+                    pygame.display.update(dirty_rects)
+            return
+        
+        # Clear screen and draw particles
+        if self.renderer.render_mode == "device":
+            with profiler.stage("render", sync=True):
+                self.renderer.clear()
+                self.renderer.render_system(self.particle_system, self.readback)
+        else:
+            with profiler.stage("readback", sync=True):
+                positions, colors = self.particle_system.read_particles(self.readback)
+            with profiler.stage("render"):
+                self.renderer.clear()
+                self.renderer.render_particles(positions, colors)
         
         # Render UI info
+        with profiler.stage("hud"):
+            self.update_hud()
+            self.hud.draw(self.screen, scene_redrawn=True)
+        self.scene_dirty = False
+        
+        if self.frame_ring is not None:
+            with profiler.stage("publish"):
+                self.publish_frame()
+        
+        # Update display
+        with profiler.stage("flip"):
+            pygame.display.flip()
+    
+    def publish_frame(self):
+        """Publish the rendered frame and the particles to the shared-memory ring."""
+        positions = colors = None
+        if self.frame_ring.max_particles:
+            positions, colors = self.particle_system.read_particles(self.readback)
+        self.frame_ring.publish(self.screen, positions, colors, self.physics_step)
+    
+    def update_hud(self):
+        """Update HUD lines (each is only re-rendered when its text changes)."""
         if self.config.ui.show_particle_count:
-            count_text = f"Particles: {self.particle_system.get_particle_count()}"
-            self.renderer.render_ui_text(count_text, (10, 10))
+            ps = self.particle_system
+            count_text = f"Particles: {ps.get_particle_count()} ({ps.get_awake_count()} moving)"
+            self.hud.set_line("particles", count_text, (10, 10))
         
         if self.config.ui.show_fps:
             fps_text = f"FPS: {int(self.clock.get_fps())}"
-            self.renderer.render_ui_text(fps_text, (10, 30))
+            self.hud.set_line("fps", fps_text, (10, 30))
         
         # Show tilt
-        tilt_text = self.canvas.get_tilt_display()
-        self.renderer.render_ui_text(tilt_text, (10, 50))
+        self.hud.set_line("tilt", self.canvas.get_tilt_display(), (10, 50))
         
         # Show backend
         backend_text = f"Backend: {self.particle_system.get_backend()}"
-        self.renderer.render_ui_text(backend_text, (10, 70))
+        self.hud.set_line("backend", backend_text, (10, 70))
         
         # Show current viscosity
         visc_text = f"Viscosity: {int(self.current_viscosity)} cP"
-        self.renderer.render_ui_text(visc_text, (10, 90))
+        self.hud.set_line("viscosity", visc_text, (10, 90))
         
-        # Update display
-        pygame.display.flip()
+        # Frame profile (refreshed a few times per second)
+        if self.show_profiler and self.profiler.frame_index % 15 == 0:
+            for k, line in enumerate(self.profiler.summary_lines()):
+                self.hud.set_line(f"profile_{k}", line, (10, 120 + 20 * k))
     
     def run(self):
         """Main application loop."""
@@ -192,21 +424,49 @@ class PaintPouringWindow:
         print("Python Digital Paint Pouring Simulator")
         print("="*50)
         print(f"Backend: {self.particle_system.get_backend()}")
-        print(f"Max particles: {self.config.physics.max_particles}")
+        print(self.particle_system.startup_metrics.summary())
+        print(f"Max particles: {self.config.physics.max_particles or 'unlimited'} "
+              f"(capacity {self.particle_system.capacity})")
+        if self.frame_ring is not None:
+            print(f"Publishing frames to shared memory '{self.frame_ring.name}'")
         print("\nControls:")
-        print("  Left Click: Add paint")
+        print("  Left Click/Drag: Pour paint")
+        print("  Right Click: Remove paint")
         print("  1-9: Select color")
         print("  Arrow Keys: Tilt canvas")
         print("  +/-: Adjust viscosity")
         print("  Space: Pause/Resume")
         print("  R: Reset canvas")
+        print("  E: Save snapshot")
+        print("  V: Start/stop recording")
+        print("  S: Save session recipe")
+        print("  C: Save checkpoint")
+        print("  P: Show/hide frame profiler")
+        print("  T: Start/stop trace capture")
         print("  ESC/Close: Exit")
         print("="*50 + "\n")
         
+        profiler = self.profiler
         while self.running:
-            self.handle_events()
-            self.update()
+            profiler.begin_frame()
+            with profiler.stage("events"):
+                self.handle_events()
+            with profiler.stage("emit", sync=True):
+                self.emit_paint()
+            with profiler.stage("physics", sync=True):
+                self.update()
             self.render()
+            if self.recorder.recording:
+                with profiler.stage("record"):
+                    self.recorder.submit_frame(capture_frame(self.screen))
+            profiler.end_frame()
             self.clock.tick(self.config.render.fps)
         
+        if profiler.tracing:
+            self.toggle_trace()
+        
+        self.recorder.close()
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+        
         print("\nSimulator closed. Thank you!")
@@ -0,0 +1,157 @@
+"""Per-stage frame profiler with rolling percentiles and Chrome-trace export."""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+class FrameProfiler:
+    """Time the stages of the main loop.
+    
+    Stage durations are kept in rolling windows for percentile summaries.
+    While a trace is being captured, every stage is also logged as a
+    Chrome trace event (viewable in chrome://tracing or Perfetto).
+    
+    When disabled, stages cost one attribute check and no device sync.
+    """
+    
+    # Cap on trace events held in memory (oldest dropped first)
+    MAX_TRACE_EVENTS = 200000
+    
+    def __init__(
+        self,
+        window: int = 240,
+        sync: Optional[Callable[[], None]] = None,
+        enabled: bool = False
+    ):
+        """Initialize profiler.
+        
+        Args:
+            window: Frames kept for rolling percentiles
+            sync: Called before timing a synced stage's end (e.g. ti.sync, so
+                asynchronous device work is attributed to its stage)
+            enabled: Whether to start enabled
+        """
+        self.window = window
+        self.sync = sync
+        self.enabled = enabled
+        self.samples: Dict[str, Deque[float]] = {}
+        self.tracing = False
+        self.trace_events: Deque[dict] = deque(maxlen=self.MAX_TRACE_EVENTS)
+        self.frame_index = 0
+        self._frame_start: Optional[float] = None
+        self._origin = time.perf_counter()
+    
+    @contextmanager
+    def stage(self, name: str, sync: bool = False) -> Iterator[None]:
+        """Time a block of code as a named stage.
+        
+        Args:
+            name: Stage name
+            sync: Wait for pending device work before stopping the clock
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if sync and self.sync is not None:
+                self.sync()
+            self._record(name, start, time.perf_counter())
+    
+    def begin_frame(self):
+        """Mark the start of a frame."""
+        if self.enabled:
+            self._frame_start = time.perf_counter()
+    
+    def end_frame(self):
+        """Mark the end of a frame, recording its total time."""
+        if self.enabled and self._frame_start is not None:
+            self._record("frame", self._frame_start, time.perf_counter())
+            self.frame_index += 1
+        self._frame_start = None
+    
+    def _record(self, name: str, start: float, end: float):
+        """Store one stage duration (and trace event if capturing)."""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append((end - start) * 1000.0)
+        if self.tracing:
+            self.trace_events.append({
+                "name": name,
+                "cat": "frame" if name == "frame" else "stage",
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"frame": self.frame_index},
+            })
+    
+    def percentiles(
+        self,
+        name: str,
+        quantiles: Sequence[float] = (50, 95, 99)
+    ) -> Optional[List[float]]:
+        """Get rolling percentiles of a stage's duration.
+        
+        Args:
+            name: Stage name
+            quantiles: Percentiles to compute (0-100)
+        
+        Returns:
+            Durations in milliseconds, or None if the stage has no samples
+        """
+        samples = self.samples.get(name)
+        if not samples:
+            return None
+        return np.percentile(np.fromiter(samples, dtype=np.float64), quantiles).tolist()
+    
+    def summary_lines(self) -> List[str]:
+        """Format p50/p95/p99 of every stage, frame total first."""
+        names = sorted(self.samples, key=lambda n: (n != "frame", n))
+        lines = []
+        for name in names:
+            p50, p95, p99 = self.percentiles(name)
+            lines.append(f"{name:<9} p50 {p50:6.2f}  p95 {p95:6.2f}  p99 {p99:6.2f} ms")
+        return lines
+    
+    def reset(self):
+        """Clear all rolling samples."""
+        self.samples.clear()
+    
+    def start_trace(self):
+        """Start capturing trace events (enables the profiler)."""
+        self.enabled = True
+        self.trace_events.clear()
+        self.tracing = True
+    
+    def stop_trace(self, path: Union[str, Path]) -> Path:
+        """Stop capturing and write the trace in Chrome trace JSON format.
+        
+        Args:
+            path: Output JSON file
+        
+        Returns:
+            The written path
+        """
+        self.tracing = False
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "traceEvents": list(self.trace_events),
+                "displayTimeUnit": "ms",
+            }, f)
+        self.trace_events.clear()
+        return path
@@ -0,0 +1,28 @@
+"""Tests for benchmark baseline comparison."""
+
+from benchmarks.suite import compare
+
+
+def record(case, median_ms, particles=1000):
+    """Create a benchmark result record."""
+    return {"case": case, "backend": "cpu", "particles": particles, "median_ms": median_ms}
+
+
+class TestBaselineComparison:
+    """Test regression detection against a baseline."""
+    
+    def test_regression_flagged(self):
+        """Test slowdowns beyond tolerance are flagged."""
+        baseline = [record("update", 10.0), record("render_particles", 10.0)]
+        results = [record("update", 13.0), record("render_particles", 11.0)]
+        
+        comparisons = compare(results, baseline, tolerance=0.25)
+        
+        assert [c["regression"] for c in comparisons] == [True, False]
+        assert comparisons[0]["ratio"] == 1.3
+    
+    def test_unmatched_results_skipped(self):
+        """Test results missing from the baseline are not compared."""
+        comparisons = compare([record("update", 5.0, particles=500)], [record("update", 5.0)], 0.25)
+        
+        assert comparisons == []
@@ -0,0 +1,164 @@
+"""Tests for simulation checkpoints."""
+
+import pytest
+import numpy as np
+import taichi as ti
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+from src.physics.checkpoint import save_checkpoint, load_checkpoint, read_checkpoint
+
+
+@pytest.fixture
+def config():
+    """Create test configuration."""
+    config = Config()
+    config.physics.max_particles = 2000
+    return config
+
+
+def pour(ps):
+    """Emit two pours, tilt and remove some paint."""
+    ps.add_particles(400.0, 300.0, 300, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 500.0)
+    ps.add_particles(420.0, 310.0, 200, ti.Vector([0.2, 0.5, 0.9, 1.0]), 1.2, 300.0)
+    ps.set_tilt(10.0, -20.0)
+    ps.remove_particles(400.0, 300.0, 4.0)
+    for _ in range(5):
+        ps.advance(0.016)
+
+
+def advance(ps, steps):
+    """Advance a system by a number of fixed steps."""
+    for _ in range(steps):
+        ps.advance(0.016)
+
+
+class TestCheckpoint:
+    """Test saving and restoring simulation state."""
+    
+    @pytest.mark.parametrize("name", ["pour.npz", "pour_dir"])
+    def test_round_trip(self, config, tmp_path, name):
+        """Test a restored system holds exactly the saved state."""
+        ps = ParticleSystem(config)
+        pour(ps)
+        path = save_checkpoint(ps, tmp_path / name)
+        expected_positions, expected_colors = ps.get_particle_data()
+        expected_count = ps.get_particle_count()
+        expected_retired = ps.num_retired[None]
+        
+        # A new system re-initializes Taichi, invalidating the old one
+        restored = ParticleSystem(config)
+        load_checkpoint(restored, path)
+        positions, colors = restored.get_particle_data()
+        
+        np.testing.assert_array_equal(positions, expected_positions)
+        np.testing.assert_array_equal(colors, expected_colors)
+        assert restored.get_particle_count() == expected_count
+        assert restored.num_retired[None] == expected_retired > 0
+        assert restored.tilt_x[0] == pytest.approx(10.0)
+        assert restored.tilt_y[0] == pytest.approx(-20.0)
+    
+    def test_resume_matches_uninterrupted_run(self, config, tmp_path):
+        """Test resuming from a checkpoint continues the same simulation."""
+        ps = ParticleSystem(config)
+        pour(ps)
+        path = save_checkpoint(ps, tmp_path / "pour.npz")
+        advance(ps, 10)
+        ps.add_particles(300.0, 200.0, 100, ti.Vector([0.2, 0.8, 0.3, 1.0]), 1.0, 300.0)
+        expected, _ = ps.get_particle_data()
+        
+        resumed = ParticleSystem(config)
+        load_checkpoint(resumed, path)
+        advance(resumed, 10)
+        resumed.add_particles(300.0, 200.0, 100, ti.Vector([0.2, 0.8, 0.3, 1.0]), 1.0, 300.0)
+        positions, _ = resumed.get_particle_data()
+        
+        np.testing.assert_array_equal(positions, expected)
+    
+    def test_directory_arrays_are_memory_mapped(self, config, tmp_path):
+        """Test directory checkpoints are read through memory maps."""
+        ps = ParticleSystem(config)
+        pour(ps)
+        save_checkpoint(ps, tmp_path / "pour_dir")
+        
+        scalars, arrays = read_checkpoint(tmp_path / "pour_dir")
+        assert scalars["num_particles"] == 500
+        assert isinstance(arrays["position"], np.memmap)
+    
+    def test_directory_overwrite_replaces_whole_checkpoint(self, config, tmp_path):
+        """Test saving over a checkpoint directory leaves no arrays from the old save."""
+        ps = ParticleSystem(config)
+        pour(ps)
+        path = save_checkpoint(ps, tmp_path / "pour_dir")
+        np.save(path / "color.npy", np.zeros((500, 4), dtype=np.float32))
+        ps.remove_particles(420.0, 310.0, 30.0)
+        save_checkpoint(ps, path)
+        
+        scalars, arrays = read_checkpoint(path)
+        assert set(arrays) == set(ps.state_arrays())
+        assert scalars["num_retired"] == ps.num_retired[None]
+        assert [entry.name for entry in tmp_path.iterdir()] == ["pour_dir"]
+    
+    def test_directory_save_refuses_other_directories(self, config, tmp_path):
+        """Test a directory that is not a checkpoint is never replaced."""
+        (tmp_path / "notes.txt").write_text("keep me")
+        with pytest.raises(FileExistsError):
+            save_checkpoint(ParticleSystem(config), tmp_path)
+        assert (tmp_path / "notes.txt").exists()
+    
+    def test_capacity_checked(self, config, tmp_path):
+        """Test restoring into a system that is too small fails."""
+        ps = ParticleSystem(config)
+        pour(ps)
+        path = save_checkpoint(ps, tmp_path / "pour.npz")
+        
+        config.physics.max_particles = 100
+        with pytest.raises(ValueError):
+            load_checkpoint(ParticleSystem(config), path)
+    
+    def test_loads_per_particle_paint_state(self, config):
+        """Test states storing color, density and viscosity per particle still load."""
+        ps = ParticleSystem(config)
+        pour(ps)
+        scalars, arrays = ps.get_state()
+        expected_positions, expected_colors = ps.get_particle_data()
+        n = scalars["num_particles"]
+        table = np.array(scalars.pop("materials"), dtype=np.float32)
+        paints = table[arrays.pop("material")]
+        arrays.update(color=paints[:, :4], density=paints[:, 4], viscosity=paints[:, 5])
+        
+        restored = ParticleSystem(config)
+        restored.set_state(scalars, arrays)
+        positions, colors = restored.get_particle_data()
+        
+        assert len(positions) == n
+        assert len(restored.materials) == 2
+        np.testing.assert_array_equal(positions, expected_positions)
+        np.testing.assert_array_equal(colors, expected_colors)
+    
+    @pytest.mark.parametrize("damage", ["missing_array", "truncated_array",
+                                        "missing_scalar", "other_canvas"])
+    def test_rejected_state_leaves_system_unchanged(self, config, damage):
+        """Test a bad state is refused before the running system is touched."""
+        ps = ParticleSystem(config)
+        pour(ps)
+        scalars, arrays = ps.get_state()
+        ps.reset()
+        ps.add_particles(200.0, 200.0, 50, ti.Vector([0.1, 0.9, 0.1, 1.0]), 1.0, 300.0)
+        expected_positions, expected_colors = ps.get_particle_data()
+        expected_materials = dict(ps.materials)
+        
+        if damage == "missing_array":
+            del arrays["velocity"]
+        elif damage == "truncated_array":
+            arrays["position"] = arrays["position"][:-1]
+        elif damage == "missing_scalar":
+            del scalars["step_count"]
+        else:
+            scalars["canvas"] = [1024, 768]
+        with pytest.raises(ValueError):
+            ps.set_state(scalars, arrays)
+        
+        positions, colors = ps.get_particle_data()
+        np.testing.assert_array_equal(positions, expected_positions)
+        np.testing.assert_array_equal(colors, expected_colors)
+        assert ps.materials == expected_materials
@@ -0,0 +1,125 @@
+"""Tests for batched paint emission."""
+
+import pytest
+import numpy as np
+import taichi as ti
+from src.config import Config
+from src.physics.emitter import Emitter
+from src.physics.particle_system import ParticleSystem
+
+RED = (0.9, 0.2, 0.2, 1.0)
+BLUE = (0.2, 0.5, 0.9, 1.0)
+
+
+@pytest.fixture
+def config():
+    """Create test configuration."""
+    config = Config()
+    config.physics.max_particles = 2000
+    return config
+
+
+@pytest.fixture
+def particle_system(config):
+    """Create particle system instance."""
+    return ParticleSystem(config)
+
+
+def particle_state(ps):
+    """Copy every per-particle field of the live slots."""
+    n = ps.num_particles[None]
+    return [field.to_numpy()[:n] for field, _ in ps.particle_fields]
+
+
+class TestBatchEmission:
+    """Test submitting several emissions in one launch."""
+    
+    def test_batch_matches_sequential_emission(self, config):
+        """Test one batched launch places the same particles as separate calls."""
+        config.physics.num_canvases = 2
+        pours = [(100.0, 200.0, 7, RED, 1.0, 300.0, 0),
+                 (300.5, 250.25, 50, BLUE, 1.2, 500.0, 1),
+                 (120.0, 210.0, 30, BLUE, 1.0, 100.0, 0)]
+        
+        ps = ParticleSystem(config)
+        for x, y, count, color, density, viscosity, canvas in pours:
+            ps.add_particles(x, y, count, ti.Vector(color), density, viscosity, canvas)
+        expected = particle_state(ps)
+        
+        ps = ParticleSystem(config)
+        params = np.array([(x, y, *color, density, viscosity)
+                           for x, y, _, color, density, viscosity, _ in pours])
+        added = ps.add_particle_batch(params, [p[2] for p in pours], [p[6] for p in pours])
+        
+        assert added == 87
+        for actual, wanted in zip(particle_state(ps), expected):
+            np.testing.assert_array_equal(actual, wanted)
+    
+    def test_capacity_is_respected(self, particle_system):
+        """Test a batch larger than the free capacity is truncated."""
+        params = np.array([(400.0, 300.0, *RED, 1.0, 300.0)] * 3)
+        added = particle_system.add_particle_batch(params, [1000, 800, 500], [0, 0, 0])
+        assert added == 2000
+        assert particle_system.get_particle_count() == 2000
+
+
+class TestEmitter:
+    """Test the per-frame emission queue."""
+    
+    def test_flush_uses_one_launch(self, particle_system, monkeypatch):
+        """Test every queued emission is submitted together."""
+        launches = []
+        original = particle_system.add_particle_batch
+        monkeypatch.setattr(particle_system, "add_particle_batch",
+                            lambda *args: launches.append(args) or original(*args))
+        emitter = Emitter(particle_system)
+        for k in range(5):
+            emitter.emit(100.0 + 50 * k, 300.0, 40, RED)
+        
+        assert emitter.flush() == 200
+        assert len(launches) == 1
+        assert particle_system.get_particle_count() == 200
+        assert emitter.flush() == 0
+    
+    def test_budget_carries_excess_to_next_frame(self, particle_system):
+        """Test paint beyond the frame budget waits in the queue."""
+        emitter = Emitter(particle_system, frame_budget=250)
+        emitter.emit(300.0, 300.0, 200, RED)
+        emitter.emit(500.0, 300.0, 200, BLUE)
+        
+        assert emitter.flush() == 250
+        assert emitter.backlog == 150
+        assert emitter.flush() == 150
+        assert emitter.backlog == 0
+        assert particle_system.get_particle_count() == 400
+    
+    def test_stroke_follows_drag_path(self, particle_system):
+        """Test a dragged pour spreads its flow along the path."""
+        emitted = []
+        emitter = Emitter(particle_system, flow_rate=600.0, spacing=10.0, on_emit=emitted.extend)
+        stroke = emitter.start_stroke(100.0, 300.0, RED)
+        stroke.move_to(150.0, 300.0)
+        stroke.move_to(150.0, 350.0)
+        emitter.pour(0.1)
+        emitter.flush()
+        
+        assert sum(e.count for e in emitted) == 60
+        assert len(emitted) == 10
+        xs = [e.x for e in emitted]
+        ys = [e.y for e in emitted]
+        assert xs == sorted(xs) and ys == sorted(ys)
+        assert (emitted[-1].x, emitted[-1].y) == (150.0, 350.0)
+        assert max(np.hypot(np.diff(xs), np.diff(ys))) <= 10.0 + 1e-6
+    
+    def test_flow_rate_accumulates_fractions(self, particle_system):
+        """Test a held pour emits flow_rate particles per second at any frame rate."""
+        emitter = Emitter(particle_system, flow_rate=100.0)
+        stroke = emitter.start_stroke(400.0, 300.0, BLUE)
+        for _ in range(60):
+            emitter.pour(1.0 / 60.0)
+            emitter.flush()
+        emitter.end_stroke(stroke)
+        emitter.pour(1.0)
+        emitter.flush()
+        
+        assert particle_system.get_particle_count() == pytest.approx(100, abs=1)
@@ -0,0 +1,122 @@
+"""Tests for asynchronous frame export."""
+
+import threading
+
+import pytest
+import numpy as np
+import pygame
+from PIL import Image
+from src.rendering.export import FrameRecorder, PngStreamWriter, capture_frame
+
+
+@pytest.fixture
+def frame():
+    """Capture a small frame with a recognizable pixel."""
+    surface = pygame.Surface((40, 30))
+    surface.fill((242, 242, 238))
+    surface.set_at((5, 7), (255, 0, 0))
+    return capture_frame(surface)
+
+
+class BlockedRecorder(FrameRecorder):
+    """Recorder whose encoders wait until released."""
+    
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        super().__init__(*args, **kwargs)
+    
+    def encode(self, frame, path):
+        self.release.wait()
+        super().encode(frame, path)
+
+
+class TestFrameRecorder:
+    """Test snapshot and PNG-sequence recording."""
+    
+    def test_snapshot(self, frame, tmp_path):
+        """Test a snapshot is encoded with the frame's pixels."""
+        recorder = FrameRecorder(tmp_path)
+        path = recorder.snapshot(frame)
+        recorder.close()
+        
+        image = np.asarray(Image.open(path))
+        assert image.shape == (30, 40, 3)
+        assert tuple(image[7, 5]) == (255, 0, 0)
+        assert recorder.frames_written == 1
+    
+    def test_recording_sequence(self, frame, tmp_path):
+        """Test recorded frames are numbered in order."""
+        recorder = FrameRecorder(tmp_path, policy="block")
+        directory = recorder.start_recording("take1")
+        for _ in range(5):
+            assert recorder.submit_frame(frame)
+        recorder.stop_recording()
+        recorder.close()
+        
+        assert sorted(p.name for p in directory.iterdir()) == [
+            f"frame_{i:06d}.png" for i in range(5)
+        ]
+    
+    def test_not_recording(self, frame, tmp_path):
+        """Test frames are ignored when not recording."""
+        recorder = FrameRecorder(tmp_path)
+        
+        assert not recorder.submit_frame(frame)
+        recorder.close()
+    
+    def test_drop_policy(self, frame, tmp_path):
+        """Test frames are dropped instead of stalling when encoders lag."""
+        recorder = BlockedRecorder(tmp_path, workers=1, queue_size=2, policy="drop")
+        recorder.start_recording()
+        accepted = [recorder.submit_frame(frame) for _ in range(10)]
+        recorder.release.set()
+        recorder.close()
+        
+        assert not all(accepted)
+        assert recorder.frames_dropped == accepted.count(False)
+        assert recorder.frames_written == accepted.count(True)
+    
+    def test_block_policy(self, frame, tmp_path):
+        """Test backpressure keeps every frame."""
+        recorder = FrameRecorder(tmp_path, workers=1, queue_size=1, policy="block")
+        recorder.start_recording()
+        for _ in range(10):
+            recorder.submit_frame(frame)
+        recorder.close()
+        
+        assert recorder.frames_dropped == 0
+        assert recorder.frames_written == 10
+    
+    def test_invalid_policy(self, tmp_path):
+        """Test unknown queue policies are rejected."""
+        with pytest.raises(ValueError):
+            FrameRecorder(tmp_path, policy="sometimes")
+
+
+class TestPngStreamWriter:
+    """Test band-by-band PNG output."""
+    
+    def test_round_trip(self, tmp_path):
+        """Test rows written in bands decode to the original image."""
+        rows = np.random.default_rng(0).integers(0, 256, (37, 50, 3), dtype=np.uint8)
+        path = tmp_path / "image.png"
+        with PngStreamWriter(path, 50, 37) as writer:
+            writer.write_rows(rows[:16])
+            writer.write_rows(rows[16:32])
+            writer.write_rows(rows[32:])
+        
+        assert np.array_equal(np.asarray(Image.open(path)), rows)
+    
+    def test_incomplete_image(self, tmp_path):
+        """Test closing before every row is written fails."""
+        writer = PngStreamWriter(tmp_path / "image.png", 4, 4)
+        writer.write_rows(np.zeros((2, 4, 3), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            writer.close()
+    
+    def test_wrong_width(self, tmp_path):
+        """Test rows of another width are rejected."""
+        with PngStreamWriter(tmp_path / "image.png", 4, 1) as writer:
+            with pytest.raises(ValueError):
+                writer.write_rows(np.zeros((1, 5, 3), dtype=np.uint8))
+            writer.write_rows(np.zeros((1, 4, 3), dtype=np.uint8))
@@ -0,0 +1,102 @@
+"""Tests for the process-pool render farm."""
+
+import multiprocessing
+import os
+import signal
+from pathlib import Path
+
+import pytest
+from src.config import Config
+from src.batch import EmitEvent, PourScript, collect_scripts, run_farm
+
+
+@pytest.fixture
+def scripts(tmp_path):
+    """Write two small pours and one broken script."""
+    directory = tmp_path / "scripts"
+    directory.mkdir()
+    for seed in (1, 2):
+        PourScript(
+            steps=5,
+            seed=seed,
+            emits=[EmitEvent(step=0, x=400.0, y=300.0, count=50)],
+        ).save(directory / f"pour_{seed}.json")
+    (directory / "broken.json").write_text("{not json")
+    return directory
+
+
+def farm_config():
+    """Small CPU configuration for farm workers."""
+    config = Config()
+    config.physics.backend = "cpu"
+    config.physics.max_particles = 500
+    return config
+
+
+class TestRenderFarm:
+    """Test parallel offline rendering."""
+    
+    def test_collect_scripts(self, scripts, tmp_path):
+        """Test directories expand to their sorted JSON files."""
+        extra = tmp_path / "extra.json"
+        found = collect_scripts([scripts, extra])
+        
+        assert [p.name for p in found] == ["broken.json", "pour_1.json", "pour_2.json", "extra.json"]
+    
+    def test_failures_are_isolated(self, scripts, tmp_path):
+        """Test a broken script fails alone while the others render."""
+        progress = []
+        
+        results = run_farm(
+            farm_config(), [scripts], tmp_path / "out", workers=2,
+            on_result=lambda result, done, total: progress.append((done, total))
+        )
+        
+        by_name = {Path(result.script).name: result for result in results}
+        assert not by_name["broken.json"].ok
+        assert "JSONDecodeError" in by_name["broken.json"].error
+        for name in ("pour_1", "pour_2"):
+            assert by_name[f"{name}.json"].ok
+            assert by_name[f"{name}.json"].total_seconds > 0
+            assert by_name[f"{name}.json"].memory_bytes > 0
+            assert (tmp_path / "out" / f"{name}.png").exists()
+        assert progress == [(1, 3), (2, 3), (3, 3)]
+    
+    def test_dead_worker_only_fails_its_job(self, tmp_path):
+        """Test a worker killed mid-job is replaced and the unfinished jobs still run."""
+        directory = tmp_path / "scripts"
+        directory.mkdir()
+        for name, steps in (("a", 2), ("b", 2000), ("c", 2)):
+            PourScript(
+                steps=steps,
+                emits=[EmitEvent(step=0, x=400.0, y=300.0, count=50)],
+            ).save(directory / f"{name}.json")
+        
+        def kill_workers(result, done, total):
+            # One worker: after the first job it is busy with the long one
+            if done == 1:
+                for child in multiprocessing.active_children():
+                    os.kill(child.pid, signal.SIGKILL)
+        
+        results = run_farm(farm_config(), [directory], tmp_path / "out", workers=1,
+                           on_result=kill_workers)
+        
+        assert sorted(Path(result.script).name for result in results) == [
+            "a.json", "b.json", "c.json"
+        ]
+        assert all(result.ok for result in results)
+        assert len({result.worker for result in results}) == 2
+    
+    def test_repeated_names_get_distinct_images(self, tmp_path):
+        """Test scripts with the same name in different directories do not overwrite each other."""
+        for directory in ("left", "right"):
+            (tmp_path / directory).mkdir()
+            PourScript(steps=2).save(tmp_path / directory / "pour.json")
+        
+        results = run_farm(farm_config(), [tmp_path / "left", tmp_path / "right"],
+                           tmp_path / "out", workers=1)
+        
+        assert sorted(Path(result.output).name for result in results) == [
+            "left_pour.png", "right_pour.png"
+        ]
+        assert all(Path(result.output).exists() for result in results)
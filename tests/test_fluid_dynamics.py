@@ -54,3 +54,63 @@ class TestFluidDynamics:
         # Negative tilt should give negative velocity
         vx_neg, _ = fluid_dynamics.calculate_flow_velocity(-30.0, 0.0, 300.0)
         assert vx_neg < 0
+    
+    def test_kernel_coefficients(self, fluid_dynamics):
+        """Test 2D poly6 kernel integrates to one over its support."""
+        poly6, spiky_grad, viscosity_laplacian = fluid_dynamics.kernel_coefficients()
+        h = fluid_dynamics.smoothing_radius
+        
+        dr = h / 20000
+        r = np.arange(20000) * dr + dr / 2
+        integral = np.sum(poly6 * (h * h - r * r) ** 3 * 2 * np.pi * r) * dr
+        
+        assert integral == pytest.approx(1.0, rel=1e-3)
+        assert spiky_grad < 0
+        assert viscosity_laplacian > 0
+    
+    def test_flow_velocity_broadcasts(self, fluid_dynamics):
+        """Test the array API matches the scalar one and broadcasts."""
+        tilts = np.linspace(-45.0, 45.0, 7)
+        viscosities = np.array([100.0, 300.0, 800.0])
+        vx, vy = fluid_dynamics.flow_velocity(tilts[:, None], 10.0, viscosities[None, :])
+        
+        assert vx.shape == vy.shape == (7, 3)
+        for i, tilt in enumerate(tilts):
+            for j, viscosity in enumerate(viscosities):
+                expected = fluid_dynamics.calculate_flow_velocity(tilt, 10.0, viscosity)
+                assert (vx[i, j], vy[i, j]) == pytest.approx(expected)
+
+
+class TestFlowTable:
+    """Test precomputed flow lookup tables."""
+    
+    def test_matches_direct_calculation(self, fluid_dynamics):
+        """Test interpolated flow stays close to the exact model."""
+        rng = np.random.default_rng(0)
+        tilt_x = rng.uniform(-45.0, 45.0, 10000)
+        tilt_y = rng.uniform(-45.0, 45.0, 10000)
+        viscosity = rng.uniform(0.0, 2000.0, 10000)
+        
+        vx, vy = fluid_dynamics.flow_table().lookup(tilt_x, tilt_y, viscosity)
+        exact_x, exact_y = fluid_dynamics.flow_velocity(tilt_x, tilt_y, viscosity)
+        
+        assert vx.dtype == np.float32
+        np.testing.assert_allclose(vx, exact_x, atol=1e-3)
+        np.testing.assert_allclose(vy, exact_y, atol=1e-3)
+    
+    def test_grid_points_are_exact(self, fluid_dynamics):
+        """Test queries on sample points return the sampled values."""
+        vx, vy = fluid_dynamics.flow_table().lookup([-45.0, 0.0, 45.0], 30.0, 0.0)
+        np.testing.assert_allclose(vx, [-9.8 * np.sqrt(0.5), 0.0, 9.8 * np.sqrt(0.5)], rtol=1e-5)
+        np.testing.assert_allclose(vy, 4.9, rtol=1e-5)
+    
+    def test_out_of_range_is_clamped(self, fluid_dynamics):
+        """Test queries beyond the table use its edge values."""
+        table = fluid_dynamics.flow_table()
+        vx, _ = table.lookup([60.0, 45.0], 0.0, [5000.0, 2000.0])
+        assert vx[0] == pytest.approx(vx[1])
+    
+    def test_tables_are_cached(self, fluid_dynamics):
+        """Test the same table is reused for the same parameters."""
+        assert fluid_dynamics.flow_table() is fluid_dynamics.flow_table()
+        assert fluid_dynamics.flow_table(gravity=5.0) is not fluid_dynamics.flow_table()
@@ -0,0 +1,137 @@
+"""Tests for the shared-memory frame ring."""
+
+import subprocess
+import sys
+import uuid
+
+import pytest
+import numpy as np
+import pygame
+from src.config import Config
+from src.rendering.frame_ring import FrameRing, open_frame_ring
+
+
+@pytest.fixture
+def ring():
+    """Create a small ring with room for 10 particles per frame."""
+    ring = FrameRing.create(f"pp_test_{uuid.uuid4().hex[:8]}", 40, 30, max_particles=10, slots=3)
+    yield ring
+    ring.close()
+
+
+@pytest.fixture
+def surface():
+    """Create a small surface with a recognizable pixel."""
+    surface = pygame.Surface((40, 30))
+    surface.fill((242, 242, 238))
+    surface.set_at((5, 7), (255, 0, 0))
+    return surface
+
+
+def particles(n):
+    """Make n particles' positions and colors."""
+    positions = np.arange(2 * n, dtype=np.float32).reshape(n, 2)
+    colors = np.full((n, 4), 0.5, dtype=np.float32)
+    return positions, colors
+
+
+class TestFrameRing:
+    """Test publishing and reading frames."""
+    
+    def test_round_trip(self, ring, surface):
+        """Test a published surface and its particles read back unchanged."""
+        positions, colors = particles(6)
+        seq = ring.publish(surface, positions, colors, step=12)
+        frame = ring.read()
+        
+        assert seq == ring.latest == frame.seq == 1
+        assert frame.step == 12
+        assert frame.frame.shape == (30, 40, 3)
+        assert tuple(frame.frame[7, 5]) == (255, 0, 0)
+        assert tuple(frame.frame[0, 0]) == (242, 242, 238)
+        assert np.array_equal(frame.positions, positions)
+        assert np.array_equal(frame.colors, colors)
+        assert frame.valid()
+    
+    def test_array_frame(self, ring):
+        """Test (height, width, 3) arrays are published as they are."""
+        image = np.random.default_rng(0).integers(0, 256, (30, 40, 3), dtype=np.uint8)
+        ring.publish(image)
+        
+        frame = ring.read()
+        assert np.array_equal(frame.frame, image)
+        assert len(frame.positions) == frame.total_particles == 0
+    
+    def test_wrong_size(self, ring):
+        """Test frames of another size are rejected."""
+        with pytest.raises(ValueError):
+            ring.publish(pygame.Surface((30, 40)))
+    
+    def test_truncated_particles(self, ring, surface):
+        """Test particles beyond the slot size are left out but counted."""
+        ring.publish(surface, *particles(25))
+        
+        frame = ring.read()
+        assert len(frame.positions) == 10
+        assert frame.total_particles == 25
+    
+    def test_overwritten_frames(self, ring, surface):
+        """Test frames are dropped once the writer laps them."""
+        ring.publish(surface)
+        first = ring.read(1)
+        for _ in range(3):
+            ring.publish(surface)
+        
+        assert not first.valid()
+        assert ring.read(1) is None
+        assert ring.read(2).seq == 2
+        assert ring.read(5) is None
+    
+    def test_wait(self, ring, surface):
+        """Test waiting returns the newest frame, or None on timeout."""
+        assert ring.wait(timeout=0.01) is None
+        ring.publish(surface)
+        ring.publish(surface)
+        
+        assert ring.wait(after=0, timeout=0.01).seq == 2
+        assert ring.wait(after=2, timeout=0.01) is None
+    
+    def test_other_process(self, ring, surface):
+        """Test another process attaches by name and reads the frame."""
+        ring.publish(surface, *particles(3), step=4)
+        code = (
+            "from src.rendering.frame_ring import FrameRing\n"
+            f"ring = FrameRing.attach({ring.name!r})\n"
+            "frame = ring.read()\n"
+            "print(frame.step, frame.frame[7, 5].tolist(), len(frame.positions), frame.valid())\n"
+            "del frame\n"
+            "ring.close()\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines()[-1] == "4 [255, 0, 0] 3 True"
+        # The consumer exiting leaves the writer's block in place
+        FrameRing.attach(ring.name).close()
+    
+    def test_close_unlinks(self, surface):
+        """Test closing the creating ring removes the block."""
+        ring = FrameRing.create(f"pp_test_{uuid.uuid4().hex[:8]}", 40, 30)
+        ring.close()
+        
+        with pytest.raises(FileNotFoundError):
+            FrameRing.attach(ring.name)
+    
+    def test_from_config(self):
+        """Test the configured ring is canvas-sized with max_particles slots."""
+        config = Config()
+        assert open_frame_ring(config) is None
+        
+        config.export.shared_frames = f"pp_test_{uuid.uuid4().hex[:8]}"
+        with open_frame_ring(config) as ring:
+            assert (ring.width, ring.height) == (config.canvas.width, config.canvas.height)
+            assert ring.max_particles == config.physics.max_particles
+        
+        config.physics.max_particles = 0
+        with pytest.raises(ValueError):
+            open_frame_ring(config)
@@ -0,0 +1,206 @@
+"""Tests for scripted pours and the headless runner."""
+
+import uuid
+
+import pytest
+import numpy as np
+import pygame
+from src.config import Config
+from src.batch import EmitEvent, TiltEvent, PourScript, HeadlessRunner, run_pour, run_pours
+from src.rendering.frame_ring import FrameRing
+
+
+@pytest.fixture
+def config():
+    """Create test configuration."""
+    return Config()
+
+
+@pytest.fixture
+def script():
+    """Create a small scripted pour."""
+    return PourScript(
+        steps=20,
+        emits=[
+            EmitEvent(step=0, x=400.0, y=300.0, count=100, color="red"),
+            EmitEvent(step=5, x=200.0, y=200.0, count=50, color=[0.0, 1.0, 0.0]),
+        ],
+        tilts=[TiltEvent(step=10, x=20.0, y=-10.0)],
+    )
+
+
+class TestPourScript:
+    """Test pour script parsing."""
+    
+    def test_round_trip(self, script, tmp_path):
+        """Test saving and loading a script preserves it."""
+        path = tmp_path / "pour.json"
+        script.save(path)
+        
+        assert PourScript.load(path) == script
+    
+    def test_color_resolution(self):
+        """Test preset names and RGB lists resolve to RGBA."""
+        assert EmitEvent(0, 0.0, 0.0, color="red").rgba() == Config.COLOR_PRESETS["red"]
+        assert EmitEvent(0, 0.0, 0.0, color=[0.1, 0.2, 0.3]).rgba() == (0.1, 0.2, 0.3, 1.0)
+    
+    def test_events_by_step(self, script):
+        """Test events are grouped by the step they fire on."""
+        events = script.events_by_step()
+        
+        assert sorted(events) == [0, 5, 10]
+        assert isinstance(events[10][0], TiltEvent)
+
+
+class TestHeadlessRunner:
+    """Test headless simulation."""
+    
+    def test_run_script(self, config, script):
+        """Test a scripted pour emits paint and applies the tilt schedule."""
+        runner = HeadlessRunner(config)
+        elapsed = runner.run(script)
+        
+        assert elapsed > 0
+        assert runner.particle_system.get_particle_count() == 150
+        assert runner.particle_system.tilt_x[0] == pytest.approx(20.0)
+        assert runner.particle_system.tilt_y[0] == pytest.approx(-10.0)
+    
+    def test_run_resets_state(self, config, script):
+        """Test every run starts from an empty, level canvas."""
+        runner = HeadlessRunner(config)
+        runner.run(script)
+        runner.run(PourScript(steps=1))
+        
+        assert runner.particle_system.get_particle_count() == 0
+        assert runner.particle_system.tilt_x[0] == 0.0
+    
+    def test_reused_runner_recycles_materials(self, config):
+        """Test a runner reused for many jobs runs more paints than the table holds."""
+        config.physics.max_materials = 4
+        runner = HeadlessRunner(config)
+        for job in range(3):
+            runner.run(PourScript(steps=2, emits=[
+                EmitEvent(step=0, x=100.0 * k, y=300.0, count=10, color=[0.1 * job, 0.1 * k, 0.5])
+                for k in range(1, 4)
+            ]))
+        
+        assert len(runner.particle_system.materials) == 3
+        assert runner.particle_system.get_particle_count() == 30
+    
+    def test_save_image(self, config, script, tmp_path):
+        """Test the final canvas is written without a display."""
+        runner = HeadlessRunner(config)
+        runner.run(script)
+        output = tmp_path / "out" / "pour.png"
+        runner.save(output)
+        
+        image = pygame.surfarray.array3d(pygame.image.load(str(output)))
+        assert image.shape == (config.canvas.width, config.canvas.height, 3)
+        assert np.any(image != config.canvas.background_color)
+    
+    def test_save_print(self, config, script, tmp_path):
+        """Test a print scale makes the saved image a tiled high-resolution render."""
+        config.export.print_scale = 2.0
+        config.export.print_supersample = 2
+        config.export.print_tile = 300
+        runner = HeadlessRunner(config)
+        runner.run(script)
+        output = tmp_path / "print.png"
+        runner.save(output)
+        
+        image = pygame.surfarray.array3d(pygame.image.load(str(output)))
+        assert image.shape == (2 * config.canvas.width, 2 * config.canvas.height, 3)
+        assert np.any(image != config.canvas.background_color)
+    
+    def test_publish_interval_zero(self, config, script):
+        """Test a zero publish interval turns headless publishing off."""
+        config.export.shared_frames = f"pp_test_{uuid.uuid4().hex[:8]}"
+        config.export.shared_frames_interval = 0
+        runner = HeadlessRunner(config)
+        try:
+            runner.run(script)
+            assert runner.frame_ring.latest == 0
+        finally:
+            runner.close()
+    
+    def test_run_pour_keeps_config(self, config, tmp_path):
+        """Test a pour seeds a copy of the configuration, not the caller's."""
+        config.physics.random_seed = 7
+        run_pour(config, PourScript(steps=2, seed=3), tmp_path / "pour.png")
+        
+        assert (tmp_path / "pour.png").exists()
+        assert config.physics.random_seed == 7
+    
+    def test_publish_frames(self, config, script):
+        """Test runs publish every interval-th step to the shared frame ring."""
+        config.export.shared_frames = f"pp_test_{uuid.uuid4().hex[:8]}"
+        config.export.shared_frames_interval = 5
+        runner = HeadlessRunner(config)
+        consumer = FrameRing.attach(config.export.shared_frames)
+        try:
+            runner.run(script)
+            
+            assert consumer.latest == 4
+            frame = consumer.read()
+            assert frame.step == 20
+            assert len(frame.positions) == frame.total_particles == 150
+            assert np.array_equal(frame.frame, runner.frame_ring.read().frame)
+            del frame
+        finally:
+            consumer.close()
+            runner.close()
+
+
+class TestBatchedCanvases:
+    """Test several pours simulated together."""
+    
+    def test_batch_matches_single_runs(self, config, script):
+        """Test each canvas of a batch evolves exactly like a single run."""
+        runner = HeadlessRunner(config)
+        runner.run(script)
+        expected, _ = runner.particle_system.get_particle_data(0)
+        
+        config.physics.num_canvases = 3
+        batch = HeadlessRunner(config)
+        batch.run_batch([script, script, script])
+        
+        for canvas in range(3):
+            positions, _ = batch.particle_system.get_particle_data(canvas)
+            np.testing.assert_array_equal(positions, expected)
+    
+    def test_canvases_are_independent(self, config, script):
+        """Test tilt, paint and seeds stay on their own canvas."""
+        other = PourScript(
+            steps=20,
+            seed=3,
+            emits=[EmitEvent(step=0, x=100.0, y=100.0, count=40, color="blue")],
+        )
+        config.physics.num_canvases = 2
+        runner = HeadlessRunner(config)
+        runner.run_batch([script, other])
+        ps = runner.particle_system
+        
+        assert ps.get_particle_count(0) == 150
+        assert ps.get_particle_count(1) == 40
+        assert ps.get_tilt(0) == pytest.approx((20.0, -10.0))
+        assert ps.get_tilt(1) == (0.0, 0.0)
+        positions, _ = ps.get_particle_data(1)
+        assert np.all(np.abs(positions - 100.0) < 30.0)
+    
+    def test_run_pours_saves_each_canvas(self, config, script, tmp_path):
+        """Test a batch writes one image per script."""
+        outputs = [tmp_path / "a.png", tmp_path / "b.png"]
+        run_pours(config, [script, PourScript(steps=5)], outputs)
+        
+        assert all(path.exists() for path in outputs)
+        assert config.physics.num_canvases == 1
+    
+    def test_empty_batch(self, config):
+        """Test an empty batch runs nothing and saves nothing."""
+        assert HeadlessRunner(config).run_batch([]) == 0.0
+        assert run_pours(config, [], []) == 0.0
+    
+    def test_too_many_scripts(self, config, script):
+        """Test a batch larger than the canvas count is rejected."""
+        with pytest.raises(ValueError):
+            HeadlessRunner(config).run_batch([script, script])
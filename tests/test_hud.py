@@ -0,0 +1,89 @@
+"""Tests for the retained-mode HUD layer."""
+
+import pytest
+import pygame
+from src.rendering.hud import HudLayer, get_font
+
+
+@pytest.fixture(autouse=True)
+def fonts():
+    """Initialize the Pygame font module."""
+    pygame.font.init()
+    yield
+
+
+@pytest.fixture
+def screen():
+    """Create an offscreen scene with a recognizable fill."""
+    surface = pygame.Surface((400, 300))
+    surface.fill((10, 200, 30))
+    return surface
+
+
+class TestHudLayer:
+    """Test HUD caching and dirty-rect updates."""
+    
+    def test_font_cache(self):
+        """Test fonts are created once per size."""
+        assert get_font(20) is get_font(20)
+        assert get_font(20) is not get_font(24)
+    
+    def test_unchanged_text_not_rerendered(self):
+        """Test setting identical text keeps the cached surface."""
+        hud = HudLayer()
+        hud.set_line("fps", "FPS: 60", (10, 10))
+        surface = hud.lines["fps"].surface
+        
+        hud.set_line("fps", "FPS: 60", (10, 10))
+        
+        assert hud.lines["fps"].surface is surface
+    
+    def test_full_redraw(self, screen):
+        """Test a scene redraw draws every line and updates the whole screen."""
+        hud = HudLayer()
+        hud.set_line("fps", "FPS: 60", (10, 10))
+        
+        rects = hud.draw(screen, scene_redrawn=True)
+        
+        assert rects == [screen.get_rect()]
+        assert hud.draw(screen, scene_redrawn=False) == []
+    
+    def test_partial_update_restores_scene(self, screen):
+        """Test a shorter line restores the scene under the old text."""
+        hud = HudLayer()
+        hud.set_line("fps", "FPS: 60000000", (10, 10))
+        hud.set_line("tilt", "Tilt", (10, 30))
+        hud.draw(screen, scene_redrawn=True)
+        old_rect = hud.lines["fps"].rect
+        
+        hud.set_line("fps", "F", (10, 10))
+        rects = hud.draw(screen, scene_redrawn=False)
+        
+        assert rects == [old_rect.union(hud.lines["fps"].rect)]
+        assert screen.get_at((old_rect.right - 2, old_rect.centery))[:3] == (10, 200, 30)
+    
+    def test_removed_line_cleared(self, screen):
+        """Test removing a line restores the scene beneath it."""
+        hud = HudLayer()
+        hud.set_line("fps", "FPS: 60", (10, 10))
+        hud.draw(screen, scene_redrawn=True)
+        rect = hud.lines["fps"].rect
+        
+        hud.remove_line("fps")
+        
+        assert hud.draw(screen, scene_redrawn=False) == [rect]
+        assert all(
+            screen.get_at((x, y))[:3] == (10, 200, 30)
+            for x in range(rect.left, rect.right)
+            for y in range(rect.top, rect.bottom)
+        )
+    
+    def test_line_outside_saved_region(self, screen):
+        """Test a new line outside the saved scene region needs a redraw."""
+        hud = HudLayer()
+        hud.set_line("fps", "FPS: 60", (10, 10))
+        hud.draw(screen, scene_redrawn=True)
+        
+        hud.set_line("debug", "Debug", (10, 250))
+        
+        assert hud.draw(screen, scene_redrawn=False) is None
@@ -66,8 +66,8 @@ class TestParticleSystem:
         particle_system.set_tilt(10.0, -5.0)
         
         # Tilt should be within bounds
-        assert -45.0 <= particle_system.tilt_x[None] <= 45.0
-        assert -45.0 <= particle_system.tilt_y[None] <= 45.0
+        assert -45.0 <= particle_system.tilt_x[0] <= 45.0
+        assert -45.0 <= particle_system.tilt_y[0] <= 45.0
     
     def test_reset(self, particle_system):
         """Test reset functionality."""
@@ -90,3 +90,488 @@ class TestParticleSystem:
         
         # Should be capped at max
         assert particle_system.get_particle_count() == max_p
+    
+    def test_neighbor_grid(self, particle_system):
+        """Test every active particle is binned into the neighbor grid."""
+        color = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        particle_system.add_particles(100.0, 100.0, 150, color, 1.0, 300.0)
+        particle_system.add_particles(700.0, 500.0, 150, color, 1.0, 300.0)
+        
+        particle_system.update(0.016)
+        
+        cell_start = particle_system.cell_start.to_numpy()
+        sorted_index = particle_system.sorted_index.to_numpy()[:300]
+        assert cell_start[-1] == 300
+        assert sorted(sorted_index) == list(range(300))
+    
+    def test_isolated_particle_density(self, particle_system):
+        """Test a lone particle only feels its own kernel contribution."""
+        color = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        particle_system.add_particles(100.0, 100.0, 1, color, 1.0, 300.0)
+        particle_system.add_particles(700.0, 500.0, 1, color, 1.0, 300.0)
+        
+        particle_system.update(0.016)
+        
+        h = particle_system.smoothing_radius
+        expected = particle_system.particle_mass * particle_system.poly6 * h ** 6
+        density = particle_system.fluid_density.to_numpy()[:2]
+        assert np.allclose(density, expected, rtol=1e-4)
+    
+    def test_pressure_spreads_paint(self, particle_system):
+        """Test SPH pressure spreads a dense pour outwards."""
+        color = ti.Vector([0.0, 0.0, 1.0, 1.0])
+        particle_system.add_particles(400.0, 300.0, 300, color, 1.0, 300.0)
+        
+        positions_before, _ = particle_system.get_particle_data()
+        spread_before = np.linalg.norm(positions_before - [400.0, 300.0], axis=1).mean()
+        
+        for _ in range(60):
+            particle_system.update(0.016)
+        
+        positions_after, _ = particle_system.get_particle_data()
+        spread_after = np.linalg.norm(positions_after - [400.0, 300.0], axis=1).mean()
+        assert spread_after > spread_before * 1.5
+        assert np.all(np.isfinite(positions_after))
+    
+    def test_read_particles(self, particle_system):
+        """Test readback into reusable buffers matches get_particle_data."""
+        color = ti.Vector([0.0, 1.0, 0.0, 1.0])
+        particle_system.add_particles(200.0, 200.0, 100, color, 1.0, 500.0)
+        readback = particle_system.create_readback()
+        
+        positions, colors = particle_system.read_particles(readback)
+        expected_positions, expected_colors = particle_system.get_particle_data()
+        
+        assert readback.count == 100
+        assert np.shares_memory(positions, readback.positions)
+        assert np.array_equal(positions, expected_positions)
+        assert np.array_equal(colors, expected_colors)
+    
+    def test_read_particles_reuses_colors(self, particle_system):
+        """Test colors are only re-read for new or reused slots."""
+        readback = particle_system.create_readback()
+        particle_system.add_particles(200.0, 200.0, 10, ti.Vector([1.0, 0.0, 0.0, 1.0]), 1.0, 300.0)
+        particle_system.read_particles(readback)
+        
+        # Unchanged colors are not copied again
+        readback.colors[:10] = -1.0
+        particle_system.add_particles(300.0, 300.0, 10, ti.Vector([0.0, 0.0, 1.0, 1.0]), 1.0, 300.0)
+        _, colors = particle_system.read_particles(readback)
+        assert np.all(colors[:10] == -1.0)
+        assert np.allclose(colors[10:], [0.0, 0.0, 1.0, 1.0])
+        
+        # Reset reuses slots, so every color is refreshed
+        particle_system.reset()
+        particle_system.add_particles(200.0, 200.0, 10, ti.Vector([0.0, 1.0, 0.0, 1.0]), 1.0, 300.0)
+        _, colors = particle_system.read_particles(readback)
+        assert np.allclose(colors, [0.0, 1.0, 0.0, 1.0])
+    
+    def test_off_canvas_retirement(self, particle_system):
+        """Test paint dripping past an edge is retired."""
+        color = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        particle_system.add_particles(400.0, 300.0, 10, color, 1.0, 300.0)
+        particle_system.velocity.from_numpy(
+            np.tile([[-1.0e5, 0.0]], (particle_system.capacity, 1)).astype(np.float32)
+        )
+        
+        particle_system.update(0.016)
+        
+        assert particle_system.get_particle_count() == 0
+        assert particle_system.num_retired[None] == 10
+    
+    def test_remove_and_compact(self, particle_system):
+        """Test compaction keeps live particles dense and in order."""
+        red = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        blue = ti.Vector([0.0, 0.0, 1.0, 1.0])
+        particle_system.add_particles(100.0, 100.0, 50, red, 1.0, 300.0)
+        particle_system.add_particles(500.0, 500.0, 50, blue, 1.0, 300.0)
+        positions_before, _ = particle_system.get_particle_data()
+        
+        particle_system.remove_particles(100.0, 100.0, 20.0)
+        assert particle_system.get_particle_count() == 50
+        
+        particle_system.compact()
+        positions, colors = particle_system.get_particle_data()
+        
+        assert particle_system.num_particles[None] == 50
+        assert np.array_equal(positions, positions_before[50:])
+        assert np.allclose(colors, [0.0, 0.0, 1.0, 1.0])
+        assert particle_system.is_active.to_numpy()[:50].all()
+    
+    def test_recycle_slots_when_full(self, particle_system):
+        """Test retired slots are reused once the system is full."""
+        color = ti.Vector([1.0, 0.0, 1.0, 1.0])
+        max_p = particle_system.max_particles
+        particle_system.add_particles(400.0, 300.0, max_p, color, 1.0, 300.0)
+        particle_system.remove_particles(400.0, 300.0, 5.0)
+        removed = max_p - particle_system.get_particle_count()
+        assert removed > 0
+        
+        particle_system.add_particles(100.0, 100.0, removed, color, 1.0, 300.0)
+        
+        assert particle_system.get_particle_count() == max_p
+        assert particle_system.num_retired[None] == 0
+    
+    def test_max_speed(self, particle_system):
+        """Test max speed reduction over active particles."""
+        color = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        particle_system.add_particles(400.0, 300.0, 3, color, 1.0, 300.0)
+        velocities = np.zeros((particle_system.capacity, 2), dtype=np.float32)
+        velocities[:3] = [[3.0, 4.0], [1.0, 0.0], [0.0, -2.0]]
+        velocities[3] = [100.0, 0.0]  # Inactive slot is ignored
+        particle_system.velocity.from_numpy(velocities)
+        
+        assert particle_system.max_speed() == pytest.approx(5.0)
+    
+    def test_advance_substeps(self, particle_system):
+        """Test fast paint is advanced in several CFL-limited substeps."""
+        color = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        particle_system.add_particles(400.0, 300.0, 1, color, 1.0, 300.0)
+        assert particle_system.advance(0.016) == 1
+        
+        velocities = np.zeros((particle_system.capacity, 2), dtype=np.float32)
+        velocities[0] = [2000.0, 0.0]
+        particle_system.velocity.from_numpy(velocities)
+        
+        assert particle_system.advance(0.016) > 1
+
+
+class TestWarmUp:
+    """Test kernel warm-up and startup metrics."""
+    
+    def test_warm_up_leaves_system_empty(self, particle_system):
+        """Test warm-up compiles kernels without changing the simulation."""
+        metrics = particle_system.warm_up()
+        assert metrics.kernels_warmed > 0
+        assert metrics.warm_up_seconds > 0
+        assert particle_system.get_particle_count() == 0
+        assert particle_system.num_retired[None] == 0
+        
+        particle_system.add_particles(400.0, 300.0, 50, ti.Vector([1.0, 0.0, 0.0, 1.0]), 1.0, 300.0)
+        particle_system.advance(0.016)
+        assert particle_system.get_particle_count() == 50
+    
+    def test_warm_up_requires_empty_system(self, particle_system):
+        """Test warm-up refuses to run once particles exist."""
+        particle_system.add_particles(400.0, 300.0, 10, ti.Vector([1.0, 0.0, 0.0, 1.0]), 1.0, 300.0)
+        with pytest.raises(RuntimeError):
+            particle_system.warm_up()
+    
+    def test_startup_metrics(self, config):
+        """Test creating a system records where startup time went."""
+        config.physics.warm_up = True
+        metrics = ParticleSystem(config).startup_metrics
+        assert metrics.backend in ["GPU", "CPU"]
+        assert metrics.init_seconds > 0
+        assert metrics.allocation_seconds > 0
+        assert metrics.kernels_warmed > 0
+        assert "warm-up" in metrics.summary()
+
+
+class TestMaterials:
+    """Test the per-paint material table."""
+    
+    def test_same_paint_shares_material(self, particle_system):
+        """Test repeated pours of one paint reuse its table entry."""
+        red = ti.Vector([0.9, 0.2, 0.2, 1.0])
+        particle_system.add_particles(300.0, 300.0, 20, red, 1.0, 300.0)
+        particle_system.add_particles(500.0, 300.0, 20, red, 1.0, 300.0)
+        particle_system.add_particles(400.0, 300.0, 20, red, 1.0, 800.0)
+        
+        assert len(particle_system.materials) == 2
+        materials = particle_system.material.to_numpy()[:60]
+        assert set(materials[:40]) == {0}
+        assert set(materials[40:]) == {1}
+    
+    def test_colors_come_from_table(self, particle_system):
+        """Test readback resolves each particle's color through its material."""
+        particle_system.add_particles(300.0, 300.0, 10, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 300.0)
+        particle_system.add_particles(500.0, 300.0, 10, ti.Vector([0.2, 0.5, 0.9, 0.5]), 1.0, 300.0)
+        _, colors = particle_system.get_particle_data()
+        
+        np.testing.assert_allclose(colors[:10], [[0.9, 0.2, 0.2, 1.0]] * 10)
+        np.testing.assert_allclose(colors[10:], [[0.2, 0.5, 0.9, 0.5]] * 10)
+    
+    def test_precomputed_viscosity_terms(self, particle_system):
+        """Test the table holds the viscosity terms the update uses."""
+        index = particle_system.material_index((1.0, 1.0, 1.0, 1.0), 1.2, 500.0)
+        assert particle_system.material_density[index] == pytest.approx(1.2)
+        assert particle_system.material_viscosity_factor[index] == pytest.approx(1.0 / 1.5)
+        assert particle_system.material_mu[index] == pytest.approx(
+            particle_system.viscosity_coefficient * 500.0
+        )
+    
+    def test_table_capacity(self, config):
+        """Test registering more paints than the table holds fails."""
+        config.physics.max_materials = 2
+        ps = ParticleSystem(config)
+        ps.material_index((1.0, 0.0, 0.0, 1.0), 1.0, 300.0)
+        ps.material_index((0.0, 1.0, 0.0, 1.0), 1.0, 300.0)
+        with pytest.raises(ValueError):
+            ps.material_index((0.0, 0.0, 1.0, 1.0), 1.0, 300.0)
+    
+    def test_reset_empties_table(self, particle_system):
+        """Test reset frees the table and reused slots get their new paint's color."""
+        readback = particle_system.create_readback()
+        particle_system.add_particles(300.0, 300.0, 10, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 300.0)
+        particle_system.read_particles(readback)
+        particle_system.reset()
+        assert particle_system.materials == {}
+        
+        particle_system.add_particles(300.0, 300.0, 10, ti.Vector([0.2, 0.5, 0.9, 1.0]), 1.0, 300.0)
+        _, colors = particle_system.read_particles(readback)
+        assert particle_system.material.to_numpy()[0] == 0
+        np.testing.assert_allclose(colors, [[0.2, 0.5, 0.9, 1.0]] * 10)
+
+
+
+def scattered_pours(config):
+    """Create a system with small pours scattered over two canvases."""
+    config.physics.num_canvases = 2
+    ps = ParticleSystem(config)
+    rng = np.random.default_rng(0)
+    for k in range(40):
+        ps.add_particles(float(rng.uniform(50, 750)), float(rng.uniform(50, 550)), 25,
+                         ti.Vector([k / 40, 0.5, 0.5, 1.0]), 1.0, 300.0, k % 2)
+    ps.update(0.016)
+    return ps
+
+
+def particle_rows(ps):
+    """Per-particle state in a layout-independent order (sorted by position)."""
+    state = {name: field.to_numpy()[:ps.num_particles[None]]
+             for name, field in ps.state_arrays().items()}
+    order = np.lexsort(state["position"].T)
+    return {name: data[order] for name, data in state.items()}
+
+
+class TestSpatialSort:
+    """Test spatial reordering of particle memory."""
+    
+    @pytest.mark.parametrize("order", ["morton", "cell"])
+    def test_sort_keeps_fields_consistent(self, config, order):
+        """Test sorting moves every field of a particle together."""
+        config.physics.spatial_sort_order = order
+        ps = scattered_pours(config)
+        before = particle_rows(ps)
+        ps.spatial_sort()
+        after = particle_rows(ps)
+        
+        for name in before:
+            np.testing.assert_array_equal(after[name], before[name])
+    
+    @pytest.mark.parametrize("order", ["morton", "cell"])
+    def test_sort_groups_particles_by_cell(self, config, order):
+        """Test each cell's particles become contiguous, keeping their pour order."""
+        config.physics.spatial_sort_order = order
+        ps = scattered_pours(config)
+        ps.spatial_sort()
+        
+        n = ps.num_particles[None]
+        cell = np.floor(ps.position.to_numpy()[:n] / ps.smoothing_radius).astype(int)
+        keys = ps.canvas_id.to_numpy()[:n] * 10**6 + cell[:, 0] * 1000 + cell[:, 1]
+        starts = np.flatnonzero(np.diff(keys)) + 1
+        assert len(starts) + 1 == len(np.unique(keys))
+        
+        # Materials were registered in pour order
+        for run in np.split(ps.material.to_numpy()[:n], starts):
+            assert np.all(np.diff(run) >= 0)
+    
+    def test_periodic_sort_is_deterministic(self, config):
+        """Test runs with periodic sorting replay identically."""
+        config.physics.spatial_sort_interval = 3
+        results = []
+        for _ in range(2):
+            ps = ParticleSystem(config)
+            for k in range(10):
+                ps.add_particles(100.0 + 60 * k, 300.0, 30, ti.Vector([1.0, 0.0, 0.0, 1.0]),
+                                 1.0, 300.0)
+            ps.set_tilt(10.0, 5.0)
+            for _ in range(10):
+                ps.update(0.016)
+            results.append(ps.position.to_numpy()[:ps.num_particles[None]])
+        np.testing.assert_array_equal(results[0], results[1])
+
+
+class TestSleeping:
+    """Test sleeping of settled particles."""
+    
+    @pytest.fixture
+    def settled(self, config):
+        """Create a system whose single pour has come to rest."""
+        config.physics.sleep_speed = 5.0
+        config.physics.sleep_steps = 5
+        ps = ParticleSystem(config)
+        ps.add_particles(400.0, 300.0, 200, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 300.0)
+        for _ in range(400):
+            ps.update(0.016)
+            if ps.get_awake_count() == 0:
+                break
+        return ps
+    
+    def test_settled_paint_sleeps(self, settled):
+        """Test particles at rest stop being updated."""
+        assert settled.get_awake_count() == 0
+        positions, _ = settled.get_particle_data()
+        settled.update(0.016)
+        np.testing.assert_array_equal(settled.get_particle_data()[0], positions)
+    
+    def test_tilt_wakes_paint(self, settled):
+        """Test tilting the canvas wakes and moves sleeping paint."""
+        positions, _ = settled.get_particle_data()
+        settled.set_tilt(30.0, 0.0)
+        for _ in range(5):
+            settled.update(0.016)
+        
+        assert settled.get_awake_count() == settled.get_particle_count()
+        assert np.all(settled.get_particle_data()[0][:, 0] > positions[:, 0])
+    
+    def test_moving_neighbor_wakes_paint(self, settled):
+        """Test paint poured onto sleeping paint disturbs it."""
+        settled.add_particles(400.0, 300.0, 100, ti.Vector([0.2, 0.5, 0.9, 1.0]), 1.0, 300.0)
+        for _ in range(10):
+            settled.update(0.016)
+        assert settled.get_awake_count() > 100
+    
+    def test_restored_sleepers_keep_density(self, settled):
+        """Test paint poured onto restored sleeping paint reads valid densities."""
+        scalars, arrays = settled.get_state()
+        restored = ParticleSystem(settled.config)
+        restored.set_state(scalars, arrays)
+        
+        restored.add_particles(400.0, 300.0, 50, ti.Vector([0.2, 0.5, 0.9, 1.0]), 1.0, 300.0)
+        for _ in range(5):
+            restored.update(0.016)
+        assert np.all(np.isfinite(restored.get_particle_data()[0]))
+    
+    def test_compaction_keeps_sleeper_density(self, settled):
+        """Test compacting around sleeping paint does not change the simulation."""
+        settled.remove_particles(400.0, 300.0, 3.0)
+        scalars, arrays = settled.get_state()
+        
+        def pour_onto(compact_first):
+            settled.set_state(scalars, arrays)
+            if compact_first:
+                settled.compact()
+            settled.add_particles(410.0, 300.0, 50, ti.Vector([0.2, 0.5, 0.9, 1.0]), 1.0, 300.0)
+            for _ in range(5):
+                settled.update(0.016)
+            settled.compact()
+            return settled.get_particle_data()[0]
+        
+        np.testing.assert_array_equal(pour_onto(True), pour_onto(False))
+    
+    def test_disabled(self, config):
+        """Test a zero sleep speed keeps every particle awake."""
+        config.physics.sleep_speed = 0.0
+        ps = ParticleSystem(config)
+        ps.add_particles(400.0, 300.0, 50, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 300.0)
+        for _ in range(20):
+            ps.update(0.016)
+        assert ps.get_awake_count() == 50
+
+
+class TestSubsteps:
+    """Test that fixed steps behave the same however they are substepped."""
+    
+    def lone_particle(self, config, speed):
+        """Create a system with one particle moving right, without gravity."""
+        ps = ParticleSystem(config)
+        ps.set_gravity(0.0)
+        ps.add_particles(100.0, 300.0, 1, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 300.0)
+        ps.velocity[0] = [speed, 0.0]
+        return ps
+    
+    def test_friction_independent_of_substeps(self, config):
+        """Test a step split in substeps damps velocity like one whole step."""
+        whole = self.lone_particle(config, 100.0)
+        whole.update(0.016)
+        expected = whole.velocity[0][0]
+        
+        split = self.lone_particle(config, 100.0)
+        for _ in range(4):
+            split._substep(0.004, False)
+        assert split.velocity[0][0] == pytest.approx(expected, rel=1e-5)
+        assert expected == pytest.approx(100.0 * config.physics.friction)
+    
+    def test_step_count_per_fixed_step(self, config):
+        """Test substeps advance the step counter (and rest counters) once per step."""
+        ps = self.lone_particle(config, 2000.0)
+        assert ps.advance(0.016) > 1
+        assert ps.step_count == 1
+        
+        ps.velocity[0] = [0.0, 0.0]
+        ps.advance(0.016)
+        assert ps.rest_steps[0] == 1
+
+
+class TestCapacity:
+    """Test on-demand growth and shrinking of particle memory."""
+    
+    @pytest.fixture
+    def small(self, config):
+        """System starting at 256 slots with a 2000 particle limit."""
+        config.physics.initial_capacity = 256
+        config.physics.max_particles = 2000
+        return ParticleSystem(config)
+    
+    def test_grows_keeping_particles(self, small):
+        """Test pouring past capacity grows it and keeps existing paint."""
+        color = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        small.add_particles(400.0, 300.0, 200, color, 1.0, 300.0)
+        small.update(0.016)
+        before = particle_rows(small)
+        
+        small.add_particles(200.0, 300.0, 300, color, 1.0, 300.0)
+        
+        assert small.capacity == 512
+        assert small.get_particle_count() == 500
+        after = {name: data[:200] for name, data in
+                 ((name, field.to_numpy()) for name, field in small.state_arrays().items())}
+        order = np.lexsort(after["position"].T)
+        for name in before:
+            np.testing.assert_array_equal(after[name][order], before[name])
+    
+    def test_growth_capped(self, small):
+        """Test capacity never exceeds max_particles."""
+        small.add_particles(400.0, 300.0, 2500, ti.Vector([1.0, 0.0, 0.0, 1.0]), 1.0, 300.0)
+        assert small.capacity == 2000
+        assert small.get_particle_count() == 2000
+    
+    def test_compacts_before_growing(self, small):
+        """Test retired slots are reused instead of allocating more memory."""
+        color = ti.Vector([1.0, 0.0, 0.0, 1.0])
+        small.add_particles(400.0, 300.0, 256, color, 1.0, 300.0)
+        small.remove_particles(400.0, 300.0, 100.0)
+        small.add_particles(100.0, 100.0, 100, color, 1.0, 300.0)
+        assert small.capacity == 256
+        assert small.get_particle_count() == 100
+    
+    def test_shrink_after_reset(self, small):
+        """Test reset(shrink=True) releases memory back to the initial size."""
+        small.add_particles(400.0, 300.0, 1000, ti.Vector([1.0, 0.0, 0.0, 1.0]), 1.0, 300.0)
+        grown = small.memory_usage()
+        
+        small.reset(shrink=True)
+        usage = small.memory_usage()
+        
+        assert usage["capacity"] == 256
+        assert usage["total_bytes"] < grown["total_bytes"]
+        assert usage["peak_bytes"] == grown["total_bytes"]
+        small.add_particles(400.0, 300.0, 10, ti.Vector([1.0, 0.0, 0.0, 1.0]), 1.0, 300.0)
+        small.update(0.016)
+        assert small.get_particle_count() == 10
+    
+    def test_memory_usage(self, small):
+        """Test memory usage scales with capacity."""
+        usage = small.memory_usage()
+        assert usage["particle_bytes"] >= 256 * usage["bytes_per_particle"] > 0
+        assert usage["total_bytes"] == usage["particle_bytes"] + usage["fixed_bytes"]
+    
+    def test_readback_follows_growth(self, small):
+        """Test readback buffers created before growth still receive every particle."""
+        readback = small.create_readback()
+        small.add_particles(400.0, 300.0, 700, ti.Vector([0.0, 1.0, 0.0, 1.0]), 1.0, 300.0)
+        positions, colors = small.read_particles(readback)
+        assert len(positions) == 700
+        assert np.allclose(colors, [0.0, 1.0, 0.0, 1.0])
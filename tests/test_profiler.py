@@ -0,0 +1,60 @@
+"""Tests for the frame profiler."""
+
+import json
+import time
+
+import pytest
+from src.ui.profiler import FrameProfiler
+
+
+def run_frames(profiler, count):
+    """Run frames with two short stages."""
+    for _ in range(count):
+        profiler.begin_frame()
+        with profiler.stage("physics", sync=True):
+            time.sleep(0.002)
+        with profiler.stage("render"):
+            pass
+        profiler.end_frame()
+
+
+class TestFrameProfiler:
+    """Test stage timing, percentiles and trace export."""
+    
+    def test_disabled_records_nothing(self):
+        """Test a disabled profiler neither records nor syncs."""
+        syncs = []
+        profiler = FrameProfiler(sync=lambda: syncs.append(1))
+        run_frames(profiler, 3)
+        
+        assert profiler.samples == {}
+        assert syncs == []
+    
+    def test_stage_percentiles(self):
+        """Test stages are timed into rolling windows with percentiles."""
+        syncs = []
+        profiler = FrameProfiler(window=4, sync=lambda: syncs.append(1), enabled=True)
+        run_frames(profiler, 6)
+        
+        assert len(profiler.samples["physics"]) == 4
+        assert len(syncs) == 6
+        p50, p95, p99 = profiler.percentiles("physics")
+        assert 2.0 <= p50 <= p95 <= p99
+        assert profiler.percentiles("frame")[0] >= p50
+        assert profiler.percentiles("missing") is None
+        assert profiler.summary_lines()[0].startswith("frame")
+    
+    def test_chrome_trace_export(self, tmp_path):
+        """Test captured stages are written as Chrome trace events."""
+        profiler = FrameProfiler()
+        profiler.start_trace()
+        run_frames(profiler, 2)
+        path = profiler.stop_trace(tmp_path / "trace.json")
+        
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+        assert [e["name"] for e in events] == ["physics", "render", "frame"] * 2
+        assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+        assert events[3]["args"]["frame"] == 1
+        assert events[0]["dur"] == pytest.approx(2000, rel=0.9)
+        assert not profiler.tracing
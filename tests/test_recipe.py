@@ -0,0 +1,104 @@
+"""Tests for session recipe recording and replay."""
+
+import pytest
+import numpy as np
+import taichi as ti
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+from src.batch import Recipe, RecipeAction, RecipeRecorder, RecipeReplayer
+
+
+@pytest.fixture
+def config():
+    """Create test configuration."""
+    config = Config()
+    config.physics.max_particles = 2000
+    config.physics.random_seed = 7
+    return config
+
+
+@pytest.fixture
+def recipe(config):
+    """Record a short session."""
+    recorder = RecipeRecorder(config)
+    recorder.record(0, "emit", 400, 300, 200, 0.9, 0.2, 0.2, 1.0, 1.0, 500.0)
+    recorder.record(3, "tilt", 15.0, -5.0)
+    recorder.record(5, "viscosity", 300.0)
+    recorder.record(5, "emit", 380, 280, 100, 0.2, 0.5, 0.9, 1.0, 1.0, 300.0)
+    recorder.record(8, "remove", 400, 300, 10.0)
+    recorder.recipe.steps = 12
+    return recorder.recipe
+
+
+def run_direct(config):
+    """Run the session of the recipe fixture by calling the system directly."""
+    ps = ParticleSystem(config)
+    for step in range(12):
+        if step == 0:
+            ps.add_particles(400.0, 300.0, 200, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 500.0)
+        elif step == 3:
+            ps.set_tilt(15.0, -5.0)
+        elif step == 5:
+            ps.add_particles(380.0, 280.0, 100, ti.Vector([0.2, 0.5, 0.9, 1.0]), 1.0, 300.0)
+        elif step == 8:
+            ps.remove_particles(400.0, 300.0, 10.0)
+        ps.advance(config.physics.time_step)
+    return ps.get_particle_data()
+
+
+class TestRecipe:
+    """Test recipe files."""
+    
+    @pytest.mark.parametrize("name", ["session.jsonl", "session.jsonl.gz"])
+    def test_round_trip(self, recipe, tmp_path, name):
+        """Test saving and loading a recipe preserves it."""
+        path = tmp_path / name
+        recipe.save(path)
+        
+        loaded = Recipe.load(path)
+        assert loaded.seed == 7
+        assert loaded.steps == 12
+        assert [(a.step, a.kind, a.args) for a in loaded.actions] == \
+            [(a.step, a.kind, a.args) for a in recipe.actions]
+    
+    def test_rejects_other_files(self, tmp_path):
+        """Test files without a recipe header are rejected."""
+        path = tmp_path / "other.jsonl"
+        path.write_text('{"steps": 10}\n')
+        
+        with pytest.raises(ValueError):
+            Recipe.load(path)
+    
+    def test_argument_count_checked(self, config):
+        """Test actions with the wrong number of arguments are rejected."""
+        with pytest.raises(ValueError):
+            RecipeRecorder(config).record(0, "tilt", 1.0)
+        with pytest.raises(ValueError):
+            RecipeAction.from_row([0, 0.0, "explode"])
+
+
+class TestRecipeReplayer:
+    """Test replaying recipes."""
+    
+    def test_replay_matches_direct_run(self, config, recipe):
+        """Test a replayed session reproduces the recorded one exactly."""
+        expected_positions, expected_colors = run_direct(config)
+        
+        ps = ParticleSystem(config)
+        RecipeReplayer(recipe, ps).run()
+        positions, colors = ps.get_particle_data()
+        
+        np.testing.assert_array_equal(positions, expected_positions)
+        np.testing.assert_array_equal(colors, expected_colors)
+    
+    def test_on_action_callback(self, config, recipe):
+        """Test every applied action is reported once, in order."""
+        seen = []
+        replayer = RecipeReplayer(recipe, ParticleSystem(config), seen.append)
+        replayer.apply_actions(4)
+        
+        assert [a.kind for a in seen] == ["emit", "tilt"]
+        assert not replayer.finished
+        replayer.apply_actions(20)
+        assert replayer.finished
+        assert len(seen) == len(recipe.actions)
@@ -0,0 +1,175 @@
+"""Tests for particle renderer."""
+
+import pytest
+import numpy as np
+import pygame
+import taichi as ti
+from PIL import Image
+from src.config import Config
+from src.physics.particle_system import ParticleSystem
+from src.rendering.print_render import PrintRenderer
+from src.rendering.renderer import ParticleRenderer
+
+
+@pytest.fixture
+def config():
+    """Create test configuration."""
+    return Config()
+
+
+def render(config, mode, positions, colors):
+    """Render particles offscreen and return the pixels."""
+    config.render.render_mode = mode
+    screen = pygame.Surface((config.canvas.width, config.canvas.height))
+    renderer = ParticleRenderer(config, screen)
+    renderer.clear()
+    renderer.render_particles(positions, colors)
+    return pygame.surfarray.array3d(screen).astype(int)
+
+
+class TestParticleRenderer:
+    """Test particle renderer functionality."""
+    
+    def test_batched_matches_blit_opaque(self, config):
+        """Test batched renderer reproduces blit output for opaque paint."""
+        rng = np.random.default_rng(1)
+        # Include particles overlapping and beyond every canvas edge
+        positions = rng.uniform(-20, [820, 620], (2000, 2)).astype(np.float32)
+        palette = np.array(list(config.COLOR_PRESETS.values()), dtype=np.float32)
+        colors = palette[rng.integers(0, len(palette), 2000)]
+        
+        blit = render(config, "blit", positions, colors)
+        batched = render(config, "batched", positions, colors)
+        
+        assert np.array_equal(blit, batched)
+    
+    def test_batched_matches_blit_translucent(self, config):
+        """Test translucent particles are blended in draw order."""
+        positions = np.array([[100, 100], [103, 100], [106, 102]], dtype=np.float32)
+        colors = np.array([
+            [0.9, 0.2, 0.2, 1.0],
+            [0.2, 0.5, 0.9, 0.5],
+            [0.95, 0.9, 0.2, 0.5],
+        ], dtype=np.float32)
+        
+        blit = render(config, "blit", positions, colors)
+        batched = render(config, "batched", positions, colors)
+        
+        assert np.abs(blit - batched).max() <= 2
+    
+    def test_later_particle_drawn_on_top(self, config):
+        """Test overlapping particles keep blit stacking order."""
+        positions = np.array([[50, 50], [50, 50]], dtype=np.float32)
+        colors = np.array([[1.0, 0.0, 0.0, 1.0], [0.0, 0.0, 1.0, 1.0]], dtype=np.float32)
+        
+        pixels = render(config, "batched", positions, colors)
+        
+        assert tuple(pixels[50, 50]) == (0, 0, 255)
+    
+    def test_empty_render(self, config):
+        """Test rendering no particles leaves background untouched."""
+        pixels = render(config, "batched", np.array([]), np.array([]))
+        
+        assert tuple(pixels[0, 0]) == config.canvas.background_color
+
+
+class TestDeviceRasterizer:
+    """Test on-device rasterization."""
+    
+    @pytest.fixture
+    def particle_system(self, config):
+        """Create a particle system with paint across the canvas."""
+        config.physics.max_particles = 3000
+        ps = ParticleSystem(config)
+        palette = list(config.COLOR_PRESETS.values())
+        rng = np.random.default_rng(2)
+        for k in range(10):
+            x, y = rng.uniform(-10, [810, 610])
+            ps.add_particles(float(x), float(y), 300, ti.Vector(palette[k]), 1.0, 300.0)
+        ps.remove_particles(400.0, 300.0, 50.0)
+        return ps
+    
+    def render_system(self, config, mode, ps):
+        """Render a particle system offscreen and return the pixels."""
+        config.render.render_mode = mode
+        screen = pygame.Surface((config.canvas.width, config.canvas.height))
+        renderer = ParticleRenderer(config, screen)
+        renderer.clear()
+        renderer.render_system(ps, ps.create_readback())
+        return pygame.surfarray.array3d(screen).astype(int)
+    
+    def test_matches_batched_opaque(self, config, particle_system):
+        """Test device output matches the batched renderer for opaque paint."""
+        batched = self.render_system(config, "batched", particle_system)
+        device = self.render_system(config, "device", particle_system)
+        
+        assert np.array_equal(device, batched)
+    
+    def test_translucent_layer(self, config):
+        """Test a single translucent layer blends like the batched renderer."""
+        ps = ParticleSystem(config)
+        ps.add_particles(100.0, 100.0, 20, ti.Vector([0.9, 0.2, 0.2, 1.0]), 1.0, 300.0)
+        ps.add_particles(300.0, 300.0, 1, ti.Vector([0.2, 0.5, 0.9, 0.5]), 1.0, 300.0)
+        ps.add_particles(100.0, 100.0, 1, ti.Vector([0.95, 0.9, 0.2, 0.5]), 1.0, 300.0)
+        
+        batched = self.render_system(config, "batched", ps)
+        device = self.render_system(config, "device", ps)
+        
+        assert np.abs(device - batched).max() <= 2
+    
+    def test_empty_render(self, config):
+        """Test an empty system renders only the background."""
+        ps = ParticleSystem(config)
+        pixels = self.render_system(config, "device", ps)
+        
+        assert np.all(pixels == config.canvas.background_color)
+
+
+class TestPrintRenderer:
+    """Test tiled high-resolution print renders."""
+    
+    @pytest.fixture
+    def particle_system(self, config):
+        """Create a particle system with opaque and translucent paint."""
+        ps = ParticleSystem(config)
+        for k in range(8):
+            alpha = 0.5 if k % 3 == 0 else 1.0
+            ps.add_particles(150.0 + 70.0 * k, 300.0, 150,
+                             ti.Vector([k / 8, 0.4, 0.7, alpha]), 1.0, 300.0)
+        ps.add_particles(2.0, 598.0, 20, ti.Vector([0.9, 0.1, 0.1, 1.0]), 1.0, 300.0)
+        return ps
+    
+    def window_pixels(self, config, ps):
+        """Render the system at canvas size with the device rasterizer."""
+        config.render.render_mode = "device"
+        screen = pygame.Surface((config.canvas.width, config.canvas.height))
+        ParticleRenderer(config, screen).render_system(ps, ps.create_readback())
+        return pygame.surfarray.array3d(screen).swapaxes(0, 1)
+    
+    def test_tiles_match_window(self, config, particle_system, tmp_path):
+        """Test a scale-1 print assembled from tiles equals the window image."""
+        renderer = PrintRenderer(particle_system, config, scale=1.0, supersample=1, tile_size=96)
+        stats = renderer.render(tmp_path / "print.png")
+        
+        assert stats.size == (800, 600)
+        assert stats.tiles == 9 * 7
+        image = np.asarray(Image.open(stats.path))
+        assert np.array_equal(image, self.window_pixels(config, particle_system))
+    
+    def test_supersampled_scale(self, config, particle_system, tmp_path):
+        """Test a scaled, supersampled print is the window image at higher resolution."""
+        renderer = PrintRenderer(particle_system, config, scale=3.0, supersample=2, tile_size=256)
+        stats = renderer.render(tmp_path / "print.png")
+        
+        image = np.asarray(Image.open(stats.path)).astype(float)
+        assert image.shape == (1800, 2400, 3)
+        # Antialiased disc edges produce colors between paint and background
+        assert len(np.unique(image.reshape(-1, 3), axis=0)) > 100
+        downsampled = image.reshape(600, 3, 800, 3, 3).mean(axis=(1, 3))
+        assert np.abs(downsampled - self.window_pixels(config, particle_system)).mean() < 2.0
+    
+    def test_rejects_other_formats(self, config, particle_system, tmp_path):
+        """Test prints are only written as PNG."""
+        renderer = PrintRenderer(particle_system, config, scale=2.0)
+        with pytest.raises(ValueError):
+            renderer.render(tmp_path / "print.jpg")
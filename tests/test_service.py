@@ -0,0 +1,239 @@
+"""Tests for the local render service."""
+
+import asyncio
+import io
+import os
+import signal
+import threading
+
+import pytest
+import numpy as np
+from PIL import Image
+from src.batch import EmitEvent, PourScript, RenderService, ServiceClient, ServiceError
+from src.batch.service import MAX_BODY
+from src.config import Config
+
+
+def service_config():
+    """Small CPU configuration for service workers."""
+    config = Config()
+    config.physics.backend = "cpu"
+    config.physics.max_particles = 500
+    config.service.progress_interval = 5
+    return config
+
+
+@pytest.fixture(scope="module")
+def service():
+    """Run a one-worker service on a free TCP port in a background loop."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    
+    async def start():
+        service = RenderService(service_config(), workers=1, queue_size=4)
+        await service.start(port=0)
+        return service
+    
+    service = asyncio.run_coroutine_threadsafe(start(), loop).result(timeout=300)
+    yield service
+    asyncio.run_coroutine_threadsafe(service.stop(), loop).result(timeout=60)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+@pytest.fixture
+def client(service):
+    """Client for the running service."""
+    host, port = service.address
+    return ServiceClient(host, port)
+
+
+def pour(steps=20):
+    """A small scripted pour."""
+    return PourScript(
+        steps=steps,
+        emits=[EmitEvent(step=0, x=400.0, y=300.0, count=100, color="red")],
+    )
+
+
+class TestRenderService:
+    """Test job submission, streaming and statistics."""
+    
+    def test_render(self, client):
+        """Test a pour streams progress and returns its image."""
+        events = []
+        image, result = asyncio.run(client.render(pour(), on_event=events.append))
+        
+        assert [e["event"] for e in events[:2]] == ["queued", "started"]
+        assert [e["step"] for e in events if e["event"] == "progress"] == [5, 10, 15]
+        assert result["simulate_seconds"] > 0
+        pixels = np.asarray(Image.open(io.BytesIO(image)))
+        assert pixels.shape == (600, 800, 3)
+        assert np.any(pixels != Config().canvas.background_color)
+    
+    def test_concurrent_jobs(self, client, service):
+        """Test jobs submitted together queue up and all complete."""
+        async def render_all():
+            return await asyncio.gather(*(client.render(pour(10)) for _ in range(3)))
+        
+        completed = service.completed
+        results = asyncio.run(render_all())
+        
+        assert len(results) == 3
+        assert service.completed == completed + 3
+    
+    def test_stats(self, client):
+        """Test stats report queue depth and latency percentiles."""
+        asyncio.run(client.render(pour(5)))
+        stats = asyncio.run(client.stats())
+        
+        assert stats["queue_depth"] == 0
+        assert stats["queue_size"] == 4
+        assert stats["workers"] == 1
+        assert stats["completed"] >= 1
+        assert stats["latency_ms"]["total"]["p50"] > 0
+    
+    def test_invalid_script(self, client):
+        """Test a malformed script is rejected without reaching a worker."""
+        with pytest.raises(ServiceError) as error:
+            asyncio.run(client.render({"steps": 5, "emits": [{"x": 1.0}]}))
+        assert error.value.status == 400
+    
+    def test_failed_job(self, client):
+        """Test a job failing inside the worker reports its error."""
+        bad_color = {"steps": 2, "emits": [{"step": 0, "x": 1.0, "y": 1.0, "color": "plaid"}]}
+        with pytest.raises(ServiceError) as error:
+            asyncio.run(client.render(bad_color))
+        assert error.value.status == 500
+        # The worker survives and keeps serving
+        image, _ = asyncio.run(client.render(pour(2)))
+        assert image.startswith(b"\x89PNG")
+    
+    def test_invalid_content_length(self, service):
+        """Test a non-numeric Content-Length is answered with a 400."""
+        async def send():
+            reader, writer = await asyncio.open_connection(*service.address)
+            writer.write(b"POST /jobs HTTP/1.1\r\nContent-Length: lots\r\n\r\n")
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            writer.close()
+            return status
+        
+        assert asyncio.run(send()) == 400
+    
+    def test_oversized_body(self, service):
+        """Test a body over the size limit is answered with a 413."""
+        async def send():
+            reader, writer = await asyncio.open_connection(*service.address)
+            writer.write(b"POST /jobs HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (MAX_BODY + 1))
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            writer.close()
+            return status
+        
+        assert asyncio.run(send()) == 413
+    
+    def test_unknown_route(self, client):
+        """Test unknown paths get a 404."""
+        with pytest.raises(ServiceError) as error:
+            asyncio.run(client._json("GET", "/nope"))
+        assert error.value.status == 404
+    
+    def test_health(self, client):
+        """Test the health endpoint."""
+        assert asyncio.run(client.health()) == {"status": "ok"}
+
+
+class TestQueue:
+    """Test the bounded job queue."""
+    
+    def test_full_queue_rejects(self):
+        """Test submissions beyond the queue size are rejected."""
+        async def fill():
+            service = RenderService(service_config(), workers=1, queue_size=2)
+            service.submit(pour())
+            service.submit(pour())
+            with pytest.raises(ServiceError) as error:
+                service.submit(pour())
+            return service, error.value
+        
+        service, error = asyncio.run(fill())
+        assert error.status == 503
+        assert service.stats()["rejected"] == 1
+        assert service.stats()["queue_depth"] == 2
+    
+    def test_progress_off(self):
+        """Test a zero progress interval sends no progress events instead of failing jobs."""
+        async def round_trip():
+            config = service_config()
+            config.service.progress_interval = 0
+            service = RenderService(config, workers=1)
+            await service.start(port=0)
+            try:
+                events = []
+                image, _ = await ServiceClient(*service.address).render(
+                    pour(10), on_event=events.append
+                )
+                return image, events
+            finally:
+                await service.stop()
+        
+        image, events = asyncio.run(round_trip())
+        assert image.startswith(b"\x89PNG")
+        assert [e["event"] for e in events] == ["queued", "started"]
+    
+    def test_unix_socket(self, tmp_path):
+        """Test the service can listen on a Unix socket."""
+        async def round_trip():
+            service = RenderService(service_config(), workers=1)
+            await service.start(socket_path=str(tmp_path / "render.sock"))
+            try:
+                client = ServiceClient(socket_path=service.address)
+                return await client.health(), await client.render(pour(2))
+            finally:
+                await service.stop()
+        
+        health, (image, _) = asyncio.run(round_trip())
+        assert health == {"status": "ok"}
+        assert image.startswith(b"\x89PNG")
+        assert not (tmp_path / "render.sock").exists()
+
+
+class TestWorkerRestart:
+    """Test replacing crashed workers."""
+    
+    def test_failed_restart_marks_worker_dead(self):
+        """Test a worker that cannot be restarted is reported dead and jobs are refused."""
+        async def crash():
+            config = service_config()
+            config.service.restart_attempts = 2
+            service = RenderService(config, workers=1)
+            await service.start(port=0)
+            worker = service.workers[0]
+            try:
+                attempts = []
+                
+                async def failing_start(executor):
+                    attempts.append(executor)
+                    raise RuntimeError("No device")
+                
+                worker.start = failing_start
+                os.kill(worker.pid, signal.SIGKILL)
+                worker.process.join()
+                client = ServiceClient(*service.address)
+                with pytest.raises(ServiceError) as died:
+                    await client.render(pour(2))
+                stats = await client.stats()
+                with pytest.raises(ServiceError) as refused:
+                    await client.render(pour(2))
+                return len(attempts), died.value, stats, refused.value
+            finally:
+                await service.stop()
+        
+        attempts, died, stats, refused = asyncio.run(crash())
+        assert attempts == 2
+        assert "died" in died.message
+        assert stats["dead_workers"] == 1
+        assert stats["failed"] == 1
+        assert refused.status == 503
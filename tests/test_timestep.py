@@ -0,0 +1,60 @@
+"""Tests for fixed-timestep accumulation and CFL substepping."""
+
+import pytest
+from src.physics.timestep import FixedTimestep, cfl_substeps
+
+
+@pytest.fixture
+def timestep():
+    """Create a 10ms fixed timestep."""
+    return FixedTimestep(0.01, max_steps_per_frame=4)
+
+
+class TestFixedTimestep:
+    """Test the fixed-step accumulator."""
+    
+    def test_steps_follow_real_time(self, timestep):
+        """Test total steps track elapsed time regardless of frame rate."""
+        slow = sum(timestep.advance(0.033) for _ in range(30))
+        timestep.reset()
+        fast = sum(timestep.advance(0.0033) for _ in range(300))
+        
+        assert slow == pytest.approx(99, abs=1)
+        assert fast == pytest.approx(99, abs=1)
+    
+    def test_remainder_carried(self, timestep):
+        """Test partial steps accumulate across frames."""
+        assert timestep.advance(0.006) == 0
+        assert timestep.advance(0.006) == 1
+        assert timestep.alpha == pytest.approx(0.2)
+    
+    def test_step_cap(self, timestep):
+        """Test a long frame is capped and its backlog dropped."""
+        assert timestep.advance(1.0) == 4
+        assert timestep.accumulator == 0.0
+    
+    def test_reset(self, timestep):
+        """Test reset discards accumulated time."""
+        timestep.advance(0.009)
+        timestep.reset()
+        
+        assert timestep.advance(0.002) == 0
+
+
+class TestCflSubsteps:
+    """Test CFL-limited substep selection."""
+    
+    def test_at_rest(self):
+        """Test still paint needs a single step."""
+        assert cfl_substeps(0.016, 0.0, 15.0) == 1
+    
+    def test_fast_paint_subdivided(self):
+        """Test substeps keep per-substep travel under the CFL limit."""
+        substeps = cfl_substeps(0.016, 2000.0, 15.0, cfl_number=0.4)
+        
+        assert substeps == 6
+        assert 0.016 / substeps * 2000.0 <= 0.4 * 15.0
+    
+    def test_substep_cap(self):
+        """Test substeps are capped."""
+        assert cfl_substeps(0.016, 1.0e6, 15.0, max_substeps=8) == 8